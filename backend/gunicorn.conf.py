@@ -0,0 +1,24 @@
+"""
+Настройки gunicorn для продакшена.
+
+По умолчанию воркеры uvicorn (ASGI, weeek_django.asgi): асинхронные вью
+log_move и статистики не держат поток на запрос. Для WSGI задайте
+GUNICORN_WORKER_CLASS=sync и приложение weeek_django.wsgi.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = os.getenv(
+    "GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker"
+)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Перезапуск воркеров время от времени — страховка от утечек памяти
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
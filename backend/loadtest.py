@@ -0,0 +1,139 @@
+"""
+Нагрузочный тест backend: запросы в секунду и задержки для log_move/ и
+админки.
+
+    python loadtest.py --url http://localhost:8000 --duration 30 \
+        --concurrency 50 --admin-user admin --admin-password secret
+
+log_move/ пишет в базу тестовые перемещения с доской loadtest-<метка> —
+запускайте на тестовом стенде. Без логина админки проверяется только
+log_move/.
+"""
+
+import argparse
+import asyncio
+import math
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+# Уникальная метка прогона — чтобы отличать строки в журнале
+LOADTEST_BOARD = f"loadtest-{uuid.uuid4().hex[:8]}"
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def move_payload(n):
+    return {
+        "task_id": f"loadtest-{n % 1000}",
+        "task_title": f"Нагрузочный тест {n % 1000}",
+        "board_name": LOADTEST_BOARD,
+        "from_column": "Очередь",
+        "to_column": "В работе",
+        "assignees": [f"Тестовый {n % 20}"],
+        "move_time": datetime.now(timezone.utc).isoformat(),
+        "time_spent": float(n % 3600),
+    }
+
+
+async def log_move_request(client, n):
+    return await client.post("/log_move/", json=move_payload(n))
+
+
+async def admin_request(client, n):
+    return await client.get("/admin/settings/taskmovelog/")
+
+
+async def admin_login(client, user, password):
+    response = await client.get("/admin/login/")
+    csrf = client.cookies.get("csrftoken")
+    response = await client.post(
+        "/admin/login/?next=/admin/",
+        data={
+            "username": user,
+            "password": password,
+            "csrfmiddlewaretoken": csrf,
+        },
+        headers={"Referer": str(response.url)},
+    )
+    if "sessionid" not in client.cookies:
+        raise SystemExit("Не удалось войти в админку")
+
+
+async def run(client, request, duration, concurrency):
+    latencies = []
+    errors = 0
+    counter = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors, counter
+        while time.perf_counter() < deadline:
+            counter += 1
+            started = time.perf_counter()
+            try:
+                response = await request(client, counter)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "errors": errors,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def report(name, result):
+    print(
+        f"{name:<10} {result['requests']:>8} запр. "
+        f"{result['rps']:>9.1f} rps  p50 {result['p50']:>7.1f} мс  "
+        f"p99 {result['p99']:>7.1f} мс  ошибок {result['errors']}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--admin-user")
+    parser.add_argument("--admin-password")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=30
+    ) as client:
+        report(
+            "log_move",
+            await run(
+                client, log_move_request, args.duration, args.concurrency
+            ),
+        )
+        if args.admin_user:
+            await admin_login(client, args.admin_user, args.admin_password)
+            report(
+                "admin",
+                await run(
+                    client, admin_request, args.duration, args.concurrency
+                ),
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,32 @@
+from itertools import islice
+
 from django.contrib import admin
 from django.contrib.auth.models import Group, User
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
 
-from .models import Settings, TaskMoveLog
+from .archive import read_month
+from .changelist import (
+    DimensionFilter,
+    EstimatedCountPaginator,
+    KeysetChangeList,
+)
+from .export import FIELDS, FORMATS, export_response
+from .models import (
+    ArchivedMonth,
+    Board,
+    Column,
+    Member,
+    MonthlyBoardStats,
+    MonthlyColumnStats,
+    Settings,
+    Task,
+    TaskMoveLog,
+)
 
 admin.site.unregister(User)
 admin.site.unregister(Group)
@@ -9,28 +34,207 @@ admin.site.unregister(Group)
 
 @admin.register(Settings)
 class SettingsAdmin(admin.ModelAdmin):
-    list_display = ("id", "api_key", "week_key")
-    search_fields = ("api_key", "week_key")
+    list_display = ("id", "name", "api_key", "week_key", "chat_ids")
+    search_fields = ("name", "api_key", "week_key", "chat_ids")
+
+
+@admin.register(Board)
+class BoardAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "weeek_id")
+    search_fields = ("name",)
+
+
+@admin.register(Column)
+class ColumnAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "board")
+    list_filter = ("board",)
+    search_fields = ("name",)
+
+
+@admin.register(Member)
+class MemberAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "weeek_id")
+    search_fields = ("name",)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("weeek_id", "title")
+    search_fields = ("weeek_id", "title")
 
 
 @admin.register(TaskMoveLog)
 class TaskMoveLogAdmin(admin.ModelAdmin):
     list_display = (
-        "task_id",
-        "task_title",
+        "task_weeek_id",
+        "task",
         "from_column",
         "to_column",
-        "user_name",
+        "assignee_names",
         "move_time",
         "time_spent",
-        "board_name",
+        "cycle_time",
+        "lead_time",
+        "board",
     )
-    search_fields = ("task_id", "task_title", "user_name", "board_name")
+    list_select_related = ("task", "board", "from_column", "to_column")
+    search_fields = ("task__weeek_id", "task__title")
+    # Фильтры по справочникам — сравнение целочисленных ключей
     list_filter = (
-        "from_column",
-        "to_column",
-        "user_name",
-        "board_name",
+        ("board", DimensionFilter),
+        ("from_column", DimensionFilter),
+        ("to_column", DimensionFilter),
+        ("assignees", DimensionFilter),
         "move_time",
     )
     ordering = ("-move_time",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    actions = ("export_csv", "export_ndjson")
+    change_list_template = "admin/settings/taskmovelog/change_list.html"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("assignees")
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_urls(self):
+        return [
+            path(
+                "export/<str:fmt>/",
+                self.admin_site.admin_view(self.export_view),
+                name="settings_taskmovelog_export",
+            ),
+        ] + super().get_urls()
+
+    def export_view(self, request, fmt):
+        """Выгрузка всего журнала с текущими фильтрами и поиском."""
+        if fmt not in FORMATS:
+            raise Http404
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        queryset = self.get_changelist_instance(request).queryset
+        return export_response(request, queryset, fmt)
+
+    @admin.action(description="Выгрузить выбранные в CSV")
+    def export_csv(self, request, queryset):
+        return export_response(request, queryset, "csv")
+
+    @admin.action(description="Выгрузить выбранные в NDJSON")
+    def export_ndjson(self, request, queryset):
+        return export_response(request, queryset, "ndjson")
+
+    @admin.display(description="ID задачи", ordering="task__weeek_id")
+    def task_weeek_id(self, obj):
+        return obj.task.weeek_id
+
+    @admin.display(description="Исполнители")
+    def assignee_names(self, obj):
+        return (
+            ", ".join(member.name for member in obj.assignees.all())
+            or "Не назначен"
+        )
+
+
+@admin.register(MonthlyColumnStats)
+class MonthlyColumnStatsAdmin(admin.ModelAdmin):
+    list_display = ("month", "board", "column", "moves", "p50", "p90", "p99")
+    list_select_related = ("board", "column")
+    list_filter = ("board", "month")
+    ordering = ("-month",)
+
+
+@admin.register(MonthlyBoardStats)
+class MonthlyBoardStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "month",
+        "board",
+        "completed",
+        "cycle_p50",
+        "cycle_p90",
+        "lead_p50",
+        "lead_p90",
+    )
+    list_select_related = ("board",)
+    list_filter = ("board", "month")
+    ordering = ("-month",)
+
+
+@admin.register(ArchivedMonth)
+class ArchivedMonthAdmin(admin.ModelAdmin):
+    """Выгруженные месяцы; строки читаются из файла по запросу."""
+
+    ROWS_PER_PAGE = 100
+
+    list_display = ("month", "rows", "size", "archived_at", "open_rows")
+    readonly_fields = ("month", "path", "rows", "size", "archived_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:object_id>/rows/",
+                self.admin_site.admin_view(self.rows_view),
+                name="settings_archivedmonth_rows",
+            ),
+        ] + super().get_urls()
+
+    @admin.display(description="Строки")
+    def open_rows(self, obj):
+        return format_html(
+            '<a href="{}">Открыть</a>',
+            reverse("admin:settings_archivedmonth_rows", args=(obj.pk,)),
+        )
+
+    def rows_view(self, request, object_id):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        archived = get_object_or_404(ArchivedMonth, pk=object_id)
+        q = request.GET.get("q", "").strip().lower()
+        board = request.GET.get("board", "").strip()
+        column = request.GET.get("column", "").strip()
+        try:
+            page = max(1, int(request.GET.get("page", 1)))
+        except ValueError:
+            page = 1
+
+        def matches(row):
+            if (
+                q
+                and q not in row["task_id"]
+                and q not in (row["task_title"].lower())
+            ):
+                return False
+            if board and row["board"] != board:
+                return False
+            if column and column not in (row["from_column"], row["to_column"]):
+                return False
+            return True
+
+        # Файл читается потоком: в памяти только текущая страница
+        found = (row for row in read_month(archived.path) if matches(row))
+        start = (page - 1) * self.ROWS_PER_PAGE
+        rows = list(islice(found, start, start + self.ROWS_PER_PAGE + 1))
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Архив за {archived}",
+            "archived": archived,
+            "fields": FIELDS,
+            "rows": [
+                [row[field] for field in FIELDS]
+                for row in rows[: self.ROWS_PER_PAGE]
+            ],
+            "has_next": len(rows) > self.ROWS_PER_PAGE,
+            "page": page,
+            "q": q,
+            "board": board,
+            "column": column,
+        }
+        return TemplateResponse(
+            request, "admin/settings/archivedmonth/rows.html", context
+        )
@@ -0,0 +1,170 @@
+"""
+Архив журнала перемещений по месяцам.
+
+Целые месяцы старше срока хранения выгружаются в сжатые CSV
+(move-log-ГГГГ-ММ.csv.gz) и удаляются из TaskMoveLog. Перед удалением по
+каждому месяцу сохраняются сводки по колонкам (MonthlyColumnStats) и
+cycle/lead time по доскам (MonthlyBoardStats), так что статистика
+переживает выгрузку строк.
+"""
+
+import csv
+import datetime
+import gzip
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .export import FIELDS, log_row, with_related
+from .models import (
+    ArchivedMonth,
+    MonthlyBoardStats,
+    MonthlyColumnStats,
+    TaskMoveLog,
+)
+from .stats import summarize
+
+BATCH_SIZE = 2000
+
+
+def next_month(month):
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def month_bounds(month):
+    """Начало и конец месяца (aware datetime) для фильтра по move_time."""
+    start = datetime.datetime.combine(month, datetime.time())
+    end = datetime.datetime.combine(next_month(month), datetime.time())
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def archive_cutoff(days=None, now=None):
+    """
+    Начало месяца, в который попадает now - days: архивируются только
+    месяцы целиком.
+    """
+    if days is None:
+        days = settings.MOVE_LOG_RETENTION_DAYS
+    moment = (now or timezone.now()) - datetime.timedelta(days=days)
+    return month_bounds(timezone.localdate(moment).replace(day=1))[0]
+
+
+def archive_path(month):
+    return settings.MOVE_LOG_ARCHIVE_DIR / f"move-log-{month:%Y-%m}.csv.gz"
+
+
+def read_month(path):
+    """Строки архивного месяца как словари, без загрузки файла целиком."""
+    seen = set()
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # Если прошлый запуск упал после записи, строка могла попасть
+            # в файл дважды
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            yield row
+
+
+def months_to_archive(cutoff):
+    return list(
+        TaskMoveLog.objects.filter(move_time__lt=cutoff).dates(
+            "move_time", "month"
+        )
+    )
+
+
+def board_stats(month, board_id, cycle_times, lead_times):
+    cycle = summarize(cycle_times[board_id])
+    lead = summarize(lead_times[board_id])
+    return MonthlyBoardStats(
+        month=month,
+        board_id=board_id,
+        completed=max(cycle["count"], lead["count"]),
+        cycle_p50=cycle["p50"],
+        cycle_p90=cycle["p90"],
+        cycle_p99=cycle["p99"],
+        lead_p50=lead["p50"],
+        lead_p90=lead["p90"],
+        lead_p99=lead["p99"],
+    )
+
+
+def archive_month(month):
+    """Выгружает месяц в архив, обновляет сводки и удаляет строки."""
+    start, end = month_bounds(month)
+    logs = with_related(
+        TaskMoveLog.objects.filter(move_time__gte=start, move_time__lt=end)
+    ).order_by("id")
+    path = archive_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not path.exists()
+
+    ids = []
+    # Повторный запуск по тому же месяцу дописывает новый gzip-member
+    with gzip.open(path, "at", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(FIELDS)
+        for log in logs.iterator(chunk_size=BATCH_SIZE):
+            writer.writerow(log_row(log))
+            ids.append(log.id)
+
+    # Сводки считаются по всему файлу, включая ранее выгруженное
+    values = defaultdict(list)
+    cycle_times = defaultdict(list)
+    lead_times = defaultdict(list)
+    rows = 0
+    for row in read_month(path):
+        board_id = int(row["board_id"])
+        key = (board_id, int(row["from_column_id"]))
+        values[key].append(float(row["time_spent"]))
+        # Пустая ячейка — задача этим переходом не завершена
+        if row["cycle_time"]:
+            cycle_times[board_id].append(float(row["cycle_time"]))
+        if row["lead_time"]:
+            lead_times[board_id].append(float(row["lead_time"]))
+        rows += 1
+
+    with transaction.atomic():
+        MonthlyColumnStats.objects.filter(month=month).delete()
+        MonthlyColumnStats.objects.bulk_create(
+            MonthlyColumnStats(
+                month=month,
+                board_id=board_id,
+                column_id=column_id,
+                moves=len(spent),
+                time_spent_total=sum(spent),
+                p50=summary["p50"],
+                p90=summary["p90"],
+                p99=summary["p99"],
+            )
+            for (board_id, column_id), spent in values.items()
+            for summary in (summarize(spent),)
+        )
+        MonthlyBoardStats.objects.filter(month=month).delete()
+        MonthlyBoardStats.objects.bulk_create(
+            board_stats(month, board_id, cycle_times, lead_times)
+            for board_id in cycle_times.keys() | lead_times.keys()
+        )
+        ArchivedMonth.objects.update_or_create(
+            month=month,
+            defaults={
+                "path": str(path),
+                "rows": rows,
+                "size": path.stat().st_size,
+            },
+        )
+        for i in range(0, len(ids), BATCH_SIZE):
+            TaskMoveLog.objects.filter(id__in=ids[i : i + BATCH_SIZE]).delete()
+    return len(ids)
+
+
+def archive(days=None):
+    """Архивирует все целые месяцы старше срока. {месяц: строк}."""
+    return {
+        month: archive_month(month)
+        for month in months_to_archive(archive_cutoff(days))
+    }
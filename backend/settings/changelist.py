@@ -0,0 +1,171 @@
+"""
+Быстрый список журнала перемещений в админке.
+
+Вместо COUNT(*) по всей таблице показывается оценка: для таблицы без
+фильтров — по статистике БД или диапазону id, с фильтрами — точный счёт,
+но не дальше COUNT_LIMIT строк. Страницы листаются по ключу
+(move_time, id) вместо OFFSET, а варианты фильтров берутся из
+справочников и кэшируются.
+"""
+
+import datetime
+
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+
+from .models import Column
+
+CURSOR_VAR = "cursor"
+COUNT_LIMIT = 10000
+FILTER_CHOICES_TTL = 300
+
+
+def estimated_count(queryset):
+    """(число строк, оценка ли это)."""
+    if not queryset.query.where:
+        table = queryset.model._meta.db_table
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0], True
+        bounds = queryset.model.objects.aggregate(
+            low=Min("pk"), high=Max("pk")
+        )
+        if bounds["high"] is None:
+            return 0, False
+        return bounds["high"] - bounds["low"] + 1, True
+    # С фильтрами считаем точно, но не дальше COUNT_LIMIT строк
+    count = queryset.order_by()[: COUNT_LIMIT + 1].count()
+    return min(count, COUNT_LIMIT), count > COUNT_LIMIT
+
+
+class EstimatedCountPaginator(Paginator):
+    """Постраничный режим (при сортировке по колонкам) без COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)[0]
+
+
+def format_cursor(log):
+    return f"{log.move_time.timestamp()}_{log.pk}"
+
+
+def parse_cursor(value):
+    try:
+        timestamp, pk = value.split("_")
+        return (
+            datetime.datetime.fromtimestamp(
+                float(timestamp), datetime.timezone.utc
+            ),
+            int(pk),
+        )
+    except (AttributeError, ValueError):
+        return None
+
+
+class KeysetChangeList(ChangeList):
+    """
+    При сортировке по умолчанию (-move_time, -id) следующая страница
+    выбирается условием «строго раньше последней показанной строки»,
+    что использует индекс и не зависит от номера страницы.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        super().__init__(request, *args, **kwargs)
+        # Из params строятся скрытые поля формы поиска: новый поиск
+        # начинается с первой страницы
+        self.params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(CURSOR_VAR, None)
+        return params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Ссылки фильтров, сортировки и date hierarchy ведут на первую
+        # страницу; курсор остаётся, только если его задали явно
+        new_params = dict(new_params or {})
+        new_params.setdefault(CURSOR_VAR, None)
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        self.keyset = ORDER_VAR not in self.params and not self.show_all
+        self.cursor = parse_cursor(request.GET.get(CURSOR_VAR))
+        self.next_cursor = None
+        if not self.keyset:
+            # Счётчик берётся из EstimatedCountPaginator
+            super().get_results(request)
+            self.count_is_estimate = True
+            return
+
+        self.result_count, self.count_is_estimate = estimated_count(
+            self.queryset
+        )
+        queryset = self.queryset
+        if self.cursor:
+            move_time, pk = self.cursor
+            queryset = queryset.filter(
+                Q(move_time__lt=move_time) | Q(move_time=move_time, pk__lt=pk)
+            )
+        page = list(queryset[: self.list_per_page + 1])
+        if len(page) > self.list_per_page:
+            page = page[: self.list_per_page]
+            self.next_cursor = format_cursor(page[-1])
+
+        self.result_list = page
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+
+    def count_label(self):
+        if not self.count_is_estimate:
+            return str(self.result_count)
+        if self.queryset.query.where and self.result_count >= COUNT_LIMIT:
+            return f"{self.result_count}+"
+        return f"≈{self.result_count}"
+
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    def first_page_url(self):
+        return self.get_query_string()
+
+
+class DimensionFilter(admin.RelatedFieldListFilter):
+    """Варианты фильтра из справочника, с кэшем на FILTER_CHOICES_TTL."""
+
+    def field_choices(self, field, request, model_admin):
+        key = f"admin-choices:{model_admin.model._meta.label}:{field.name}"
+        choices = cache.get(key)
+        if choices is None:
+            choices = dimension_choices(field.related_model)
+            cache.set(key, choices, FILTER_CHOICES_TTL)
+        return choices
+
+
+def dimension_choices(model):
+    if model is Column:
+        # Одинаковые колонки бывают на разных досках
+        return [
+            (pk, f"{board} / {name}")
+            for pk, board, name in Column.objects.order_by(
+                "board__name", "name"
+            ).values_list("pk", "board__name", "name")
+        ]
+    return list(model.objects.order_by("name").values_list("pk", "name"))
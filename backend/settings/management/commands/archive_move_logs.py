@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from settings.archive import (
+    archive_cutoff,
+    archive_month,
+    months_to_archive,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает месяцы журнала перемещений старше срока хранения "
+        "в сжатые CSV и удаляет их из базы"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.MOVE_LOG_RETENTION_DAYS,
+            help="Срок хранения строк в базе, дней",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать, какие месяцы будут выгружены",
+        )
+
+    def handle(self, *args, days, dry_run, **options):
+        months = months_to_archive(archive_cutoff(days))
+        if not months:
+            self.stdout.write("Нечего архивировать")
+            return
+        for month in months:
+            if dry_run:
+                self.stdout.write(f"{month:%Y-%m}: будет выгружен")
+                continue
+            rows = archive_month(month)
+            self.stdout.write(
+                self.style.SUCCESS(f"{month:%Y-%m}: выгружено строк: {rows}")
+            )
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0008_remove_taskmovelog_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="settings",
+            name="chat_ids",
+            field=models.TextField(
+                blank=True,
+                help_text="Telegram chat id через запятую, которые работают с этим пространством WEEEK",
+                verbose_name="ID чатов",
+            ),
+        ),
+        migrations.AddField(
+            model_name="settings",
+            name="name",
+            field=models.CharField(
+                blank=True, max_length=255, verbose_name="Пространство"
+            ),
+        ),
+    ]
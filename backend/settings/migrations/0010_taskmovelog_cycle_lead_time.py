@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0009_settings_name_chat_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="cycle_time",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="lead_time",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,170 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0010_taskmovelog_cycle_lead_time"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Board",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weeek_id",
+                    models.BigIntegerField(blank=True, null=True, unique=True),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, verbose_name="Доска"),
+                ),
+            ],
+            options={
+                "verbose_name": "Доска",
+                "verbose_name_plural": "Доски",
+            },
+        ),
+        migrations.CreateModel(
+            name="Member",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Исполнитель"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Исполнитель",
+                "verbose_name_plural": "Исполнители",
+            },
+        ),
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("weeek_id", models.CharField(max_length=100, unique=True)),
+                (
+                    "title",
+                    models.CharField(max_length=255, verbose_name="Задача"),
+                ),
+            ],
+            options={
+                "verbose_name": "Задача",
+                "verbose_name_plural": "Задачи",
+            },
+        ),
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="board_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="settings.board",
+            ),
+        ),
+        migrations.CreateModel(
+            name="Column",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, verbose_name="Колонка"),
+                ),
+                (
+                    "board",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="columns",
+                        to="settings.board",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Колонка",
+                "verbose_name_plural": "Колонки",
+            },
+        ),
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="from_column_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="settings.column",
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="to_column_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="settings.column",
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="assignees",
+            field=models.ManyToManyField(
+                blank=True, related_name="+", to="settings.member"
+            ),
+        ),
+        migrations.AddField(
+            model_name="taskmovelog",
+            name="task_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="settings.task",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="column",
+            constraint=models.UniqueConstraint(
+                fields=("board", "name"), name="unique_board_column"
+            ),
+        ),
+    ]
@@ -0,0 +1,153 @@
+from django.db import migrations
+from django.db.models import F, Min, Window
+
+BATCH_SIZE = 2000
+
+
+def forwards(apps, schema_editor):
+    """
+    Переносит текстовые поля журнала в справочники. Одно перемещение
+    раньше писалось строкой на каждого исполнителя: из группы строк
+    остаётся первая, а исполнители всей группы попадают в assignees.
+    """
+    TaskMoveLog = apps.get_model("settings", "TaskMoveLog")
+    Board = apps.get_model("settings", "Board")
+    Column = apps.get_model("settings", "Column")
+    Member = apps.get_model("settings", "Member")
+    Task = apps.get_model("settings", "Task")
+    Assignee = TaskMoveLog.assignees.through
+
+    boards, columns, members, tasks = {}, {}, {}, {}
+
+    def board_for(name):
+        if name not in boards:
+            boards[name] = Board.objects.create(name=name)
+        return boards[name]
+
+    def column_for(board, name):
+        key = (board.id, name)
+        if key not in columns:
+            columns[key] = Column.objects.create(board=board, name=name)
+        return columns[key]
+
+    def member_for(name):
+        if name not in members:
+            members[name], _ = Member.objects.get_or_create(name=name)
+        return members[name]
+
+    def task_for(weeek_id, title):
+        if weeek_id not in tasks:
+            tasks[weeek_id], _ = Task.objects.get_or_create(
+                weeek_id=weeek_id, defaults={"title": title}
+            )
+        return tasks[weeek_id]
+
+    def save(changed, links):
+        TaskMoveLog.objects.bulk_update(
+            changed,
+            ["task_ref", "board_ref", "from_column_ref", "to_column_ref"],
+        )
+        Assignee.objects.bulk_create(links)
+        changed.clear()
+        links.clear()
+
+    # Дубликаты находит сама база: у строк одного перемещения общий
+    # first (наименьший id группы), и сортировка по нему ставит их подряд
+    rows = (
+        TaskMoveLog.objects.annotate(
+            first=Window(
+                Min("id"),
+                partition_by=[
+                    F("task_id"),
+                    F("move_time"),
+                    F("from_column"),
+                    F("to_column"),
+                    F("board_name"),
+                ],
+            )
+        )
+        .order_by("first", "id")
+        .values_list(
+            "id",
+            "first",
+            "task_id",
+            "task_title",
+            "board_name",
+            "from_column",
+            "to_column",
+            "user_name",
+        )
+    )
+    changed, links = [], []
+    group_members = set()
+    for (
+        row_id,
+        first,
+        task_id,
+        title,
+        board_name,
+        from_,
+        to,
+        user,
+    ) in rows.iterator(chunk_size=BATCH_SIZE):
+        if row_id == first:
+            board = board_for(board_name or "")
+            changed.append(
+                TaskMoveLog(
+                    id=row_id,
+                    task_ref=task_for(task_id, title),
+                    board_ref=board,
+                    from_column_ref=column_for(board, from_),
+                    to_column_ref=column_for(board, to),
+                )
+            )
+            group_members = set()
+        if user and user != "Не назначен":
+            member = member_for(user)
+            if member.id not in group_members:
+                group_members.add(member.id)
+                links.append(
+                    Assignee(taskmovelog_id=first, member_id=member.id)
+                )
+        if len(changed) >= BATCH_SIZE or len(links) >= BATCH_SIZE:
+            save(changed, links)
+    save(changed, links)
+
+    # Остальные строки групп справочники не получили — это дубликаты
+    duplicates = TaskMoveLog.objects.filter(board_ref__isnull=True)
+    while True:
+        ids = list(duplicates.values_list("id", flat=True)[:BATCH_SIZE])
+        if not ids:
+            break
+        TaskMoveLog.objects.filter(id__in=ids).delete()
+
+
+def backwards(apps, schema_editor):
+    """Возвращает текстовые поля: строка на каждого исполнителя."""
+    TaskMoveLog = apps.get_model("settings", "TaskMoveLog")
+    for log in TaskMoveLog.objects.select_related(
+        "task_ref", "board_ref", "from_column_ref", "to_column_ref"
+    ).prefetch_related("assignees"):
+        names = [member.name for member in log.assignees.all()]
+        log.task_id = log.task_ref.weeek_id
+        log.task_title = log.task_ref.title
+        log.board_name = log.board_ref.name
+        log.from_column = log.from_column_ref.name
+        log.to_column = log.to_column_ref.name
+        log.user_name = names[0] if names else "Не назначен"
+        log.save()
+        for name in names[1:]:
+            log.pk = None
+            log.user_name = name
+            log.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0011_board_column_member_task"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,113 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0012_taskmovelog_to_dimensions"),
+    ]
+
+    operations = [
+        # Значение по умолчанию нужно только для отката миграции
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="task_title",
+            field=models.CharField(default="", max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="task_id",
+            field=models.CharField(default="", max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="from_column",
+            field=models.CharField(default="", max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="to_column",
+            field=models.CharField(default="", max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="user_name",
+            field=models.CharField(default="", max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="board_name",
+            field=models.CharField(default=""),
+        ),
+        migrations.RemoveField(model_name="taskmovelog", name="task_title"),
+        migrations.RemoveField(model_name="taskmovelog", name="task_id"),
+        migrations.RemoveField(model_name="taskmovelog", name="from_column"),
+        migrations.RemoveField(model_name="taskmovelog", name="to_column"),
+        migrations.RemoveField(model_name="taskmovelog", name="user_name"),
+        migrations.RemoveField(model_name="taskmovelog", name="board_name"),
+        migrations.RenameField(
+            model_name="taskmovelog", old_name="task_ref", new_name="task"
+        ),
+        migrations.RenameField(
+            model_name="taskmovelog", old_name="board_ref", new_name="board"
+        ),
+        migrations.RenameField(
+            model_name="taskmovelog",
+            old_name="from_column_ref",
+            new_name="from_column",
+        ),
+        migrations.RenameField(
+            model_name="taskmovelog",
+            old_name="to_column_ref",
+            new_name="to_column",
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="task",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="moves",
+                to="settings.task",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="board",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="moves",
+                to="settings.board",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="from_column",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="moves_out",
+                to="settings.column",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="to_column",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="moves_in",
+                to="settings.column",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="assignees",
+            field=models.ManyToManyField(
+                blank=True, related_name="moves", to="settings.member"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskmovelog",
+            name="move_time",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0013_taskmovelog_foreign_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(unique=True, verbose_name="Месяц")),
+                (
+                    "path",
+                    models.CharField(max_length=512, verbose_name="Файл"),
+                ),
+                (
+                    "rows",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Строк"
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Размер, байт"
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Обновлён"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Архивный месяц",
+                "verbose_name_plural": "Архив журнала",
+                "ordering": ("-month",),
+            },
+        ),
+        migrations.CreateModel(
+            name="MonthlyColumnStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="Месяц")),
+                (
+                    "moves",
+                    models.PositiveIntegerField(verbose_name="Перемещений"),
+                ),
+                ("time_spent_total", models.FloatField()),
+                ("p50", models.FloatField(null=True)),
+                ("p90", models.FloatField(null=True)),
+                ("p99", models.FloatField(null=True)),
+                (
+                    "board",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_stats",
+                        to="settings.board",
+                    ),
+                ),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_stats",
+                        to="settings.column",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сводка за месяц",
+                "verbose_name_plural": "Сводки за месяц",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("month", "column"), name="unique_month_column"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0014_archive"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskmovelog",
+            index=models.Index(
+                fields=["-move_time", "-id"], name="taskmovelog_keyset"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0015_taskmovelog_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="member",
+            name="weeek_id",
+            field=models.CharField(
+                blank=True, max_length=100, null=True, unique=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="member",
+            name="name",
+            field=models.CharField(max_length=255, verbose_name="Исполнитель"),
+        ),
+    ]
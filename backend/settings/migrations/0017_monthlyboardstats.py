@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0016_member_weeek_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyBoardStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="Месяц")),
+                (
+                    "completed",
+                    models.PositiveIntegerField(verbose_name="Завершено"),
+                ),
+                ("cycle_p50", models.FloatField(null=True)),
+                ("cycle_p90", models.FloatField(null=True)),
+                ("cycle_p99", models.FloatField(null=True)),
+                ("lead_p50", models.FloatField(null=True)),
+                ("lead_p90", models.FloatField(null=True)),
+                ("lead_p99", models.FloatField(null=True)),
+                (
+                    "board",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_flow",
+                        to="settings.board",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сводка доски за месяц",
+                "verbose_name_plural": "Сводки досок за месяц",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("month", "board"), name="unique_month_board"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("settings", "0017_monthlyboardstats"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="taskmovelog",
+            options={
+                "verbose_name": "Перемещение задачи",
+                "verbose_name_plural": "Перемещения задач",
+            },
+        ),
+    ]
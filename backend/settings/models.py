@@ -5,21 +5,187 @@ from django.db import models
 class Settings(models.Model):
     api_key = models.CharField("TgBotApiKey", max_length=512, null=True)
     week_key = models.CharField("WeekApiKey", max_length=512, null=True)
+    name = models.CharField("Пространство", max_length=255, blank=True)
+    chat_ids = models.TextField(
+        "ID чатов",
+        blank=True,
+        help_text="Telegram chat id через запятую, "
+        "которые работают с этим пространством WEEEK",
+    )
 
     class Meta:
         verbose_name = "Настройки"
         verbose_name_plural = "Настройки"
 
+    def chat_id_list(self):
+        return [
+            int(chat_id)
+            for chat_id in self.chat_ids.replace(" ", "").split(",")
+            if chat_id.lstrip("-").isdigit()
+        ]
+
+
+class Board(models.Model):
+    weeek_id = models.BigIntegerField(null=True, blank=True, unique=True)
+    name = models.CharField("Доска", max_length=255)
+
+    class Meta:
+        verbose_name = "Доска"
+        verbose_name_plural = "Доски"
+
+    def __str__(self):
+        return self.name
+
+
+class Column(models.Model):
+    board = models.ForeignKey(
+        Board, on_delete=models.CASCADE, related_name="columns"
+    )
+    name = models.CharField("Колонка", max_length=255)
+
+    class Meta:
+        verbose_name = "Колонка"
+        verbose_name_plural = "Колонки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("board", "name"), name="unique_board_column"
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Member(models.Model):
+    # Имя в WEEEK можно сменить, поэтому ключ — id участника; у записей
+    # из старых перемещений (только имя) его нет
+    weeek_id = models.CharField(
+        max_length=100, null=True, blank=True, unique=True
+    )
+    name = models.CharField("Исполнитель", max_length=255)
+
+    class Meta:
+        verbose_name = "Исполнитель"
+        verbose_name_plural = "Исполнители"
+
+    def __str__(self):
+        return self.name
+
+
+class Task(models.Model):
+    weeek_id = models.CharField(max_length=100, unique=True)
+    title = models.CharField("Задача", max_length=255)
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+
+    def __str__(self):
+        return self.title
+
 
 class TaskMoveLog(models.Model):
-    task_title = models.CharField(max_length=255)
-    task_id = models.CharField(max_length=100)
-    from_column = models.CharField(max_length=255)
-    to_column = models.CharField(max_length=255)
-    user_name = models.CharField(max_length=255)
-    move_time = models.DateTimeField()
+    """Перемещение задачи между колонками (одна строка на перемещение)."""
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="moves"
+    )
+    board = models.ForeignKey(
+        Board, on_delete=models.CASCADE, related_name="moves"
+    )
+    from_column = models.ForeignKey(
+        Column, on_delete=models.PROTECT, related_name="moves_out"
+    )
+    to_column = models.ForeignKey(
+        Column, on_delete=models.PROTECT, related_name="moves_in"
+    )
+    assignees = models.ManyToManyField(
+        Member, blank=True, related_name="moves"
+    )
+    move_time = models.DateTimeField(db_index=True)
     time_spent = models.FloatField()
-    board_name = models.CharField()
+    # Заполняются при завершении задачи, секунды
+    cycle_time = models.FloatField(null=True, blank=True)
+    lead_time = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Перемещение задачи"
+        verbose_name_plural = "Перемещения задач"
+        indexes = [
+            # Постраничный просмотр по ключу (move_time, id) в админке
+            models.Index(
+                fields=("-move_time", "-id"), name="taskmovelog_keyset"
+            )
+        ]
+
+    def __str__(self):
+        return f"Move of task {self.task_id} from {self.from_column_id} to {self.to_column_id}"
+
+
+class ArchivedMonth(models.Model):
+    """Месяц журнала перемещений, выгруженный в сжатый CSV."""
+
+    month = models.DateField("Месяц", unique=True)
+    path = models.CharField("Файл", max_length=512)
+    rows = models.PositiveIntegerField("Строк", default=0)
+    size = models.PositiveBigIntegerField("Размер, байт", default=0)
+    archived_at = models.DateTimeField("Обновлён", auto_now=True)
+
+    class Meta:
+        verbose_name = "Архивный месяц"
+        verbose_name_plural = "Архив журнала"
+        ordering = ("-month",)
 
     def __str__(self):
-        return f"Move of task {self.task_id} from {self.from_column} to {self.to_column}"
+        return self.month.strftime("%Y-%m")
+
+
+class MonthlyColumnStats(models.Model):
+    """Сводка времени в колонке за архивный месяц."""
+
+    month = models.DateField("Месяц")
+    board = models.ForeignKey(
+        Board, on_delete=models.CASCADE, related_name="monthly_stats"
+    )
+    column = models.ForeignKey(
+        Column, on_delete=models.CASCADE, related_name="monthly_stats"
+    )
+    moves = models.PositiveIntegerField("Перемещений")
+    time_spent_total = models.FloatField()
+    p50 = models.FloatField(null=True)
+    p90 = models.FloatField(null=True)
+    p99 = models.FloatField(null=True)
+
+    class Meta:
+        verbose_name = "Сводка за месяц"
+        verbose_name_plural = "Сводки за месяц"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("month", "column"), name="unique_month_column"
+            )
+        ]
+
+
+class MonthlyBoardStats(models.Model):
+    """Cycle time и lead time завершённых задач доски за архивный месяц."""
+
+    month = models.DateField("Месяц")
+    board = models.ForeignKey(
+        Board, on_delete=models.CASCADE, related_name="monthly_flow"
+    )
+    completed = models.PositiveIntegerField("Завершено")
+    cycle_p50 = models.FloatField(null=True)
+    cycle_p90 = models.FloatField(null=True)
+    cycle_p99 = models.FloatField(null=True)
+    lead_p50 = models.FloatField(null=True)
+    lead_p90 = models.FloatField(null=True)
+    lead_p99 = models.FloatField(null=True)
+
+    class Meta:
+        verbose_name = "Сводка доски за месяц"
+        verbose_name_plural = "Сводки досок за месяц"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("month", "board"), name="unique_month_board"
+            )
+        ]
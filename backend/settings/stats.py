@@ -0,0 +1,18 @@
+import math
+
+
+def percentile(values, p):
+    """Перцентиль по отсортированному списку (nearest rank)."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+    }
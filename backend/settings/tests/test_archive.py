@@ -0,0 +1,108 @@
+import datetime
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import archive
+from ..models import (
+    ArchivedMonth,
+    Board,
+    Column,
+    MonthlyBoardStats,
+    MonthlyColumnStats,
+    Task,
+    TaskMoveLog,
+)
+
+MONTH = datetime.date(2024, 1, 1)
+START = datetime.datetime(2024, 1, 10, tzinfo=datetime.timezone.utc)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = override_settings(MOVE_LOG_ARCHIVE_DIR=Path(directory.name))
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+        self.board = Board.objects.create(name="Разработка")
+        todo = Column.objects.create(board=self.board, name="Сделать")
+        done = Column.objects.create(board=self.board, name="Готово")
+        task = Task.objects.create(weeek_id="1", title="Задача")
+        TaskMoveLog.objects.bulk_create(
+            TaskMoveLog(
+                task=task,
+                board=self.board,
+                from_column=todo,
+                to_column=done,
+                move_time=START + datetime.timedelta(days=i),
+                time_spent=(i + 1) * 60,
+                cycle_time=600 if i == 2 else None,
+                lead_time=900 if i == 2 else None,
+            )
+            for i in range(3)
+        )
+        # Свежая строка остаётся в базе
+        TaskMoveLog.objects.create(
+            task=task,
+            board=self.board,
+            from_column=todo,
+            to_column=done,
+            move_time=START.replace(month=3),
+            time_spent=1,
+        )
+
+    def test_whole_old_months_only(self):
+        now = datetime.datetime(2024, 3, 15, tzinfo=datetime.timezone.utc)
+        cutoff = archive.archive_cutoff(days=30, now=now)
+        self.assertEqual(cutoff.date(), datetime.date(2024, 2, 1))
+        self.assertEqual(archive.months_to_archive(cutoff), [MONTH])
+
+    def test_month_rolled_up_and_deleted(self):
+        self.assertEqual(archive.archive_month(MONTH), 3)
+        self.assertEqual(TaskMoveLog.objects.count(), 1)
+        stats = MonthlyColumnStats.objects.get()
+        self.assertEqual((stats.moves, stats.p50), (3, 120))
+        flow = MonthlyBoardStats.objects.get()
+        self.assertEqual((flow.completed, flow.cycle_p50), (1, 600))
+        archived = ArchivedMonth.objects.get()
+        self.assertEqual(archived.rows, 3)
+        self.assertEqual(len(list(archive.read_month(archived.path))), 3)
+
+    def test_rerun_after_failure_does_not_double_count(self):
+        # Файл записан, но транзакция упала: строки остались в базе
+        with mock.patch.object(
+            ArchivedMonth.objects, "update_or_create", side_effect=OSError
+        ):
+            with self.assertRaises(OSError):
+                archive.archive_month(MONTH)
+        self.assertEqual(TaskMoveLog.objects.count(), 4)
+
+        archive.archive_month(MONTH)
+        self.assertEqual(ArchivedMonth.objects.get().rows, 3)
+        self.assertEqual(MonthlyColumnStats.objects.get().moves, 3)
+        self.assertEqual(MonthlyBoardStats.objects.get().completed, 1)
+
+    def test_rows_view_requires_view_permission(self):
+        archive.archive_month(MONTH)
+        url = reverse(
+            "admin:settings_archivedmonth_rows",
+            args=[ArchivedMonth.objects.get().pk],
+        )
+        staff = User.objects.create_user("staff", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_superuser("admin"))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_dwell_stats_returns_rollups(self):
+        archive.archive_month(MONTH)
+        data = self.client.get(reverse("dwell-stats")).json()["Разработка"]
+        self.assertEqual(data["archived"]["2024-01"]["Сделать"]["count"], 3)
+        flow = data["archived_flow"]["2024-01"]
+        self.assertEqual(flow["lead_time"]["p50"], 900)
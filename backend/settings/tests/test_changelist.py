@@ -0,0 +1,107 @@
+import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from ..changelist import CURSOR_VAR, format_cursor, parse_cursor
+from ..models import Board, Column, Task, TaskMoveLog
+
+START = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class KeysetPagingTests(TestCase):
+    url = reverse("admin:settings_taskmovelog_changelist")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "", "admin")
+        board = Board.objects.create(name="Разработка")
+        todo = Column.objects.create(board=board, name="Сделать")
+        done = Column.objects.create(board=board, name="Готово")
+        task = Task.objects.create(weeek_id="1", title="Задача")
+        # Пары с одинаковым move_time: порядок внутри пары задаёт id
+        TaskMoveLog.objects.bulk_create(
+            TaskMoveLog(
+                task=task,
+                board=board,
+                from_column=todo,
+                to_column=done,
+                move_time=START + datetime.timedelta(minutes=i // 2),
+                time_spent=60,
+            )
+            for i in range(7)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        model_admin = admin.site._registry[TaskMoveLog]
+        per_page = model_admin.list_per_page
+        model_admin.list_per_page = 3
+        self.addCleanup(setattr, model_admin, "list_per_page", per_page)
+
+    def pages(self, params=None):
+        params = dict(params or {})
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            cl = response.context["cl"]
+            yield cl
+            if not cl.next_cursor:
+                return
+            params[CURSOR_VAR] = cl.next_cursor
+
+    def test_pages_cover_log_once_in_order(self):
+        pages = [[log.pk for log in cl.result_list] for cl in self.pages()]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        expected = list(
+            TaskMoveLog.objects.order_by("-move_time", "-id").values_list(
+                "pk", flat=True
+            )
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_filters_apply_to_every_page(self):
+        since = START + datetime.timedelta(minutes=1)
+        params = {"move_time__gte": since.isoformat()}
+        ids = [log.pk for cl in self.pages(params) for log in cl.result_list]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(
+            set(ids),
+            set(
+                TaskMoveLog.objects.filter(move_time__gte=since).values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+
+    def test_cursor_only_in_next_link(self):
+        first = next(self.pages())
+        response = self.client.get(self.url, {CURSOR_VAR: first.next_cursor})
+        cl = response.context["cl"]
+        self.assertNotIn(CURSOR_VAR, cl.params)
+        self.assertNotIn(CURSOR_VAR, parse_qs(cl.first_page_url()[1:]))
+        self.assertNotIn(
+            CURSOR_VAR, parse_qs(cl.get_query_string({"o": "1"})[1:])
+        )
+        query = parse_qs(urlsplit(cl.next_page_url()).query)
+        self.assertEqual(query[CURSOR_VAR], [cl.next_cursor])
+
+    def test_sorted_by_column_uses_pages(self):
+        response = self.client.get(self.url, {"o": "6"})
+        cl = response.context["cl"]
+        self.assertFalse(cl.keyset)
+        self.assertEqual(len(cl.result_list), 3)
+
+    def test_bad_cursor_starts_from_first_page(self):
+        response = self.client.get(self.url, {CURSOR_VAR: "oops"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["cl"].cursor)
+
+    def test_cursor_round_trip(self):
+        log = TaskMoveLog.objects.earliest("move_time")
+        self.assertEqual(
+            parse_cursor(format_cursor(log)), (log.move_time, log.pk)
+        )
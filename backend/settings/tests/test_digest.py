@@ -0,0 +1,63 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Board, Column, Task, TaskMoveLog
+
+
+class DigestStatsTests(TestCase):
+    url = reverse("digest-stats")
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        board = Board.objects.create(weeek_id=10, name="Разработка")
+        legacy = Board.objects.create(name="Старая")
+        for current, count in ((legacy, 1), (board, 3)):
+            todo = Column.objects.create(board=current, name="Сделать")
+            done = Column.objects.create(board=current, name="Готово")
+            for i in range(count):
+                task = Task.objects.create(
+                    weeek_id=f"{current.pk}-{i}", title="Задача"
+                )
+                TaskMoveLog.objects.create(
+                    task=task,
+                    board=current,
+                    from_column=todo,
+                    to_column=done if i else todo,
+                    move_time=now - datetime.timedelta(hours=i),
+                    time_spent=60,
+                    cycle_time=600 if i else None,
+                )
+        # Старое перемещение последней задачи в сводку за сутки не попадает
+        TaskMoveLog.objects.create(
+            task=task,
+            board=board,
+            from_column=todo,
+            to_column=done,
+            move_time=now - datetime.timedelta(days=3),
+            time_spent=60,
+        )
+
+    def test_daily_aggregates_by_board(self):
+        boards = self.client.get(self.url).json()["boards"]
+        self.assertEqual(
+            boards["10"],
+            {
+                "name": "Разработка",
+                "moves": 3,
+                "completed": 2,
+                "to_columns": {"Сделать": 1, "Готово": 2},
+            },
+        )
+        # Доска без id в WEEEK — по имени
+        self.assertEqual(boards["Старая"]["moves"], 1)
+
+    def test_since(self):
+        since = timezone.now() - datetime.timedelta(days=7)
+        data = self.client.get(self.url, {"since": since.isoformat()}).json()
+        self.assertEqual(data["boards"]["10"]["moves"], 4)
+        naive = self.client.get(self.url, {"since": "2000-01-01T00:00:00"})
+        self.assertEqual(naive.json()["boards"]["10"]["moves"], 4)
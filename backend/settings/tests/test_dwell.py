@@ -0,0 +1,93 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Board, Column, Task, TaskMoveLog
+
+
+class DwellStatsTests(TestCase):
+    url = reverse("dwell-stats")
+
+    @classmethod
+    def setUpTestData(cls):
+        board = Board.objects.create(name="Разработка")
+        todo = Column.objects.create(board=board, name="Сделать")
+        done = Column.objects.create(board=board, name="Готово")
+        task = Task.objects.create(weeek_id="1", title="Задача")
+        now = timezone.now()
+        # Чем новее перемещение, тем дольше задача была в колонке
+        TaskMoveLog.objects.bulk_create(
+            TaskMoveLog(
+                task=task,
+                board=board,
+                from_column=todo,
+                to_column=done,
+                move_time=now - datetime.timedelta(hours=10 - i),
+                time_spent=(i + 1) * 60,
+                cycle_time=600 if i == 9 else None,
+            )
+            for i in range(10)
+        )
+
+    def test_percentiles_by_column(self):
+        data = self.client.get(self.url).json()
+        stats = data["Разработка"]
+        self.assertEqual(
+            stats["columns"]["Сделать"],
+            {"count": 10, "p50": 300, "p90": 540, "p99": 600},
+        )
+        self.assertEqual(stats["cycle_time"]["count"], 1)
+
+    @override_settings(DWELL_STATS_MAX_ROWS=4)
+    def test_scan_limited_to_latest_moves(self):
+        data = self.client.get(self.url).json()
+        column = data["Разработка"]["columns"]["Сделать"]
+        self.assertEqual(column["count"], 4)
+        self.assertEqual(column["p50"], 480)
+
+    def test_unknown_board_is_empty(self):
+        self.assertEqual(
+            self.client.get(self.url, {"board": "Нет"}).json(), {}
+        )
+
+
+class DwellStatsWindowTests(TestCase):
+    url = reverse("dwell-stats")
+
+    @classmethod
+    def setUpTestData(cls):
+        board = Board.objects.create(name="Разработка")
+        todo = Column.objects.create(board=board, name="Сделать")
+        done = Column.objects.create(board=board, name="Готово")
+        task = Task.objects.create(weeek_id="1", title="Задача")
+        now = timezone.now()
+        TaskMoveLog.objects.bulk_create(
+            TaskMoveLog(
+                task=task,
+                board=board,
+                from_column=todo,
+                to_column=done,
+                move_time=now - datetime.timedelta(days=days),
+                time_spent=days,
+            )
+            for days in (1, 45, 120, 170)
+        )
+
+    def stats(self, **params):
+        data = self.client.get(self.url, params).json()
+        return data["Разработка"]["columns"]["Сделать"]
+
+    def test_rows_until_archive_cutoff_counted(self):
+        # Строки старше 30 дней ещё не в архиве — они не должны пропасть
+        self.assertEqual(self.stats()["count"], 4)
+
+    def test_days_narrows_window(self):
+        self.assertEqual(self.stats(days=60)["count"], 2)
+        self.assertEqual(self.stats(days="x")["count"], 4)
+
+    @override_settings(MOVE_LOG_RETENTION_DAYS=60)
+    def test_archived_months_left_to_rollups(self):
+        self.assertLess(self.stats()["count"], 4)
+        self.assertEqual(self.stats(days=1000)["count"], self.stats()["count"])
@@ -0,0 +1,118 @@
+import csv
+import datetime
+import io
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import export
+from ..models import Board, Column, Member, Task, TaskMoveLog
+
+START = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "", "admin")
+        task = Task.objects.create(weeek_id="1", title="Задача, с запятой")
+        members = [Member.objects.create(name=n) for n in ("Аня", "Боря")]
+        for name in ("Разработка", "Продукт"):
+            board = Board.objects.create(name=name)
+            todo = Column.objects.create(board=board, name="Сделать")
+            done = Column.objects.create(board=board, name="Готово")
+            for i in range(5):
+                log = TaskMoveLog.objects.create(
+                    task=task,
+                    board=board,
+                    from_column=todo,
+                    to_column=done,
+                    move_time=START + datetime.timedelta(minutes=i),
+                    time_spent=60,
+                )
+                log.assignees.set(members[: i % 3])
+        cls.board = Board.objects.get(name="Разработка")
+
+    def setUp(self):
+        # Варианты фильтров кэшируются между тестами
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def export(self, fmt, params=None):
+        url = reverse("admin:settings_taskmovelog_export", args=[fmt])
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_with_filters(self):
+        body = self.export("csv", {"board__id__exact": self.board.pk})
+        self.assertTrue(body.startswith("﻿"))
+        rows = list(csv.DictReader(io.StringIO(body.lstrip("﻿"))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual({row["board"] for row in rows}, {"Разработка"})
+        self.assertEqual(rows[0]["task_title"], "Задача, с запятой")
+        self.assertEqual(
+            sorted(row["assignees"] for row in rows),
+            ["", "", "Аня", "Аня", "Аня; Боря"],
+        )
+
+    def test_ndjson(self):
+        lines = self.export("ndjson").splitlines()
+        self.assertEqual(len(lines), 10)
+        row = json.loads(lines[0])
+        self.assertEqual(set(row), set(export.FIELDS))
+        self.assertEqual(row["time_spent"], 60)
+
+    def test_unknown_format(self):
+        url = reverse("admin:settings_taskmovelog_export", args=["xml"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_rows_read_in_batches(self):
+        # Один SELECT строк и запрос исполнителей на каждую пачку из трёх
+        with mock.patch.object(export, "BATCH_SIZE", 3):
+            with self.assertNumQueries(5):
+                rows = list(export.iter_rows(TaskMoveLog.objects.all()))
+        self.assertEqual(len(rows), 10)
+
+    def test_admin_action_exports_selection(self):
+        ids = list(
+            TaskMoveLog.objects.filter(board=self.board).values_list(
+                "pk", flat=True
+            )[:2]
+        )
+        response = self.client.post(
+            reverse("admin:settings_taskmovelog_changelist"),
+            {"action": "export_ndjson", "_selected_action": ids},
+        )
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(
+            sorted(json.loads(line)["id"] for line in lines), sorted(ids)
+        )
+
+    def test_async_lines_batched_and_closed(self):
+        async def collect(lines, limit=None):
+            chunks = []
+            async for chunk in export.aiter_lines(lines):
+                chunks.append(chunk)
+                if len(chunks) == limit:
+                    break
+            return chunks
+
+        queryset = TaskMoveLog.objects.all()
+        with mock.patch.object(export, "BATCH_SIZE", 4):
+            chunks = async_to_sync(collect)(export.ndjson_lines(queryset))
+            self.assertEqual(len(chunks), 3)
+            self.assertEqual(
+                "".join(chunks), "".join(export.ndjson_lines(queryset))
+            )
+            # Клиент оборвал загрузку — генератор закрыт
+            lines = export.ndjson_lines(queryset)
+            async_to_sync(collect)(lines, limit=1)
+            self.assertIsNone(lines.gi_frame)
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from weeek_django.serializers import TaskMoveLogSerializer
+
+from ..models import Board, Column, Member, TaskMoveLog
+
+MOVE = {
+    "task_id": "1",
+    "task_title": "Задача",
+    "board_name": "Разработка",
+    "from_column": "Сделать",
+    "to_column": "Готово",
+    "move_time": "2025-01-01T00:00:00Z",
+    "time_spent": 60,
+}
+
+
+def save(**fields):
+    serializer = TaskMoveLogSerializer(data={**MOVE, **fields})
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+class TaskMoveLogSerializerTests(TestCase):
+    def test_legacy_board_adopted_by_id(self):
+        legacy = save().board
+        log = save(board_id=10, board_name="Разработка")
+        self.assertEqual(log.board, legacy)
+        self.assertEqual(Board.objects.get().weeek_id, 10)
+        # Переименованная доска находится по id
+        log = save(board_id=10, board_name="Продукт")
+        self.assertEqual(log.board, legacy)
+        self.assertEqual(Board.objects.get().name, "Продукт")
+        self.assertEqual(Column.objects.filter(board=legacy).count(), 2)
+
+    def test_members_keyed_by_weeek_id(self):
+        save(assignees=["Аня"])
+        save(assignees=["Аня", "Боря"], assignee_ids=["a", "b"])
+        save(assignees=["Анна"], assignee_ids=["a"])
+        self.assertEqual(
+            sorted(Member.objects.values_list("weeek_id", "name")),
+            [("a", "Анна"), ("b", "Боря")],
+        )
+
+    def test_old_format_and_unassigned(self):
+        save(user_name="Аня")
+        save(user_name="Не назначен")
+        names = [
+            [m.name for m in log.assignees.all()]
+            for log in TaskMoveLog.objects.order_by("id")
+        ]
+        self.assertEqual(names, [["Аня"], []])
+
+    def test_mismatched_ids_ignored(self):
+        log = save(assignees=["Аня", "Боря"], assignee_ids=["a"])
+        self.assertEqual(
+            [m.weeek_id for m in log.assignees.all()], [None, None]
+        )
@@ -0,0 +1,101 @@
+import datetime
+import gzip
+import json
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from weeek_django.serializers import TaskMoveLogSerializer
+
+from ..models import Board, TaskMoveLog
+
+START = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def move(task_id="1", **fields):
+    return {
+        "task_id": task_id,
+        "task_title": "Задача",
+        "board_id": 7,
+        "board_name": "Разработка",
+        "from_column": "Сделать",
+        "to_column": "Готово",
+        "assignees": ["Иван"],
+        "assignee_ids": ["11"],
+        "move_time": START.isoformat(),
+        "time_spent": 60,
+        **fields,
+    }
+
+
+class LogMoveTests(TestCase):
+    url = reverse("log_move")
+
+    def post(self, data, gzipped=False):
+        body = json.dumps(data).encode()
+        headers = {}
+        if gzipped:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        return self.client.post(
+            self.url, body, content_type="application/json", headers=headers
+        )
+
+    def test_batch_written(self):
+        response = self.post([move("1"), move("2")], gzipped=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"created": 2, "errors": {}})
+        self.assertEqual(TaskMoveLog.objects.count(), 2)
+
+    def test_partial_batch_is_multi_status(self):
+        response = self.post([move("1"), move("2", time_spent="много")])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(list(response.json()["errors"]), ["1"])
+
+    def test_rejected_batch_is_bad_request(self):
+        response = self.post([move(time_spent="много"), {}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["created"], 0)
+        self.assertFalse(TaskMoveLog.objects.exists())
+
+    def test_database_error_rolls_back_only_its_row(self):
+        save = TaskMoveLogSerializer.save
+
+        def failing_save(serializer):
+            if serializer.validated_data["task_id"] == "2":
+                # Строка успела частично записаться до ошибки
+                Board.objects.create(name="Лишняя")
+                raise IntegrityError("дубль")
+            return save(serializer)
+
+        with mock.patch.object(
+            TaskMoveLogSerializer, "save", autospec=True
+        ) as patched:
+            patched.side_effect = failing_save
+            response = self.post([move("1"), move("2"), move("3")])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(list(response.json()["errors"]), ["1"])
+        self.assertEqual(
+            set(TaskMoveLog.objects.values_list("task__weeek_id", flat=True)),
+            {"1", "3"},
+        )
+        self.assertFalse(Board.objects.filter(name="Лишняя").exists())
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=10000)
+    def test_gzip_bomb_is_too_large(self):
+        # Сжатое тело маленькое, распакованное — больше лимита
+        response = self.post([move(str(i)) for i in range(200)], gzipped=True)
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(TaskMoveLog.objects.exists())
+
+    def test_broken_gzip_is_bad_request(self):
+        body = gzip.compress(json.dumps([move()]).encode())[:-10]
+        response = self.client.post(
+            self.url,
+            body,
+            content_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+        self.assertEqual(response.status_code, 400)
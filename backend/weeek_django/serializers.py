@@ -1,5 +1,12 @@
 from rest_framework import serializers
-from settings.models import Settings, TaskMoveLog
+from settings.models import (
+    Board,
+    Column,
+    Member,
+    Settings,
+    Task,
+    TaskMoveLog,
+)
 
 
 class SettingsSerializer(serializers.ModelSerializer):
@@ -8,7 +15,135 @@ class SettingsSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class TaskMoveLogSerializer(serializers.ModelSerializer):
+class TaskMoveLogSerializer(serializers.Serializer):
+    """
+    Перемещение задачи в плоском виде, как его шлёт бот. Имена досок,
+    колонок и исполнителей раскладываются по справочникам.
+    """
+
+    task_id = serializers.CharField(max_length=100)
+    task_title = serializers.CharField(max_length=255)
+    board_id = serializers.IntegerField(required=False, allow_null=True)
+    board_name = serializers.CharField(max_length=255)
+    from_column = serializers.CharField(max_length=255)
+    to_column = serializers.CharField(max_length=255)
+    assignees = serializers.ListField(
+        child=serializers.CharField(max_length=255), required=False
+    )
+    # id исполнителей в WEEEK, в том же порядке, что и assignees
+    assignee_ids = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False
+    )
+    # Старый формат: строка на каждого исполнителя
+    user_name = serializers.CharField(max_length=255, required=False)
+    move_time = serializers.DateTimeField()
+    time_spent = serializers.FloatField()
+    cycle_time = serializers.FloatField(required=False, allow_null=True)
+    lead_time = serializers.FloatField(required=False, allow_null=True)
+
+    def resolve_board(self, data):
+        if data.get("board_id") is None:
+            board, _ = Board.objects.get_or_create(
+                weeek_id=None, name=data["board_name"]
+            )
+            return board
+        board = Board.objects.filter(weeek_id=data["board_id"]).first()
+        if board is None:
+            # Доска из старых перемещений (без id) — та же, присваиваем id
+            board = Board.objects.filter(
+                weeek_id__isnull=True, name=data["board_name"]
+            ).first()
+            if board is None:
+                return Board.objects.create(
+                    weeek_id=data["board_id"], name=data["board_name"]
+                )
+            board.weeek_id = data["board_id"]
+            board.name = data["board_name"]
+            board.save(update_fields=["weeek_id", "name"])
+        elif board.name != data["board_name"]:
+            board.name = data["board_name"]
+            board.save(update_fields=["name"])
+        return board
+
+    def resolve_member(self, weeek_id, name):
+        if weeek_id is None:
+            member = Member.objects.filter(name=name).first()
+            return member or Member.objects.create(name=name)
+        member = Member.objects.filter(weeek_id=weeek_id).first()
+        if member is None:
+            # Исполнитель из старых перемещений (только имя) — присваиваем id
+            member = Member.objects.filter(
+                weeek_id__isnull=True, name=name
+            ).first()
+            if member is None:
+                return Member.objects.create(weeek_id=weeek_id, name=name)
+            member.weeek_id = weeek_id
+            member.name = name
+            member.save(update_fields=["weeek_id", "name"])
+        elif member.name != name:
+            member.name = name
+            member.save(update_fields=["name"])
+        return member
+
+    def create(self, validated_data):
+        data = validated_data
+        board = self.resolve_board(data)
+        task, created = Task.objects.get_or_create(
+            weeek_id=data["task_id"], defaults={"title": data["task_title"]}
+        )
+        if not created and task.title != data["task_title"]:
+            task.title = data["task_title"]
+            task.save(update_fields=["title"])
+        from_column, _ = Column.objects.get_or_create(
+            board=board, name=data["from_column"]
+        )
+        to_column, _ = Column.objects.get_or_create(
+            board=board, name=data["to_column"]
+        )
+        names = data.get("assignees")
+        if names is None:
+            names = [data["user_name"]] if data.get("user_name") else []
+        ids = data.get("assignee_ids") or []
+        if len(ids) != len(names):
+            ids = [None] * len(names)
+        log = TaskMoveLog.objects.create(
+            task=task,
+            board=board,
+            from_column=from_column,
+            to_column=to_column,
+            move_time=data["move_time"],
+            time_spent=data["time_spent"],
+            cycle_time=data.get("cycle_time"),
+            lead_time=data.get("lead_time"),
+        )
+        log.assignees.set(
+            self.resolve_member(weeek_id, name)
+            for weeek_id, name in zip(ids, names)
+            if name != "Не назначен"
+        )
+        return log
+
+    def to_representation(self, instance):
+        return {
+            "id": instance.id,
+            "task_id": instance.task.weeek_id,
+            "board_id": instance.board.weeek_id,
+            "from_column": instance.from_column.name,
+            "to_column": instance.to_column.name,
+            "assignees": [m.name for m in instance.assignees.all()],
+            "move_time": instance.move_time,
+            "time_spent": instance.time_spent,
+            "cycle_time": instance.cycle_time,
+            "lead_time": instance.lead_time,
+        }
+
+
+class TenantSerializer(serializers.ModelSerializer):
+    chat_ids = serializers.SerializerMethodField()
+
     class Meta:
-        model = TaskMoveLog
-        fields = "__all__"
+        model = Settings
+        fields = ("id", "name", "week_key", "chat_ids")
+
+    def get_chat_ids(self, obj):
+        return obj.chat_id_list()
@@ -1,14 +1,19 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = (
-    "django-insecure-$w_(f3ibbq%2e-gvntcy+ys0kk2om+rz9yyu(j)_547e$u!ng@"
+SECRET_KEY = os.getenv(
+    "DJANGO_SECRET_KEY",
+    "django-insecure-$w_(f3ibbq%2e-gvntcy+ys0kk2om+rz9yyu(j)_547e$u!ng@",
 )
 
-DEBUG = True
+# Для разработки: DJANGO_DEBUG=1
+DEBUG = os.getenv("DJANGO_DEBUG", "0") == "1"
 
-ALLOWED_HOSTS = ["localhost", "89.169.3.151", "backend"]
+ALLOWED_HOSTS = ["localhost", "89.169.3.151", "backend"] + [
+    host for host in os.getenv("DJANGO_ALLOWED_HOSTS", "").split(",") if host
+]
 
 
 INSTALLED_APPS = [
@@ -55,7 +60,15 @@ WSGI_APPLICATION = "weeek_django.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        # Backend и архиватор в docker-compose делят базу через том
+        "NAME": Path(os.getenv("DJANGO_DB_PATH", BASE_DIR / "db.sqlite3")),
+        # Несколько воркеров пишут в одну базу: WAL, запись сразу берёт
+        # блокировку, а ожидание блокировки не падает мгновенно
+        "OPTIONS": {
+            "init_command": "PRAGMA journal_mode=WAL;",
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
@@ -93,3 +106,12 @@ CSRF_TRUSTED_ORIGINS = ["http://89.169.3.151"]
 
 STATIC_URL = "/static_backend/"
 STATIC_ROOT = "/backend_static/"
+
+# Перцентили времени в колонках считаются по последним N перемещениям
+DWELL_STATS_MAX_ROWS = int(os.getenv("DWELL_STATS_MAX_ROWS", "200000"))
+
+# Архив журнала перемещений: строки старше срока уходят в сжатые CSV
+MOVE_LOG_RETENTION_DAYS = int(os.getenv("MOVE_LOG_RETENTION_DAYS", "180"))
+MOVE_LOG_ARCHIVE_DIR = Path(
+    os.getenv("MOVE_LOG_ARCHIVE_DIR", BASE_DIR / "archive")
+)
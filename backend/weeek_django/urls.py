@@ -1,12 +1,21 @@
 from django.contrib import admin
 from django.urls import include, path
 
-from .views import LogMoveView, get_bot_token
+from .views import (
+    digest_stats,
+    dwell_stats,
+    get_bot_token,
+    get_tenants,
+    log_move,
+)
 
 app_label = "week"
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/bot-token/", get_bot_token, name="get-bot-token"),
-    path("log_move/", LogMoveView.as_view(), name="log_move"),
+    path("api/tenants/", get_tenants, name="get-tenants"),
+    path("api/stats/dwell/", dwell_stats, name="dwell-stats"),
+    path("api/stats/digest/", digest_stats, name="digest-stats"),
+    path("log_move/", log_move, name="log_move"),
 ]
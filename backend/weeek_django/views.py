@@ -1,10 +1,35 @@
+import datetime
+import json
+import zlib
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import generics
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from settings.models import Settings, TaskMoveLog
+from settings.archive import archive_cutoff
+from settings.models import (
+    MonthlyBoardStats,
+    MonthlyColumnStats,
+    Settings,
+    TaskMoveLog,
+)
+from settings.stats import summarize
 
-from .serializers import SettingsSerializer, TaskMoveLogSerializer
+from .serializers import (
+    SettingsSerializer,
+    TaskMoveLogSerializer,
+    TenantSerializer,
+)
 
 
 @api_view(["GET"])
@@ -14,6 +39,239 @@ def get_bot_token(request):
     return Response(serializer.data)
 
 
-class LogMoveView(generics.CreateAPIView):
-    queryset = TaskMoveLog.objects.all()
-    serializer_class = TaskMoveLogSerializer
+@api_view(["GET"])
+def get_tenants(request):
+    """Пространства WEEEK и привязанные к ним чаты."""
+    tenants = Settings.objects.exclude(week_key__isnull=True).exclude(
+        week_key=""
+    )
+    serializer = TenantSerializer(tenants.order_by("id"), many=True)
+    return Response(serializer.data)
+
+
+@transaction.atomic
+def save_move(data):
+    serializer = TaskMoveLogSerializer(data=data)
+    if not serializer.is_valid():
+        return serializer.errors, 400
+    serializer.save()
+    return serializer.data, 201
+
+
+@transaction.atomic
+def save_moves(rows):
+    """
+    Пачка перемещений одной транзакцией, но каждая строка в своей точке
+    сохранения: ошибка записи одной не откатывает остальные. Ошибки — по
+    индексу строки.
+    201 — записаны все, 207 — часть, 400 — ни одной.
+    """
+    created = 0
+    errors = {}
+    for index, row in enumerate(rows):
+        serializer = TaskMoveLogSerializer(data=row)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            continue
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except DatabaseError as e:
+            errors[index] = {"detail": str(e)}
+            continue
+        created += 1
+    if not errors:
+        status = 201
+    elif created:
+        status = 207
+    else:
+        status = 400
+    return {"created": created, "errors": errors}, status
+
+
+def gunzip(body, limit):
+    """
+    Распаковка gzip не больше limit байт: сжатое тело проходит лимит
+    Django, а распакованное могло бы занять сколько угодно памяти.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if limit is None:
+        data = decompressor.decompress(body)
+    else:
+        data = decompressor.decompress(body, limit + 1)
+        if len(data) > limit:
+            raise RequestDataTooBig("Распакованное тело больше лимита")
+    if not decompressor.eof:
+        raise EOFError("Обрезанный gzip")
+    return data
+
+
+def decode_body(request):
+    """Тело запроса бота: JSON или msgpack, возможно сжатое gzip."""
+    body = request.body
+    if request.headers.get("Content-Encoding") == "gzip":
+        body = gunzip(body, settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+    if request.content_type == "application/msgpack":
+        import msgpack
+
+        return msgpack.unpackb(body)
+    return json.loads(body)
+
+
+@csrf_exempt
+@require_POST
+async def log_move(request):
+    """
+    Перемещение задачи от бота или пачка перемещений (список). Асинхронная
+    вью: под ASGI запрос не занимает поток воркера, в поток уходит только
+    запись в базу.
+    """
+    try:
+        data = decode_body(request)
+    except RequestDataTooBig:
+        return JsonResponse(
+            {"detail": "Слишком большое тело запроса"}, status=413
+        )
+    except (ValueError, OSError, EOFError, zlib.error):
+        return JsonResponse(
+            {"detail": "Некорректное тело запроса"}, status=400
+        )
+    if isinstance(data, list):
+        payload, status = await sync_to_async(save_moves)(data)
+    else:
+        payload, status = await sync_to_async(save_move)(data)
+    return JsonResponse(payload, status=status, safe=False)
+
+
+def board_stats(columns, cycle_times=(), lead_times=()):
+    return {
+        "columns": {column: summarize(values) for column, values in columns},
+        "cycle_time": summarize(cycle_times),
+        "lead_time": summarize(lead_times),
+        "archived": {},
+        "archived_flow": {},
+    }
+
+
+@require_GET
+async def dwell_stats(request):
+    """
+    Время в колонках (p50/p90/p99, секунды) по доскам, а также cycle time
+    и lead time завершённых задач. Архивные месяцы отдаются помесячно:
+    колонки в "archived", cycle/lead time в "archived_flow".
+    ?board=<имя> — только одна доска.
+
+    Живые строки читаются с начала первого неархивного месяца, так что
+    они стыкуются со сводками без пропусков; ?days=N сужает окно до
+    последних N дней. Строк читается не больше DWELL_STATS_MAX_ROWS, чтобы
+    запрос не сканировал весь журнал.
+    """
+    since = archive_cutoff()
+    try:
+        days = int(request.GET["days"])
+    except (KeyError, ValueError):
+        pass
+    else:
+        since = max(since, timezone.now() - datetime.timedelta(days=days))
+    logs = TaskMoveLog.objects.filter(move_time__gte=since)
+    if request.GET.get("board"):
+        logs = logs.filter(board__name=request.GET["board"])
+    logs = logs.order_by("-move_time")[: settings.DWELL_STATS_MAX_ROWS]
+
+    columns = defaultdict(lambda: defaultdict(list))
+    cycle_times = defaultdict(list)
+    lead_times = defaultdict(list)
+    rows = logs.values_list(
+        "board__name",
+        "from_column__name",
+        "time_spent",
+        "cycle_time",
+        "lead_time",
+    )
+    async for board, column, spent, cycle, lead in rows:
+        columns[board][column].append(spent)
+        if cycle is not None:
+            cycle_times[board].append(cycle)
+        if lead is not None:
+            lead_times[board].append(lead)
+
+    result = {
+        board: board_stats(
+            board_columns.items(), cycle_times[board], lead_times[board]
+        )
+        for board, board_columns in columns.items()
+    }
+
+    # Месяцы, выгруженные в архив, — из сохранённых сводок
+    rollups = MonthlyColumnStats.objects.select_related("board", "column")
+    if request.GET.get("board"):
+        rollups = rollups.filter(board__name=request.GET["board"])
+    async for stats in rollups.order_by("month"):
+        board = result.setdefault(stats.board.name, board_stats([]))
+        month = board["archived"].setdefault(f"{stats.month:%Y-%m}", {})
+        month[stats.column.name] = {
+            "count": stats.moves,
+            "p50": stats.p50,
+            "p90": stats.p90,
+            "p99": stats.p99,
+        }
+
+    flow = MonthlyBoardStats.objects.select_related("board")
+    if request.GET.get("board"):
+        flow = flow.filter(board__name=request.GET["board"])
+    async for stats in flow.order_by("month"):
+        board = result.setdefault(stats.board.name, board_stats([]))
+        board["archived_flow"][f"{stats.month:%Y-%m}"] = {
+            "cycle_time": {
+                "count": stats.completed,
+                "p50": stats.cycle_p50,
+                "p90": stats.cycle_p90,
+                "p99": stats.cycle_p99,
+            },
+            "lead_time": {
+                "count": stats.completed,
+                "p50": stats.lead_p50,
+                "p90": stats.lead_p90,
+                "p99": stats.lead_p99,
+            },
+        }
+    return JsonResponse(result)
+
+
+@require_GET
+async def digest_stats(request):
+    """
+    Сводка для дайджеста бота: по каждой доске число перемещений,
+    завершённых задач и переходов в каждую колонку с ?since=<ISO-время>
+    (по умолчанию за последние сутки). Ключ доски — её id в WEEEK.
+    Считается агрегатами в базе, одним запросом на все доски.
+    """
+    since = parse_datetime(request.GET.get("since", ""))
+    if since is None:
+        since = timezone.now() - datetime.timedelta(days=1)
+    elif timezone.is_naive(since):
+        since = timezone.make_aware(since)
+
+    logs = TaskMoveLog.objects.filter(move_time__gte=since)
+    boards = {}
+    totals = logs.values("board__weeek_id", "board__name").annotate(
+        moves=Count("id"),
+        completed=Count(
+            "task", distinct=True, filter=Q(cycle_time__isnull=False)
+        ),
+    )
+    async for row in totals.order_by():
+        key = str(row["board__weeek_id"] or row["board__name"])
+        boards[key] = {
+            "name": row["board__name"],
+            "moves": row["moves"],
+            "completed": row["completed"],
+            "to_columns": {},
+        }
+    to_columns = logs.values(
+        "board__weeek_id", "board__name", "to_column__name"
+    ).annotate(moves=Count("id"))
+    async for row in to_columns.order_by():
+        key = str(row["board__weeek_id"] or row["board__name"])
+        boards[key]["to_columns"][row["to_column__name"]] = row["moves"]
+    return JsonResponse({"since": since.isoformat(), "boards": boards})
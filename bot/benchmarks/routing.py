@@ -0,0 +1,96 @@
+"""
+Микробенчмарк маршрутизации callback-апдейтов.
+
+Сравнивает прежнюю схему (список CallbackQueryHandler с регулярками,
+проверяемых по очереди до первого совпадения) и CallbackRouter
+(декодирование префикса + поиск в словаре).
+
+    cd bot && python -m benchmarks.routing
+"""
+
+import timeit
+
+from telegram import CallbackQuery, Update, User
+from telegram.ext import CallbackQueryHandler
+
+from bot.handlers import router
+
+
+async def _noop(update, context):
+    pass
+
+
+# Глобальные хендлеры в том порядке, в каком их регистрировал main.py
+LEGACY_PATTERNS = (
+    "^show_task_",
+    "^change_project$",
+    "^change_board$",
+    "^sort_",
+    "^show_task_",
+    "^column_",
+    "^page_",
+    "^page_",
+    "^page_",
+    "^page_",
+    "^page_",
+)
+
+SAMPLES = (
+    ("show_task_123456", router.encode(router.SHOW_TASK, 123456)),
+    ("page_3", router.encode(router.TASK_PAGE, 3)),
+    ("column_В работе", router.encode(router.SORT_COLUMN, 42)),
+    ("sort_dueDate", router.encode(router.SORT, "dueDate")),
+)
+
+
+def _update(data, n=0):
+    user = User(1, "bench", False)
+    query = CallbackQuery(str(n), user, "bench", data=data)
+    return Update(n, callback_query=query)
+
+
+def _first_match(handlers, update):
+    for handler in handlers:
+        if handler.check_update(update):
+            return handler
+    return None
+
+
+def main(number=20000):
+    legacy_handlers = [
+        CallbackQueryHandler(_noop, pattern=p) for p in LEGACY_PATTERNS
+    ]
+    for op in (
+        router.SHOW_TASK,
+        router.TASK_PAGE,
+        router.SORT_COLUMN,
+        router.SORT,
+    ):
+        router.callback_router.route(op, _noop)
+    new_handlers = [
+        router.callback_router.handler(
+            router.SHOW_TASK, router.TASK_PAGE, router.SORT_COLUMN, router.SORT
+        )
+    ]
+
+    print(f"{'callback_data':<24}{'regex, мкс':>12}{'router, мкс':>14}")
+    for legacy_data, new_data in SAMPLES:
+        legacy_update = _update(legacy_data)
+        new_update = _update(new_data)
+
+        def legacy():
+            _first_match(legacy_handlers, legacy_update)
+
+        def new():
+            _first_match(new_handlers, new_update)
+            router.callback_router.routes[
+                router.decode(new_update.callback_query.data)[0]
+            ]
+
+        t_legacy = timeit.timeit(legacy, number=number) / number * 1e6
+        t_new = timeit.timeit(new, number=number) / number * 1e6
+        print(f"{legacy_data:<24}{t_legacy:>12.2f}{t_new:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
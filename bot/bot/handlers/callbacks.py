@@ -1,29 +1,30 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from bot.handlers.commands import remove_html_tags
+from bot.handlers.commands import find_snapshot, show_task
+from bot.handlers.router import callback_router
 from bot.utils import api, logger
+from bot.utils.callback_data import SHOW_TASK, callback_arg
+from bot.utils.render import snapshot_card
 
 
 async def show_task_callback(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ):
     query = update.callback_query
-    await query.answer()
-
-    task_id = query.data.replace("show_task_", "")
-    tasks_state = context.user_data.get("tasks_state", {})
+    task_id = callback_arg(query.data)
+    task = find_snapshot(context.chat_data, task_id)
+    if not task and context.user_data.get("selected_board"):
+        # Задачи нет в состоянии поллера — берём её из WEEEK
+        return await show_task(update, context)
 
-    task = tasks_state.get(int(task_id)) or tasks_state.get(task_id)
+    await query.answer()
     if not task:
         await query.message.reply_text("⚠️ Задача не найдена.")
         return
-    text = (
-        f"📌 *{task['title']}*\n"
-        f"📝 {remove_html_tags(task['description']) or '—'}\n"
-        f"📂 Колонка: {task['boardColumn']}\n"
-        f"⚡ Статус: {'Выполнена' if task['isCompleted'] else 'Активна'}\n"
-        f"Ссылка: https://app.weeek.net/ws/{api.WORKSPACE_ID}/task/{task_id}\n"
-    )
+    text = snapshot_card(task_id, task, api.workspace_id())
 
     await query.message.reply_text(text, parse_mode="Markdown")
+
+
+callback_router.route(SHOW_TASK, show_task_callback)
@@ -1,9 +1,10 @@
 import asyncio
-import re
+import time
 from datetime import datetime
 
 import pytz
 import requests
+from config import settings
 from telegram import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
@@ -11,8 +12,9 @@ from telegram import (
     ReplyKeyboardMarkup,
     Update,
 )
+from telegram.error import BadRequest
 from telegram.ext import (
-    CallbackQueryHandler,
+    CallbackContext,
     CommandHandler,
     ContextTypes,
     ConversationHandler,
@@ -20,11 +22,85 @@ from telegram.ext import (
     filters,
 )
 
-from bot.utils import api, logger
+from bot.handlers.router import MenuRouter, callback_router
+from bot.utils import api, breaker, logger, tenants
+from bot.utils.bulk import (
+    MAX_FILE_SIZE,
+    BulkParseError,
+    parse_file,
+    parse_message,
+)
+from bot.utils.callback_data import (
+    ASSIGNEE,
+    PAGE_BOARD,
+    PAGE_PROJECT,
+    SELECT_BOARD,
+    SELECT_PROJECT,
+    SHOW_TASK,
+    SORT,
+    SORT_COLUMN,
+    TASK_PAGE,
+    TYPE,
+    UNWATCH,
+    callback_arg,
+    encode,
+)
+from bot.utils.creation import (
+    CreateRequest,
+    Postponed,
+    bulk_queue,
+    creation_queue,
+    start_job,
+)
+from bot.utils.deadlines import deadline_watcher
+from bot.utils.digest import DAILY, PERIODS, chat_digest, fetch_aggregates
+from bot.utils.render import (
+    assignee_names,
+    remove_html_tags,
+    show_task_keyboard,
+    task_card,
+)
+from bot.utils.dwell import dwell_for
+from bot.utils.mirror import mirror_for
+from bot.utils.movelog import move_log_queue
+from bot.utils.search import index_for
+from bot.utils.singleflight import flights
+from bot.utils.snapshots import (
+    finish_catchup,
+    limit_catchup,
+    pause,
+    stopping,
+)
+from bot.utils.subscriptions import (
+    NEW,
+    REMOVED,
+    UPDATE,
+    describe,
+    diff_fields,
+    hold,
+    make_change,
+    parse_quiet,
+    rules_of,
+    subscription_for,
+    take_held,
+)
+from bot.utils.tracing import (
+    format_summary,
+    latency_summary,
+    parse_weeek_time,
+    tracer,
+)
 
 vladivostok_tz = pytz.timezone("Asia/Vladivostok")
 
-DJANGO_API_URL = "http://backend:8000/"
+# Пакетное создание: одновременно из одного пакета (не больше воркеров
+# bulk_queue, чтобы пакеты чередовались) и частота правки сообщения с
+# прогрессом (лимиты Telegram на edit)
+BULK_CONCURRENCY = 2
+PROGRESS_INTERVAL = 2
+
+# Сколько досок один чат может отслеживать одновременно
+MAX_WATCHED_BOARDS = 10
 
 (
     CHOOSING_PROJECT,
@@ -39,17 +115,9 @@ DJANGO_API_URL = "http://backend:8000/"
 ) = range(9)
 
 
-def remove_html_tags(text):
-    """Удаляет все HTML-теги из текста"""
-    if text is None:
-        return "Без описания"
-    clean = re.compile("<.*?>")
-    return re.sub(clean, "", str(text))
-
-
 async def stop_polling(context: ContextTypes.DEFAULT_TYPE):
     """Останавливаем фоновую задачу, если есть."""
-    task: asyncio.Task = context.user_data.get("poll_task")
+    task: asyncio.Task = context.chat_data.get("poll_task")
     if task and not task.done():
         logger.logger.info("Stopping existing poll task")
         task.cancel()
@@ -57,7 +125,7 @@ async def stop_polling(context: ContextTypes.DEFAULT_TYPE):
             await task
         except asyncio.CancelledError:
             pass
-        context.user_data["poll_task"] = None
+        context.chat_data["poll_task"] = None
     else:
         logger.logger.info("No active poll task to stop")
 
@@ -73,7 +141,7 @@ async def show_projects_page(
     current = project_data[start:end]
 
     keyboard = [
-        [InlineKeyboardButton(name, callback_data=f"select_proj_{pid}")]
+        [InlineKeyboardButton(name, callback_data=encode(SELECT_PROJECT, pid))]
         for name, pid in current
     ]
 
@@ -81,13 +149,13 @@ async def show_projects_page(
     if page > 1:
         pagination_row.append(
             InlineKeyboardButton(
-                "⬅️ Назад", callback_data=f"page_proj_{page-1}"
+                "⬅️ Назад", callback_data=encode(PAGE_PROJECT, page - 1)
             )
         )
     if end < total:
         pagination_row.append(
             InlineKeyboardButton(
-                "➡️ Далее", callback_data=f"page_proj_{page+1}"
+                "➡️ Далее", callback_data=encode(PAGE_PROJECT, page + 1)
             )
         )
 
@@ -117,7 +185,7 @@ async def show_boards_page(
         [
             InlineKeyboardButton(
                 board.get("name", "Unnamed"),
-                callback_data=f"select_board_{board.get('id')}",
+                callback_data=encode(SELECT_BOARD, board.get("id")),
             )
         ]
         for board in current
@@ -127,13 +195,13 @@ async def show_boards_page(
     if page > 1:
         pagination_row.append(
             InlineKeyboardButton(
-                "⬅️ Назад", callback_data=f"page_board_{page-1}"
+                "⬅️ Назад", callback_data=encode(PAGE_BOARD, page - 1)
             )
         )
     if end < total:
         pagination_row.append(
             InlineKeyboardButton(
-                "➡️ Далее", callback_data=f"page_board_{page+1}"
+                "➡️ Далее", callback_data=encode(PAGE_BOARD, page + 1)
             )
         )
 
@@ -150,7 +218,8 @@ async def show_boards_page(
 
 
 async def change_project(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await stop_polling(context)
+    # Отслеживание досок продолжается: смена проекта меняет только
+    # доску для действий меню
     context.user_data.pop("selected_project", None)
     context.user_data.pop("selected_board", None)
 
@@ -176,7 +245,6 @@ async def change_project(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def change_board(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await stop_polling(context)
     await update.message.reply_text("🔄 Вы решили поменять доску.")
 
     project = context.user_data.get("selected_project")
@@ -226,7 +294,7 @@ async def handle_project_selection(
     query = update.callback_query
     await query.answer()
 
-    pid = query.data.replace("select_proj_", "")
+    pid = callback_arg(query.data)
     projects = context.user_data.get("projects", [])
     name = next((n for n, p in projects if str(p) == pid), None)
 
@@ -259,7 +327,7 @@ async def handle_project_pagination(
 ):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace("page_proj_", ""))
+    page = int(callback_arg(query.data))
     await show_projects_page(update, context, page=page, query=query)
     return CHOOSING_PROJECT
 
@@ -270,7 +338,7 @@ async def handle_board_selection(
     query = update.callback_query
     await query.answer()
 
-    bid = query.data.replace("select_board_", "")
+    bid = callback_arg(query.data)
     boards = context.user_data.get("boards", [])
     name = next(
         (b.get("name") for b in boards if str(b.get("id")) == bid), None
@@ -284,9 +352,6 @@ async def handle_board_selection(
     project_id = context.user_data["selected_project"]["id"]
     chat_id = update.effective_chat.id
 
-    # Останавливаем старый polling
-    await stop_polling(context)
-
     # Кнопки под клавиатурой
     keyboard = ReplyKeyboardMarkup(
         [
@@ -302,13 +367,11 @@ async def handle_board_selection(
     )
     await query.message.reply_text("Выберите действие:", reply_markup=keyboard)
 
-    # Запускаем новую фоновую задачу
-    task = context.application.create_task(
-        poll_board_updates(chat_id, project_id, bid, context)
+    # Доска добавляется к отслеживаемым, остальные продолжают опрашиваться
+    watched = await watch_board(
+        context, chat_id, project_id, context.user_data["selected_board"]
     )
-    context.user_data["poll_task"] = task
-
-    await query.message.reply_text(f"Запускаем таск для доски {bid}...")
+    await query.message.reply_text(watching_text(context, watched))
     return ConversationHandler.END
 
 
@@ -317,7 +380,7 @@ async def handle_board_pagination(
 ):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace("page_board_", ""))
+    page = int(callback_arg(query.data))
     await show_boards_page(update, context, page=page, query=query)
     return CHOOSING_BOARD
 
@@ -373,263 +436,647 @@ async def choose_project(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return CHOOSING_BOARD
 
 
-async def poll_board_updates(chat_id, project_id, board_id, context):
-    """Фоновая задача: отслеживаем новые задачи и изменения с кнопкой 'Посмотреть полностью'."""
-    tasks_state = {}  # task_id -> snapshot
-    column_names = {}  # id -> название колонки
-
-    # Загружаем список пользователей для маппинга ID к именам
-    assignees_response = api.get_assignees(board_id)
-    id_to_name = {}
-    if assignees_response.get("success") and "members" in assignees_response:
-        id_to_name = {
-            member[
-                "id"
-            ]: f"{member.get('firstName', '')} {member.get('lastName', '')}".strip()
-            for member in assignees_response["members"]
+# Поля снимка, от которых зависит поисковый индекс
+INDEXED_FIELDS = ("title", "description", "boardColumn", "isCompleted")
+
+
+def index_snapshot(index, board_id, task_id, snapshot):
+    """Обновляет задачу в поисковом индексе по снимку поллера."""
+    index.upsert(
+        task_id,
+        board_id,
+        snapshot["title"],
+        remove_html_tags(snapshot["description"] or ""),
+        snapshot["boardColumn"],
+        bool(snapshot["isCompleted"]),
+    )
+
+
+def task_snapshot(task, column_names, id_to_name):
+    """Снимок полей задачи, по которым поллер ищет изменения."""
+    col_id = task.get("boardColumnId")
+    assignees_ids = task.get("assignees", [])
+    return {
+        "title": task.get("title"),
+        "description": task.get("description"),
+        "boardColumn": column_names.get(col_id, f"Колонка {col_id}"),
+        "isCompleted": task.get("isCompleted"),
+        "isDeleted": task.get("isDeleted"),
+        "assignee": assignee_names(assignees_ids, id_to_name),
+        "assignees_ids": assignees_ids,  # Храним IDs для сравнения
+        "dueDate": task.get("dueDate"),
+    }
+
+
+async def adopt_created_task(context, chat_id, board_id, task):
+    """
+    Кладёт созданную ботом задачу в состояние поллера доски, зеркало и
+    индекс — поллер не пришлёт о ней «🆕 Новая задача».
+    """
+    tenant = tenants.current()
+    mirror = mirror_for(tenant)
+    mirror.upsert_task(board_id, task)
+    watch = watched_boards(context.chat_data).get(str(board_id))
+    if watch is None or not watch.ready:
+        return
+    snapshot = task_snapshot(
+        task,
+        mirror.board(board_id).column_names(),
+        await mirror.get_id_to_name(),
+    )
+    snapshot["adopted_at"] = time.time_ns()
+    watch.tasks[task["id"]] = snapshot
+    dwell = dwell_for(tenant)
+    dwell.observe(board_id, task, snapshot["boardColumn"])
+    index_snapshot(index_for(tenant), board_id, task["id"], snapshot)
+    deadline_watcher.track(
+        chat_id,
+        watch.board,
+        task["id"],
+        snapshot,
+        dwell.entered_at(task["id"]),
+    )
+
+
+def post_move_log(task_id, title, move, assignees, board, flow_times):
+    """
+    Ставит перемещение задачи в очередь на backend (строка на переход).
+    assignees — пары (id в WEEEK, имя).
+    """
+    cycle_time, lead_time = flow_times
+    move_log_queue.submit(
+        {
+            "task_title": title,
+            "task_id": task_id,
+            "board_id": board["id"],
+            "board_name": board["name"],
+            "from_column": move.from_column,
+            "to_column": move.to_column,
+            "assignees": [name for _, name in assignees],
+            "assignee_ids": [str(aid) for aid, _ in assignees],
+            "move_time": datetime.fromtimestamp(
+                move.moved_at, vladivostok_tz
+            ).isoformat(),
+            "time_spent": move.time_spent,
+            "cycle_time": cycle_time,
+            "lead_time": lead_time,
         }
+    )
 
-    # Инициализация: загружаем текущее состояние без уведомлений
-    try:
-        columns_response = api.get_boardColumn_list(board_id)
-        if (
-            columns_response.get("success")
-            and "boardColumns" in columns_response
-        ):
-            column_names = {
-                col["id"]: col["name"]
-                for col in columns_response["boardColumns"]
-            }
-
-        response = api.get_tasks(projectId=project_id, boardId=board_id)
-        if response.get("success") and "tasks" in response:
-            tasks = response["tasks"]
-            now = datetime.now(vladivostok_tz)
-            for task in tasks:
-                task_id = task["id"]
-                col_id = task.get("boardColumnId")
-                col_name = column_names.get(col_id, f"Колонка {col_id}")
-                assignees_ids = task.get("assignees", [])
-                assignees_names = (
-                    ", ".join(
-                        id_to_name.get(aid, str(aid)) for aid in assignees_ids
-                    )
-                    or "Не назначен"
-                )
-                snapshot = {
-                    "title": task.get("title"),
-                    "description": task.get("description"),
-                    "boardColumn": col_name,
-                    "isCompleted": task.get("isCompleted"),
-                    "isDeleted": task.get("isDeleted"),
-                    "assignee": assignees_names,
-                    "assignees_ids": assignees_ids,  # Храним IDs для сравнения
-                    "column_enter_time": now,
-                }
-                tasks_state[task_id] = snapshot
-            context.user_data["tasks_state"] = tasks_state
-            logger.logger.info(
-                "Initialized tasks_state with current tasks without notifications."
-            )
-    except Exception as e:
-        logger.logger.error(f"Initialization error in poll_board_updates: {e}")
-        await context.bot.send_message(
-            chat_id=chat_id, text=f"Ошибка инициализации: {e}"
+
+def change_text(change, old, new):
+    """Текст уведомления об изменении задачи."""
+    if change.kind == NEW:
+        return (
+            f"🆕 Новая задача: {new['title']}\nКолонка: {new['boardColumn']}, "
+            f"Статус: {'Выполнена' if new['isCompleted'] else 'Активна'}"
         )
-        return
+    if change.kind == REMOVED:
+        return f"❌ Задача {new['title']} удалена или скрыта"
+    lines = []
+    if "title" in change.fields:
+        lines.append(f"✏️ Название: {old['title']} → {new['title']}")
+    if "assignee" in change.fields:
+        lines.append(f"👤 Исполнитель: {old['assignee']} → {new['assignee']}")
+    if "column" in change.fields:
+        lines.append(
+            f"📂 Колонка: {old['boardColumn']} → {new['boardColumn']}"
+        )
+    if "status" in change.fields:
+        lines.append(
+            f"⚡ Статус: {'Выполнена' if old['isCompleted'] else 'Активна'} → "
+            f"{'Выполнена' if new['isCompleted'] else 'Активна'}"
+        )
+    if "deleted" in change.fields:
+        lines.append("❌ Задача удалена")
+    return f"🔔 Обновление задачи {new['title']}:\n" + "\n".join(lines)
+
+
+async def notify_change(
+    context,
+    chat_id,
+    board,
+    change,
+    old,
+    new,
+    task,
+    polled_at,
+    detected_at,
+    diffed_at,
+):
+    """
+    Рендерит и отправляет уведомление, прошедшее подписку чата. Метки
+    detected_at/diffed_at — приход страницы и конец её диффа.
+    """
+    changed_at = None
+    if change.kind == NEW:
+        changed_at = parse_weeek_time(task.get("createdAt"))
+    elif change.kind == UPDATE:
+        changed_at = parse_weeek_time(task.get("updatedAt"))
+    span = tracer.start(
+        board["id"],
+        board["name"],
+        change.task_id,
+        change.kind,
+        polled_at,
+        changed_at,
+    )
+    span.mark("detected", detected_at)
+    span.mark("diffed", diffed_at)
+    await context.bot.send_message(
+        chat_id=chat_id,
+        text=change_text(change, old, new),
+        # Кнопка просмотра полной информации (из кэша)
+        reply_markup=(
+            None
+            if change.kind == REMOVED
+            else show_task_keyboard(change.task_id)
+        ),
+    )
+    span.mark("sent")
+    tracer.end(span)
 
-    while True:
+
+async def send_held(context, chat_id):
+    """Отправляет уведомления, отложенные на тихие часы."""
+    items, more = take_held(context.chat_data)
+    if more:
+        items.append([f"… и ещё изменений за тихие часы: {more}", None])
+    for text, task_id in items:
         try:
-            columns_response = api.get_boardColumn_list(board_id)
-            if (
-                columns_response.get("success")
-                and "boardColumns" in columns_response
-            ):
-                column_names = {
-                    col["id"]: col["name"]
-                    for col in columns_response["boardColumns"]
-                }
-
-            response = api.get_tasks(projectId=project_id, boardId=board_id)
-            if response.get("success") and "tasks" in response:
-                tasks = response["tasks"]
-                current_ids = set()
-
-                for task in tasks:
-                    task_id = task["id"]
-                    current_ids.add(task_id)
-
-                    col_id = task.get("boardColumnId")
-                    col_name = column_names.get(col_id, f"Колонка {col_id}")
-                    assignees_ids = task.get("assignees", [])
-                    assignees_names = (
-                        ", ".join(
-                            id_to_name.get(aid, str(aid))
-                            for aid in assignees_ids
-                        )
-                        or "Не назначен"
-                    )
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=text,
+                reply_markup=(
+                    None if task_id is None else show_task_keyboard(task_id)
+                ),
+            )
+        except Exception as e:
+            logger.logger.error(
+                f"Не удалось отправить уведомление в {chat_id}: {e}"
+            )
 
-                    # Создаем базовый snapshot без column_enter_time
-                    temp_snapshot = {
-                        "title": task.get("title"),
-                        "description": task.get("description"),
-                        "boardColumn": col_name,
-                        "isCompleted": task.get("isCompleted"),
-                        "isDeleted": task.get("isDeleted"),
-                        "assignee": assignees_names,
-                        "assignees_ids": assignees_ids,
-                    }
-
-                    # Создаём inline-кнопку для просмотра полной информации
-                    keyboard = InlineKeyboardMarkup.from_button(
-                        InlineKeyboardButton(
-                            "Посмотреть полностью",
-                            callback_data=f"show_task_{task_id}",
+
+class BoardWatch:
+    """Отслеживаемая чатом доска и состояние её поллера."""
+
+    def __init__(self, board_id, name, project_id):
+        self.id = board_id
+        self.name = name
+        self.project_id = project_id
+        self.tasks = {}  # task_id -> snapshot
+        self.column_names = {}  # id -> название колонки
+        self.ready = False  # загружено ли начальное состояние
+
+    @property
+    def board(self):
+        return {"id": self.id, "name": self.name}
+
+    def dump(self):
+        """
+        Состояние для снимка при остановке. id задач и колонок — в парах,
+        чтобы JSON не превратил ключи в строки.
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "project_id": self.project_id,
+            "columns": list(self.column_names.items()),
+            "tasks": list(self.tasks.items()),
+        }
+
+    @classmethod
+    def restore(cls, data):
+        watch = cls(data["id"], data["name"], data["project_id"])
+        watch.column_names = dict(data["columns"])
+        watch.tasks = dict(data["tasks"])
+        watch.ready = True
+        return watch
+
+
+def watched_boards(chat_data):
+    """
+    Отслеживаемые доски чата: str(board_id) -> BoardWatch. Список общий
+    для всех участников группы, поэтому лежит в chat_data.
+    """
+    return chat_data.setdefault("watched_boards", {})
+
+
+def find_snapshot(chat_data, task_id):
+    """Снимок задачи из состояния поллеров чата, если доска отслеживается."""
+    for watch in watched_boards(chat_data).values():
+        snapshot = watch.tasks.get(int(task_id)) or watch.tasks.get(task_id)
+        if snapshot:
+            return snapshot
+    return None
+
+
+async def watch_board(context, chat_id, project_id, board):
+    """
+    Добавляет доску в список отслеживаемых и запускает поллер чата, если
+    он ещё не работает. False, если список уже полон.
+    """
+    watches = watched_boards(context.chat_data)
+    key = str(board["id"])
+    if key not in watches:
+        if len(watches) >= MAX_WATCHED_BOARDS:
+            return False
+        watches[key] = BoardWatch(board["id"], board["name"], project_id)
+    # Один поллер на чат, кто бы из участников группы ни выбрал доску
+    task = context.chat_data.get("poll_task")
+    if not task or task.done():
+        # Не через application.create_task: при остановке поллеры
+        # завершаются сами (см. bot.handlers.lifecycle)
+        context.chat_data["poll_task"] = asyncio.create_task(
+            poll_watched_boards(chat_id, context)
+        )
+        logger.logger.info(f"Started poll task for chat {chat_id}")
+    return True
+
+
+def board_watched(application, board_id):
+    """Отслеживает ли доску ещё хоть один чат."""
+    return any(
+        str(board_id) in data.get("watched_boards", {})
+        for data in application.chat_data.values()
+    )
+
+
+def drop_watch(context, chat_id, board_id):
+    """
+    Снимает доску с отслеживания: её таймеры сроков, а если доску больше
+    никто не отслеживает — и её задачи в индексе inline-поиска.
+    """
+    watched_boards(context.chat_data).pop(str(board_id), None)
+    deadline_watcher.forget_board(chat_id, board_id)
+    if not board_watched(context.application, board_id):
+        index_for(tenants.current()).remove_board(board_id)
+
+
+async def unwatch_board(context, chat_id, board_id):
+    drop_watch(context, chat_id, board_id)
+    if not watched_boards(context.chat_data):
+        await stop_polling(context)
+
+
+async def init_board(chat_id, watch, context, id_to_name):
+    """Начальное состояние доски — без уведомлений."""
+    tenant = tenants.current()
+    index = index_for(tenant)
+    mirror = mirror_for(tenant)
+    dwell = dwell_for(tenant)
+
+    columns_response = await asyncio.to_thread(
+        api.get_boardColumn_list, watch.id
+    )
+    if columns_response.get("success") and "boardColumns" in columns_response:
+        mirror.put_columns(watch.id, columns_response["boardColumns"])
+        watch.column_names = {
+            col["id"]: col["name"] for col in columns_response["boardColumns"]
+        }
+
+    all_tasks = []
+    async for tasks in api.iter_task_pages(watch.id, watch.project_id):
+        all_tasks.extend(tasks)
+        for task in tasks:
+            task_id = task["id"]
+            snapshot = task_snapshot(task, watch.column_names, id_to_name)
+            watch.tasks[task_id] = snapshot
+            move = dwell.observe(watch.id, task, snapshot["boardColumn"])
+            if move:
+                # Историю ведёт другой чат с этой доской, а переход первым
+                # увидели здесь — в журнал он попадёт только отсюда
+                post_move_log(
+                    task_id,
+                    snapshot["title"],
+                    move,
+                    [
+                        (aid, id_to_name.get(aid, str(aid)))
+                        for aid in snapshot["assignees_ids"]
+                    ],
+                    watch.board,
+                    dwell.flow_times(task_id),
+                )
+            index_snapshot(index, watch.id, task_id, snapshot)
+            # Уже наступившие сроки при загрузке доски не напоминаем
+            deadline_watcher.track(
+                chat_id,
+                watch.board,
+                task_id,
+                snapshot,
+                dwell.entered_at(task_id),
+                notify_past=False,
+            )
+    mirror.put_tasks(watch.id, all_tasks)
+    watch.ready = True
+    logger.logger.info(
+        f"Initialized board {watch.id} with current tasks without "
+        "notifications."
+    )
+
+
+async def poll_board(chat_id, watch, context, id_to_name, pages, outbox):
+    """
+    Один цикл опроса доски: дифф страниц задач (pages — асинхронный
+    итератор списков задач) со снимками. Уведомления не отправляются
+    сразу, а складываются в outbox: их шлют после того, как слот опроса
+    освобождён, чтобы медленный Telegram не занимал долю WEEEK.
+    """
+    tenant = tenants.current()
+    index = index_for(tenant)
+    mirror = mirror_for(tenant)
+    dwell = dwell_for(tenant)
+    tasks_state = watch.tasks
+    board = watch.board
+    board_id = watch.id
+
+    # Метки трассировки: начало опроса и момент обнаружения
+    polled_at = time.time_ns()
+    columns_response = await asyncio.to_thread(
+        api.get_boardColumn_list, board_id
+    )
+    if columns_response.get("success") and "boardColumns" in columns_response:
+        mirror.put_columns(board_id, columns_response["boardColumns"])
+        watch.column_names = {
+            col["id"]: col["name"] for col in columns_response["boardColumns"]
+        }
+    column_names = watch.column_names
+
+    current_ids = set()
+    all_tasks = []
+    subscription = subscription_for(context.chat_data)
+    # Диффим каждую страницу сразу, не дожидаясь остальных
+    async for tasks in pages:
+        detected_at = time.time_ns()
+        all_tasks.extend(tasks)
+        changes = []  # (Change, старый снимок, новый, задача)
+        for task in tasks:
+            task_id = task["id"]
+            current_ids.add(task_id)
+
+            snapshot = task_snapshot(task, column_names, id_to_name)
+
+            # Переходы между колонками и завершение задачи
+            move = dwell.observe(board_id, task, snapshot["boardColumn"])
+
+            old = tasks_state.get(task_id)
+            if old is None:
+                # Новая задача
+                changes.append(
+                    (make_change(NEW, task_id, snapshot), None, snapshot, task)
+                )
+                index_snapshot(index, board_id, task_id, snapshot)
+            else:
+                fields = diff_fields(old, snapshot)
+                if fields:
+                    changes.append(
+                        (
+                            make_change(
+                                UPDATE, task_id, snapshot, old, fields
+                            ),
+                            old,
+                            snapshot,
+                            task,
                         )
                     )
+                if move:
+                    # Время в колонке — по отметкам WEEEK
+                    post_move_log(
+                        task_id,
+                        snapshot["title"],
+                        move,
+                        [
+                            (aid, id_to_name.get(aid, str(aid)))
+                            for aid in old["assignees_ids"]
+                        ],
+                        board,
+                        dwell.flow_times(task_id),
+                    )
+                if any(old[f] != snapshot[f] for f in INDEXED_FIELDS):
+                    index_snapshot(index, board_id, task_id, snapshot)
+            # Таймеры сроков — только для изменившихся задач
+            if (
+                old is None
+                or fields
+                or old.get("dueDate") != snapshot["dueDate"]
+            ):
+                deadline_watcher.track(
+                    chat_id,
+                    board,
+                    task_id,
+                    snapshot,
+                    dwell.entered_at(task_id),
+                )
+            tasks_state[task_id] = snapshot
+        diffed_at = time.time_ns()
 
-                    if task_id not in tasks_state:
-                        # Новая задача
-                        now = datetime.now(vladivostok_tz)
-                        snapshot = {**temp_snapshot, "column_enter_time": now}
-                        tasks_state[task_id] = snapshot
-                        await context.bot.send_message(
-                            chat_id=chat_id,
-                            text=f"🆕 Новая задача: {snapshot['title']}\nКолонка: {snapshot['boardColumn']}, "
-                            f"Статус: {'Выполнена' if snapshot['isCompleted'] else 'Активна'}",
-                            reply_markup=keyboard,
-                        )
-                    else:
-                        old = tasks_state[task_id]
-                        # Копируем старое время входа в колонку
-                        snapshot = {
-                            **temp_snapshot,
-                            "column_enter_time": old["column_enter_time"],
-                        }
-                        changes = []
-                        if old["title"] != snapshot["title"]:
-                            changes.append(
-                                f"✏️ Название: {old['title']} → {snapshot['title']}"
-                            )
-                        if old["assignees_ids"] != snapshot["assignees_ids"]:
-                            changes.append(
-                                f"👤 Исполнитель: {old['assignee']} → {snapshot['assignee']}"
-                            )
-                        if old["boardColumn"] != snapshot["boardColumn"]:
-                            now = datetime.now(vladivostok_tz)
-                            logger.logger.info(old["column_enter_time"])
-                            time_spent = (
-                                now - old["column_enter_time"]
-                            ).total_seconds()
-                            changes.append(
-                                f"📂 Колонка: {old['boardColumn']} → {snapshot['boardColumn']}"
-                            )
-                            # Отправка на бэкенд для каждого исполнителя
-                            if old["assignees_ids"]:
-                                for aid in old["assignees_ids"]:
-                                    user = aid
-                                    user_name = id_to_name.get(aid, str(aid))
-                                    try:
-                                        backend_response = requests.post(
-                                            f"{DJANGO_API_URL}log_move/",
-                                            json={
-                                                "task_title": snapshot[
-                                                    "title"
-                                                ],
-                                                "task_id": task_id,
-                                                "from_column": old[
-                                                    "boardColumn"
-                                                ],
-                                                "to_column": snapshot[
-                                                    "boardColumn"
-                                                ],
-                                                "user_name": user_name,
-                                                "move_time": now.isoformat(),
-                                                "time_spent": time_spent,
-                                                "board_name": context.user_data[
-                                                    "selected_board"
-                                                ][
-                                                    "name"
-                                                ],
-                                            },
-                                        )
-                                        if backend_response.status_code != 201:
-                                            logger.logger.error(
-                                                f"Ошибка отправки на бэкенд: {backend_response.text}"
-                                            )
-                                    except Exception as req_err:
-                                        logger.logger.error(
-                                            f"Ошибка requests: {req_err}"
-                                        )
-                            else:
-                                # Если нет исполнителей
-                                try:
-                                    backend_response = requests.post(
-                                        f"{DJANGO_API_URL}log_move/",
-                                        json={
-                                            "task_title": snapshot["title"],
-                                            "task_id": task_id,
-                                            "from_column": old["boardColumn"],
-                                            "to_column": snapshot[
-                                                "boardColumn"
-                                            ],
-                                            "user_name": "Не назначен",
-                                            "move_time": now.isoformat(),
-                                            "time_spent": time_spent,
-                                            "board_name": context.user_data[
-                                                "selected_board"
-                                            ]["name"],
-                                        },
-                                    )
-                                    if backend_response.status_code != 200:
-                                        logger.logger.error(
-                                            f"Ошибка отправки на бэкенд: {backend_response.text}"
-                                        )
-                                except Exception as req_err:
-                                    logger.logger.error(
-                                        f"Ошибка requests: {req_err}"
-                                    )
-                            # Обновляем время входа в новую колонку
-                            snapshot["column_enter_time"] = now
-                        if old["isCompleted"] != snapshot["isCompleted"]:
-                            changes.append(
-                                f"⚡ Статус: {'Выполнена' if old['isCompleted'] else 'Активна'} → "
-                                f"{'Выполнена' if snapshot['isCompleted'] else 'Активна'}"
-                            )
-                        if (
-                            old["isDeleted"] != snapshot["isDeleted"]
-                            and snapshot["isDeleted"]
-                        ):
-                            changes.append("❌ Задача удалена")
-
-                        if changes:
-                            await context.bot.send_message(
-                                chat_id=chat_id,
-                                text=f"🔔 Обновление задачи {snapshot['title']}:\n"
-                                + "\n".join(changes),
-                                reply_markup=keyboard,
-                            )
-                        tasks_state[task_id] = snapshot
+        # Подписка чата проверяется до рендера: отфильтрованные
+        # изменения не рендерятся и не отправляются
+        selected = limit_catchup(
+            context.chat_data, subscription.select(changes)
+        )
+        outbox.extend(
+            (board, *item, polled_at, detected_at, diffed_at)
+            for item in selected
+        )
 
-                context.user_data["tasks_state"] = tasks_state
+    # Полный список доски — в зеркало для хендлеров
+    mirror.put_tasks(board_id, all_tasks)
 
-                removed_ids = set(tasks_state.keys()) - current_ids
-                for rid in removed_ids:
+    # Удаление видно только после последней страницы
+    detected_at = time.time_ns()
+    removed_ids = {
+        rid
+        for rid in set(tasks_state.keys()) - current_ids
+        # Созданные ботом во время цикла ещё не в выдаче WEEEK
+        if tasks_state[rid].get("adopted_at", 0) < polled_at
+    }
+    removed = [
+        (
+            make_change(REMOVED, rid, tasks_state[rid]),
+            None,
+            tasks_state[rid],
+            None,
+        )
+        for rid in removed_ids
+    ]
+    diffed_at = time.time_ns()
+    selected = limit_catchup(context.chat_data, subscription.select(removed))
+    outbox.extend(
+        (board, *item, polled_at, detected_at, diffed_at) for item in selected
+    )
+    for rid in removed_ids:
+        del tasks_state[rid]
+        index.remove(rid)
+        dwell.forget(rid)
+        deadline_watcher.cancel(chat_id, rid)
+
+
+def fetch_plan(project_id, watches):
+    """
+    Откуда брать страницы задач досок проекта: ([pump], {доска: страницы}).
+    Если отслеживается не меньше PROJECT_FETCH_MIN_BOARDS досок проекта,
+    задачи всего проекта грузятся одним потоком и делятся по boardId,
+    иначе у каждой доски свой поток.
+    """
+    if len(watches) < settings.PROJECT_FETCH_MIN_BOARDS:
+        return [], {
+            str(watch.id): api.iter_task_pages(watch.id, project_id)
+            for watch in watches
+        }
+
+    # Если в задаче нет boardId, доска определяется по колонке
+    column_board = {
+        column_id: str(watch.id)
+        for watch in watches
+        for column_id in watch.column_names
+    }
+
+    def board_of(task):
+        if task.get("boardId") is not None:
+            return str(task["boardId"])
+        return column_board.get(task.get("boardColumnId"))
+
+    pump, pages = api.split_pages(
+        api.iter_task_pages(None, project_id),
+        [str(watch.id) for watch in watches],
+        board_of,
+    )
+    return [pump], pages
+
+
+def is_outage(error):
+    """Временная недоступность WEEEK: сеть, таймаут, 429/5xx, автомат."""
+    return isinstance(error, (api.WeeekUnavailable, requests.RequestException))
+
+
+async def report_outage(context, chat_id, down):
+    """Одно сообщение на весь простой WEEEK и одно — когда он вернулся."""
+    if down == bool(context.chat_data.get("weeek_down")):
+        return
+    context.chat_data["weeek_down"] = down
+    text = (
+        "⚠️ WEEEK недоступен. Опрос досок приостановлен и возобновится "
+        "сам, когда WEEEK заработает."
+        if down
+        else "✅ WEEEK снова доступен, опрос досок возобновлён."
+    )
+    try:
+        await context.bot.send_message(chat_id=chat_id, text=text)
+    except Exception as e:
+        logger.logger.warning(f"Не удалось сообщить о WEEEK в {chat_id}: {e}")
+
+
+async def poll_watched_boards(chat_id, context):
+    """
+    Фоновая задача чата: за один цикл опрашивает все отслеживаемые доски.
+    Доски одного проекта опрашиваются вместе, параллельно и в одном слоте
+    бюджета опросов. Пока WEEEK недоступен, поллер ждёт автомат защиты,
+    а доски остаются в списке.
+    """
+    tenant = tenants.activate(chat_id)
+    mirror = mirror_for(tenant)
+
+    while watched_boards(context.chat_data) and not stopping.is_set():
+        # Список читается в начале цикла: доски можно добавлять на ходу
+        projects = {}
+        for watch in list(watched_boards(context.chat_data).values()):
+            projects.setdefault(watch.project_id, []).append(watch)
+
+        try:
+            # Список пользователей для маппинга ID к именам
+            id_to_name = await mirror.get_id_to_name()
+        except Exception as e:
+            logger.logger.warning(f"Не удалось получить участников: {e}")
+            if is_outage(e):
+                await report_outage(context, chat_id, True)
+            await pause(max(1, breaker.retry_in(tenant.id)))
+            continue
+
+        outage = False
+        for project_id, group in projects.items():
+            ready = [watch for watch in group if watch.ready]
+            pumps, pages = fetch_plan(project_id, ready)
+            outbox = []
+            # Загрузка досок проекта занимает слот из доли арендатора;
+            # уведомления уходят уже после него
+            async with tenants.poll_slot(tenant):
+                results = await asyncio.gather(
+                    *(
+                        (
+                            poll_board(
+                                chat_id,
+                                watch,
+                                context,
+                                id_to_name,
+                                pages[str(watch.id)],
+                                outbox,
+                            )
+                            if watch.ready
+                            else init_board(
+                                chat_id, watch, context, id_to_name
+                            )
+                        )
+                        for watch in group
+                    ),
+                    *pumps,
+                    return_exceptions=True,
+                )
+            for watch, result in zip(group, results):
+                if is_outage(result):
+                    # WEEEK недоступен — доска остаётся, ждём восстановления
+                    outage = True
+                    logger.logger.warning(
+                        f"WEEEK недоступен для доски {watch.id}: {result}"
+                    )
+                elif isinstance(result, api.WeeekApiError):
+                    # Неуспешный ответ WEEEK — пропускаем цикл доски
+                    logger.logger.warning(
+                        f"WEEEK вернул ошибку по доске {watch.id}: {result}"
+                    )
+                elif isinstance(result, Exception):
+                    logger.logger.error(
+                        f"Ошибка опроса доски {watch.id}: {result}"
+                    )
                     await context.bot.send_message(
                         chat_id=chat_id,
-                        text=f"❌ Задача {tasks_state[rid]['title']} удалена или скрыта",
+                        text=f"Ошибка при получении задач доски "
+                        f"{watch.name}: {result}. Доска больше не "
+                        "отслеживается.",
                     )
-                    del tasks_state[rid]
-
-            await asyncio.sleep(1)
+                    drop_watch(context, chat_id, watch.id)
+            quiet = subscription_for(context.chat_data).is_quiet()
+            for item in outbox:
+                if quiet:
+                    # В тихие часы — в очередь, отправим после них
+                    _, change, old, new, *_ = item
+                    hold(
+                        context.chat_data,
+                        change_text(change, old, new),
+                        None if change.kind == REMOVED else change.task_id,
+                    )
+                    continue
+                try:
+                    await notify_change(context, chat_id, *item)
+                except Exception as e:
+                    logger.logger.error(
+                        f"Не удалось отправить уведомление в {chat_id}: {e}"
+                    )
+            if not quiet:
+                await send_held(context, chat_id)
 
-        except Exception as e:
-            logger.logger.error(f"Ошибка в poll_board_updates: {e}")
+        await report_outage(context, chat_id, outage)
+        # Догоняющий цикл закончен, только если WEEEK ответил по всем доскам
+        skipped = 0 if outage else finish_catchup(context.chat_data)
+        if skipped:
             await context.bot.send_message(
-                chat_id=chat_id, text=f"Ошибка при получении задач: {e}"
+                chat_id=chat_id,
+                text=f"…и ещё {skipped} изменений за время перезапуска бота",
             )
-            break
+        mirror.save()
+        await tracer.flush()
+        # Пока автомат разомкнут, запросы всё равно не уйдут — ждём его
+        await pause(max(1, breaker.retry_in(tenant.id)) if outage else 1)
 
 
 async def choose_board(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -656,9 +1103,6 @@ async def choose_board(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"Selected board: {board_name} (ID: {board_id}), chat_id: {chat_id}"
     )
 
-    # Останавливаем старый polling
-    await stop_polling(context)
-
     # Кнопки под клавиатурой
     keyboard = ReplyKeyboardMarkup(
         [
@@ -674,14 +1118,11 @@ async def choose_board(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=keyboard,
     )
 
-    # Запускаем новую фоновую задачу
-    task = context.application.create_task(
-        poll_board_updates(chat_id, project_id, board_id, context)
+    # Доска добавляется к отслеживаемым, остальные продолжают опрашиваться
+    watched = await watch_board(
+        context, chat_id, project_id, context.user_data["selected_board"]
     )
-    context.user_data["poll_task"] = task
-    logger.logger.info(f"Started poll task for board_id: {board_id}")
-
-    await update.message.reply_text(f"Запускаем таск для доски {board_id}...")
+    await update.message.reply_text(watching_text(context, watched))
     return ConversationHandler.END
 
 
@@ -697,35 +1138,35 @@ async def add_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return CHOOSING_PROJECT
 
     board_id = board["id"]
-    columns_response = api.get_boardColumn_list(board_id)
+    try:
+        columns_data = await mirror_for(tenants.current()).get_columns(
+            board_id
+        )
+    except Exception as e:
+        logger.logger.error(f"Ошибка при получении колонок: {e}")
+        await update.message.reply_text("Ошибка при получении списка колонок.")
+        return ConversationHandler.END
 
-    if columns_response.get("success") and "boardColumns" in columns_response:
-        columns_data = columns_response["boardColumns"]
-        context.user_data["columns"] = columns_data
+    context.user_data["columns"] = columns_data
 
-        column_names = [
-            str(column.get("name", "Unnamed")) for column in columns_data
-        ]
-        if not column_names:
-            await update.message.reply_text(
-                "Колонки не найдены для этой доски."
-            )
-            return ConversationHandler.END
+    column_names = [
+        str(column.get("name", "Unnamed")) for column in columns_data
+    ]
+    if not column_names:
+        await update.message.reply_text("Колонки не найдены для этой доски.")
+        return ConversationHandler.END
 
-        keyboard = [[KeyboardButton(name)] for name in column_names]
+    keyboard = [[KeyboardButton(name)] for name in column_names]
 
-        reply_markup = ReplyKeyboardMarkup(
-            keyboard, one_time_keyboard=True, resize_keyboard=True
-        )
+    reply_markup = ReplyKeyboardMarkup(
+        keyboard, one_time_keyboard=True, resize_keyboard=True
+    )
 
-        await update.message.reply_text(
-            f"Выберите колонку для новой задачи в доске {board['name']}:",
-            reply_markup=reply_markup,
-        )
-        return CHOOSING_COLUMN
-    else:
-        await update.message.reply_text("Ошибка при получении списка колонок.")
-        return ConversationHandler.END
+    await update.message.reply_text(
+        f"Выберите колонку для новой задачи в доске {board['name']}:",
+        reply_markup=reply_markup,
+    )
+    return CHOOSING_COLUMN
 
 
 async def choose_column(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -755,7 +1196,10 @@ async def choose_column(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )  # Пустая клавиатура
 
     await update.message.reply_text(
-        f"Вы выбрали колонку: {column_name}\nВведите заголовок задачи:",
+        f"Вы выбрали колонку: {column_name}\nВведите заголовок задачи.\n\n"
+        "Чтобы создать сразу несколько задач, отправьте их списком — "
+        "по задаче на строку (можно «Заголовок | описание») — или файл "
+        "CSV/Markdown с чеклистом.",
         reply_markup=reply_markup,
     )
     return ENTER_TITLE
@@ -769,6 +1213,14 @@ async def enter_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return ENTER_TITLE
 
+    if "\n" in title:
+        try:
+            tasks = parse_message(title)
+        except BulkParseError as e:
+            await update.message.reply_text(f"{e}. Попробуйте еще раз.")
+            return ENTER_TITLE
+        return await start_bulk_creation(update, context, tasks)
+
     context.user_data["task_title"] = title
 
     await update.message.reply_text(
@@ -791,21 +1243,23 @@ async def enter_description(
     column_id = context.user_data["selected_column"]["id"]
     title = context.user_data["task_title"]
 
-    # Здесь вставьте ваш POST-запрос для создания задачи
-    create_response = api.create_task(
-        project_id=project_id,
-        column_id=column_id,
-        title=title,
-        description=description,
+    # Создание уходит в очередь: отвечаем сразу, итог — правкой сообщения
+    request = CreateRequest(
+        update.effective_chat.id,
+        project_id,
+        board_id,
+        column_id,
+        title,
+        description,
     )
-    logger.logger.info(create_response)
-    if create_response.get("success"):
-        await update.message.reply_text(f"Задача '{title}' успешно создана!")
-    else:
-        await update.message.reply_text(
-            f"Ошибка при создании задачи: {create_response.get('message', 'Неизвестная ошибка')}"
-        )
+    future = creation_queue.submit(request)
+    status = await update.message.reply_text(f"⏳ Создаю задачу '{title}'…")
+    start_job(report_created(context, status, board_id, title, future))
 
+    return await finish_task_dialog(update, context)
+
+
+async def finish_task_dialog(update, context):
     # Очистка временных данных
     context.user_data.pop("task_title", None)
     context.user_data.pop("task_description", None)
@@ -826,137 +1280,236 @@ async def enter_description(
     return ConversationHandler.END
 
 
+async def enter_tasks_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Пакетное создание задач из CSV или Markdown-файла."""
+    document = update.message.document
+    try:
+        if document.file_size and document.file_size > MAX_FILE_SIZE:
+            raise BulkParseError("Файл больше 1 МБ")
+        file = await document.get_file()
+        tasks = parse_file(
+            document.file_name, await file.download_as_bytearray()
+        )
+    except BulkParseError as e:
+        await update.message.reply_text(f"{e}. Попробуйте еще раз.")
+        return ENTER_TITLE
+    if not tasks:
+        await update.message.reply_text(
+            "В файле не найдено ни одной задачи. Попробуйте еще раз."
+        )
+        return ENTER_TITLE
+    return await start_bulk_creation(update, context, tasks)
+
+
+async def start_bulk_creation(update, context, tasks):
+    project_id = context.user_data["selected_project"]["id"]
+    board_id = context.user_data["selected_board"]["id"]
+    column = context.user_data["selected_column"]
+    status = await update.message.reply_text(
+        f"⏳ Создаю задачи в колонке {column['name']}: 0/{len(tasks)}"
+    )
+    requests_ = [
+        CreateRequest(
+            update.effective_chat.id,
+            project_id,
+            board_id,
+            column["id"],
+            title,
+            description,
+        )
+        for title, description in tasks
+    ]
+    start_job(run_bulk_creation(context, status, board_id, column, requests_))
+    return await finish_task_dialog(update, context)
+
+
+async def run_bulk_creation(context, status, board_id, column, requests_):
+    """
+    Создаёт задачи через bulk_queue, не больше BULK_CONCURRENCY из этого
+    пакета одновременно, и правит одно сообщение с прогрессом.
+    """
+    slots = asyncio.Semaphore(BULK_CONCURRENCY)
+    total = len(requests_)
+    created = 0
+    failed = []
+    postponed = 0
+    shown_at = 0.0
+
+    async def create(request):
+        async with slots:
+            try:
+                return request, await bulk_queue.submit(request), None
+            except Exception as e:
+                return request, None, e
+
+    async def show(text):
+        try:
+            await status.edit_text(text)
+        except BadRequest:
+            pass  # текст не изменился
+
+    for future in asyncio.as_completed([create(r) for r in requests_]):
+        request, task, error = await future
+        if isinstance(error, Postponed):
+            postponed += 1
+        elif error is not None:
+            failed.append(f"• {request.title}: {error}")
+        else:
+            created += 1
+            await adopt_created_task(context, status.chat_id, board_id, task)
+        # Правим сообщение не чаще раза в PROGRESS_INTERVAL секунд
+        if time.monotonic() - shown_at >= PROGRESS_INTERVAL:
+            shown_at = time.monotonic()
+            await show(
+                f"⏳ Создаю задачи в колонке {column['name']}: "
+                f"{created + len(failed) + postponed}/{total}"
+                + (f", ошибок: {len(failed)}" if failed else "")
+            )
+
+    text = f"✅ Создано задач в колонке {column['name']}: {created}/{total}"
+    if failed:
+        text += "\nНе удалось создать:\n" + "\n".join(failed[:10])
+        if len(failed) > 10:
+            text += f"\n… и ещё {len(failed) - 10}"
+    if postponed:
+        text += f"\n⏸ Будут созданы после перезапуска бота: {postponed}"
+    await show(text)
+
+
+async def report_created(context, status, board_id, title, future):
+    """Дожидается создания задачи и правит сообщение «Создаю задачу»."""
+    try:
+        task = await future
+    except Postponed:
+        await status.edit_text(
+            f"⏸ Бот перезапускается: задача '{title}' будет создана "
+            "после запуска."
+        )
+        return
+    except Exception as e:
+        await status.edit_text(f"Ошибка при создании задачи '{title}': {e}")
+        return
+    await adopt_created_task(context, status.chat_id, board_id, task)
+    await status.edit_text(
+        f"Задача '{title}' успешно создана!",
+        reply_markup=show_task_keyboard(task["id"]),
+    )
+
+
+async def report_restored(application, requests_):
+    """
+    Досоздаёт задачи, которые не успели создать до остановки бота, и
+    сообщает итог в каждый чат одним сообщением.
+    """
+    chats = {}
+    for request in requests_:
+        chats.setdefault(request.chat_id, []).append(request)
+    await asyncio.gather(
+        *(
+            report_restored_chat(application, chat_id, group)
+            for chat_id, group in chats.items()
+        )
+    )
+
+
+async def report_restored_chat(application, chat_id, requests_):
+    tenants.activate(chat_id)
+    context = CallbackContext(application, chat_id=chat_id)
+    results = await asyncio.gather(
+        *(bulk_queue.submit(request) for request in requests_),
+        return_exceptions=True,
+    )
+    created = 0
+    failed = []
+    for request, result in zip(requests_, results):
+        if isinstance(result, Postponed):
+            continue  # снова остановка — запрос в следующем снимке
+        if isinstance(result, BaseException):
+            failed.append(f"• {request.title}: {result}")
+            continue
+        created += 1
+        await adopt_created_task(context, chat_id, request.board_id, result)
+    if not created and not failed:
+        return
+    text = (
+        f"✅ После перезапуска бота создано задач: "
+        f"{created}/{len(requests_)}"
+    )
+    if failed:
+        text += "\nНе удалось создать:\n" + "\n".join(failed[:10])
+    try:
+        await application.bot.send_message(chat_id=chat_id, text=text)
+    except Exception as e:
+        logger.logger.error(f"Не удалось отправить итог в {chat_id}: {e}")
+
+
 async def show_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    task_id = query.data.replace("show_task_", "")
-    project_id = context.user_data["selected_project"]["id"]
+    task_id = callback_arg(query.data)
     board_id = context.user_data["selected_board"]["id"]
 
-    # Загружаем список пользователей для маппинга ID к именам
-    assignees_response = api.get_assignees(board_id)
-    id_to_name = {}
-    if assignees_response.get("success") and "members" in assignees_response:
-        id_to_name = {
-            member[
-                "id"
-            ]: f"{member.get('firstName', '')} {member.get('lastName', '')}".strip()
-            for member in assignees_response["members"]
-        }
-
-    # Получаем информацию о задаче
-    task_response = api.get_task(
-        task_id
-    )  # Предполагается, что есть метод get_task
-    if not task_response.get("success") or "task" not in task_response:
+    # Всё берём из зеркала; в WEEEK — только если доска не опрашивается
+    mirror = mirror_for(tenants.current())
+    try:
+        id_to_name = await mirror.get_id_to_name()
+        task = await mirror.get_task(task_id)
+        column_names = (
+            await mirror.get_column_names(task.get("boardId") or board_id)
+            if task
+            else {}
+        )
+    except Exception as e:
+        logger.logger.error(f"Ошибка при получении задачи: {e}")
+        task = None
+    if not task:
         await query.message.reply_text("Ошибка при получении задачи.")
         return
 
-    task = task_response["task"]
     col_id = task.get("boardColumnId")
-    columns_response = api.get_boardColumn_list(board_id)
-    column_names = {
-        col["id"]: col["name"]
-        for col in columns_response.get("boardColumns", [])
-    }
     col_name = column_names.get(col_id, f"Колонка {col_id}")
-    assignees_ids = task.get("assignees", [])
-    assignees_names = (
-        ", ".join(id_to_name.get(aid, str(aid)) for aid in assignees_ids)
-        or "Не назначен"
-    )
+    assignees = assignee_names(task.get("assignees", []), id_to_name)
 
-    message = (
-        f"📌 {task.get('title', 'Без названия')}\n"
-        f"Описание: {remove_html_tags(task.get('description', 'Без описания'))}\n"
-        f"Колонка: {col_name}\n"
-        f"Исполнитель: {assignees_names}\n"
-        f"Дедлайн: {task.get('dueDate', 'Без дедлайна')}\n"
-        f"Тип: {task.get('type', 'Не указан')}\n"
-        f"Статус: {'Выполнена' if task.get('isCompleted') else 'Активна'}\n"
-        f"Ссылка: https://app.weeek.net/ws/{api.WORKSPACE_ID}/task/{task.get('id', 0)}\n"
+    message = task_card(
+        task, col_name, assignees, api.workspace_id(), full=True
     )
 
     await query.message.reply_text(message)
 
 
-async def display_tasks(
-    update: Update, context: ContextTypes.DEFAULT_TYPE, query=None
-):
-    if query:
-        reply_func = query.message.reply_text
-    else:
-        reply_func = update.message.reply_text
+TASK_LIST_PER_PAGE = 5  # сколько задач показывать на одной странице
+TASK_LIST_VIEWS_KEPT = 10  # сколько последних списков помнить в чате
 
-    project_id = context.user_data["selected_project"]["id"]
-    board_id = context.user_data["selected_board"]["id"]
-    selected_column = context.user_data.get("selected_sort_column")
-    sort_field = context.user_data.get("sort_field")
-    filter_field = context.user_data.get("filter_field")
-    filter_value = context.user_data.get("filter_value")
-
-    # Загружаем список пользователей для маппинга ID к именам
-    assignees_response = api.get_assignees(board_id)
-    id_to_name = {}
-    if assignees_response.get("success") and "members" in assignees_response:
-        id_to_name = {
-            member[
-                "id"
-            ]: f"{member.get('firstName', '')} {member.get('lastName', '')}".strip()
-            for member in assignees_response["members"]
-        }
 
-    # Получаем список колонок для названий
-    try:
-        columns_response = api.get_boardColumn_list(board_id)
-        column_names = {}
-        if (
-            columns_response.get("success")
-            and "boardColumns" in columns_response
-        ):
-            column_names = {
-                col["id"]: col["name"]
-                for col in columns_response["boardColumns"]
-            }
-        else:
-            await reply_func("Ошибка при получении списка колонок.")
-            return ConversationHandler.END
-    except Exception as e:
-        logger.logger.error(f"Ошибка при получении колонок: {e}")
-        await reply_func("Ошибка при получении списка колонок.")
-        return ConversationHandler.END
+async def render_task_list(view):
+    """
+    Одна страница списка задач: весь текст и клавиатура для одного
+    сообщения. Возвращает (text, reply_markup) или (text, None) при ошибке.
+    """
+    board_id = view["board_id"]
+    page = view["page"]
 
-    # Получаем задачи
-    page = context.user_data.get("page", 1)
-    per_page = 5  # сколько задач показывать на одной странице
-    offset = (page - 1) * per_page
+    # Участники, колонки и задачи — из зеркала
+    mirror = mirror_for(tenants.current())
     try:
-        response = api.get_tasks(
-            projectId=project_id,
-            boardId=board_id,
-            perPage=per_page,
-            offset=offset,
-        )
-
-        if not response.get("success") or "tasks" not in response:
-            await reply_func("Ошибка при получении задач.")
-            return ConversationHandler.END
+        id_to_name = await mirror.get_id_to_name()
+        column_names = await mirror.get_column_names(board_id)
+        tasks = await mirror.get_tasks(board_id, view["project_id"])
     except Exception as e:
         logger.logger.error(f"Ошибка при получении задач: {e}")
-        await reply_func("Ошибка при получении задач.")
-        return ConversationHandler.END
+        return "Ошибка при получении задач.", None
 
-    tasks = response["tasks"]
     # Фильтруем по колонке, если указана
-    if selected_column:
+    if view["column_id"] is not None:
         tasks = [
             task
             for task in tasks
-            if task.get("boardColumnId") == selected_column["id"]
+            if task.get("boardColumnId") == view["column_id"]
         ]
 
     # Фильтруем по фильтру, если указан
+    filter_field, filter_value = view["filter_field"], view["filter_value"]
     if filter_value is not None and filter_field:
         tasks = [
             task
@@ -965,81 +1518,85 @@ async def display_tasks(
         ]
 
     # Сортировка
+    sort_field = view["sort_field"]
     reverse = sort_field == "createdAt"
     tasks.sort(key=lambda x: x.get(sort_field, "") or "", reverse=reverse)
 
-    if not tasks:
-        await reply_func("Задачи не найдены.")
-    else:
+    # Страница режется уже после фильтров — на каждой полные 5 задач
+    start = (page - 1) * TASK_LIST_PER_PAGE
+    has_next = start + TASK_LIST_PER_PAGE < len(tasks)
+    tasks = tasks[start : start + TASK_LIST_PER_PAGE]
+
+    keyboard = []
+    if tasks:
+        workspace_id = api.workspace_id()
+        cards = [f"📋 Задачи — страница {page}\n"]
         for task in tasks:
             col_id = task.get("boardColumnId")
             col_name = column_names.get(col_id, f"Колонка {col_id}")
-            title = task.get("title", "Без названия")
-            assignees_ids = task.get("assignees", [])
-            assignee = (
-                ", ".join(
-                    id_to_name.get(aid, str(aid)) for aid in assignees_ids
-                )
-                or "Не назначен"
-            )
-            due_date = task.get("dueDate", "Без дедлайна")
-            task_type = task.get("type", "Не указан")
-            link = task.get("id", "0")
-            status = "Выполнена" if task.get("isCompleted") else "Активна"
-
-            message = (
-                f"📌 {title}\n"
-                f"Колонка: {col_name}\n"
-                f"Исполнитель: {assignee}\n"
-                f"Дедлайн: {due_date}\n"
-                f"Тип: {task_type}\n"
-                f"Статус: {status}\n"
-                f"Ссылка: https://app.weeek.net/ws/{api.WORKSPACE_ID}/task/{link}\n"
-                f"---\n"
-            )
-
-            keyboard = InlineKeyboardMarkup.from_button(
-                InlineKeyboardButton(
-                    "Посмотреть полностью",
-                    callback_data=f"show_task_{task['id']}",
-                )
+            assignees = assignee_names(task.get("assignees", []), id_to_name)
+            cards.append(task_card(task, col_name, assignees, workspace_id))
+            title = task.get("title") or "Без названия"
+            keyboard.append(
+                [
+                    InlineKeyboardButton(
+                        f"🔍 {title[:40]}",
+                        callback_data=encode(SHOW_TASK, task["id"]),
+                    )
+                ]
             )
+        text = "\n".join(cards)
+    else:
+        text = f"Задачи не найдены (страница {page})."
 
-            await reply_func(message, reply_markup=keyboard)
-
-    # Очистка
-    context.user_data.pop("sort_field", None)
-    context.user_data.pop("filter_field", None)
-    context.user_data.pop("filter_value", None)
-    context.user_data.pop("selected_sort_column", None)
-
-    # Возвращаем persistent клавиатуру
     # Пагинация
     pagination_buttons = []
     if page > 1:
         pagination_buttons.append(
-            InlineKeyboardButton("⬅️ Назад", callback_data=f"page_{page-1}")
+            InlineKeyboardButton(
+                "⬅️ Назад", callback_data=encode(TASK_PAGE, page - 1)
+            )
         )
-    if len(tasks) == per_page:  # значит, может быть следующая страница
+    if has_next:
         pagination_buttons.append(
-            InlineKeyboardButton("➡️ Далее", callback_data=f"page_{page+1}")
+            InlineKeyboardButton(
+                "➡️ Далее", callback_data=encode(TASK_PAGE, page + 1)
+            )
         )
-
     if pagination_buttons:
-        await reply_func(
-            f"Страница {page}",
-            reply_markup=InlineKeyboardMarkup([pagination_buttons]),
-        )
+        keyboard.append(pagination_buttons)
 
-    keyboard = ReplyKeyboardMarkup(
-        [
-            ["🔄 Поменять проект", "🔄 Поменять доску"],
-            ["Добавить задачу", "📋 Показать задачи"],
-        ],
-        resize_keyboard=True,
-        one_time_keyboard=False,
-    )
-    await reply_func("Выберите действие:", reply_markup=keyboard)
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+async def display_tasks(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, query=None
+):
+    """Открывает новый список задач одним сообщением с выбранным фильтром."""
+    if query:
+        reply_func = query.message.reply_text
+    else:
+        reply_func = update.message.reply_text
+
+    selected_column = context.user_data.pop("selected_sort_column", None)
+    view = {
+        "project_id": context.user_data["selected_project"]["id"],
+        "board_id": context.user_data["selected_board"]["id"],
+        "column_id": selected_column["id"] if selected_column else None,
+        "sort_field": context.user_data.pop("sort_field", None),
+        "filter_field": context.user_data.pop("filter_field", None),
+        "filter_value": context.user_data.pop("filter_value", None),
+        "page": 1,
+    }
+
+    text, reply_markup = await render_task_list(view)
+    message = await reply_func(text, reply_markup=reply_markup)
+
+    # Параметры списка храним по id сообщения: листание правит его на месте
+    views = context.chat_data.setdefault("task_lists", {})
+    views[message.message_id] = view
+    for old_id in sorted(views)[:-TASK_LIST_VIEWS_KEPT]:
+        del views[old_id]
     return ConversationHandler.END
 
 
@@ -1048,9 +1605,31 @@ async def handle_pagination(
 ):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace("page_", ""))
-    context.user_data["page"] = page
-    return await display_tasks(update, context, query=query)
+
+    views = context.chat_data.setdefault("task_lists", {})
+    view = views.get(query.message.message_id)
+    if view is None:
+        # Список из старого сообщения — без фильтров, по текущей доске
+        if not context.user_data.get("selected_board"):
+            return ConversationHandler.END
+        view = {
+            "project_id": context.user_data["selected_project"]["id"],
+            "board_id": context.user_data["selected_board"]["id"],
+            "column_id": None,
+            "sort_field": None,
+            "filter_field": None,
+            "filter_value": None,
+        }
+        views[query.message.message_id] = view
+    view["page"] = int(callback_arg(query.data))
+
+    text, reply_markup = await render_task_list(view)
+    try:
+        await query.edit_message_text(text, reply_markup=reply_markup)
+    except BadRequest as e:
+        # "Message is not modified" — страница не изменилась
+        logger.logger.info(f"Страница списка не обновлена: {e}")
+    return ConversationHandler.END
 
 
 async def handle_sorting(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1060,37 +1639,28 @@ async def handle_sorting(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"handle_sorting called with data: {query.data}"
     )  # Отладка
 
-    sort_type = query.data
-    board_id = context.user_data["selected_board"]["id"]
+    sort_type = callback_arg(query.data)
 
     sort_field_map = {
-        "sort_date": "createdAt",
-        "sort_assignee": "assignees",
-        "sort_dueDate": "dueDate",
-        "sort_type": "type",
+        "date": "createdAt",
+        "assignee": "assignees",
+        "dueDate": "dueDate",
+        "type": "type",
     }
     context.user_data["sort_field"] = sort_field_map[sort_type]
-    if sort_type == "sort_date":
+    if sort_type == "date":
         context.user_data["filter_field"] = None
         context.user_data["filter_value"] = None
         return await display_tasks(update, context, query=query)
     else:
         context.user_data["filter_field"] = sort_field_map[sort_type]
 
-    if sort_type == "sort_assignee":
+    if sort_type == "assignee":
         # Получаем список исполнителей
-        assignees_response = api.get_assignees(board_id)
-        if (
-            assignees_response.get("success")
-            and "members" in assignees_response
-        ):
-            assignees = assignees_response["members"]
-            id_to_name = {
-                assignee[
-                    "id"
-                ]: f"{assignee.get('firstName','')} {assignee.get('lastName','')}".strip()
-                for assignee in assignees
-            }
+        mirror = mirror_for(tenants.current())
+        assignees = await mirror.get_members()
+        if assignees:
+            id_to_name = await mirror.get_id_to_name()
             context.user_data["id_to_name"] = id_to_name
             keyboard = []
             for assignee in assignees:
@@ -1099,12 +1669,16 @@ async def handle_sorting(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 keyboard.append(
                     [
                         InlineKeyboardButton(
-                            name, callback_data=f"assignee_{user_id}"
+                            name, callback_data=encode(ASSIGNEE, user_id)
                         )
                     ]
                 )
             keyboard.append(
-                [InlineKeyboardButton("Все", callback_data="assignee_all")]
+                [
+                    InlineKeyboardButton(
+                        "Все", callback_data=encode(ASSIGNEE, "all")
+                    )
+                ]
             )
             await query.message.reply_text(
                 "Выберите исполнителя:",
@@ -1117,20 +1691,26 @@ async def handle_sorting(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return ConversationHandler.END
 
-    elif sort_type == "sort_dueDate":
+    elif sort_type == "dueDate":
         await query.message.reply_text(
             "Введите дату (YYYY-MM-DD) или '.' для всех:"
         )
         return ENTER_DUE_DATE
-    elif sort_type == "sort_type":
+    elif sort_type == "type":
         keyboard = [
             [
-                InlineKeyboardButton("Действие", callback_data="type_action"),
-                InlineKeyboardButton("Встреча", callback_data="type_meet"),
+                InlineKeyboardButton(
+                    "Действие", callback_data=encode(TYPE, "action")
+                ),
+                InlineKeyboardButton(
+                    "Встреча", callback_data=encode(TYPE, "meet")
+                ),
             ],
             [
-                InlineKeyboardButton("Звонок", callback_data="type_call"),
-                InlineKeyboardButton("Все", callback_data="type_all"),
+                InlineKeyboardButton(
+                    "Звонок", callback_data=encode(TYPE, "call")
+                ),
+                InlineKeyboardButton("Все", callback_data=encode(TYPE, "all")),
             ],
         ]
         await query.message.reply_text(
@@ -1143,7 +1723,7 @@ async def choose_assignee(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    assignee_data = query.data.replace("assignee_", "")
+    assignee_data = callback_arg(query.data)
     if assignee_data == "all":
         context.user_data["filter_value"] = None
     else:
@@ -1171,7 +1751,7 @@ async def choose_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    type_data = query.data.replace("type_", "")
+    type_data = callback_arg(query.data)
     if type_data == "all":
         context.user_data["filter_value"] = None
     else:
@@ -1190,38 +1770,47 @@ async def show_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return CHOOSING_PROJECT
 
     board_id = board["id"]
-    columns_response = api.get_boardColumn_list(board_id)
+    try:
+        columns_data = await mirror_for(tenants.current()).get_columns(
+            board_id
+        )
+    except Exception as e:
+        logger.logger.error(f"Ошибка при получении колонок: {e}")
+        await update.message.reply_text("Ошибка при получении списка колонок.")
+        return ConversationHandler.END
 
-    if columns_response.get("success") and "boardColumns" in columns_response:
-        columns_data = columns_response["boardColumns"]
-        context.user_data["columns"] = columns_data
+    context.user_data["columns"] = columns_data
+
+    if not columns_data:
+        await update.message.reply_text("Колонки не найдены для этой доски.")
+        return ConversationHandler.END
 
-        column_names = [
-            str(column.get("name", "Unnamed")) for column in columns_data
+    # В callback_data кладём id колонки: имя может не влезть в 64 байта
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                str(column.get("name", "Unnamed")),
+                callback_data=encode(SORT_COLUMN, column.get("id")),
+            )
         ]
-        if not column_names:
-            await update.message.reply_text(
-                "Колонки не найдены для этой доски."
+        for column in columns_data
+    ]
+    # Добавляем опцию "Все колонки"
+    keyboard.append(
+        [
+            InlineKeyboardButton(
+                "Все колонки", callback_data=encode(SORT_COLUMN, "all")
             )
-            return ConversationHandler.END
-
-        # Добавляем опцию "Все колонки"
-        column_names.append("Все колонки")
-        keyboard = [
-            [InlineKeyboardButton(name, callback_data=f"column_{name}")]
-            for name in column_names
         ]
+    )
 
-        reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = InlineKeyboardMarkup(keyboard)
 
-        await update.message.reply_text(
-            f"Выберите колонку для фильтрации задач (или 'Все колонки'):",
-            reply_markup=reply_markup,
-        )
-        return CHOOSING_SORT_COLUMN
-    else:
-        await update.message.reply_text("Ошибка при получении списка колонок.")
-        return ConversationHandler.END
+    await update.message.reply_text(
+        f"Выберите колонку для фильтрации задач (или 'Все колонки'):",
+        reply_markup=reply_markup,
+    )
+    return CHOOSING_SORT_COLUMN
 
 
 async def choose_sort_column(
@@ -1233,17 +1822,19 @@ async def choose_sort_column(
         f"choose_sort_column called with data: {query.data}"
     )  # Отладка
 
-    column_name = query.data.replace("column_", "")
+    column_key = callback_arg(query.data)
     columns = context.user_data.get("columns", [])
 
     # Если выбрано "Все колонки", не фильтруем по колонке
-    if column_name == "Все колонки":
+    if column_key in ("all", "Все колонки"):
         context.user_data["selected_sort_column"] = None
     else:
-        column_id = None
+        # Новые кнопки несут id колонки, старые — её название
+        column_id = column_name = None
         for column in columns:
-            if column.get("name") == column_name:
+            if column_key in (str(column.get("id")), column.get("name")):
                 column_id = column.get("id")
+                column_name = column.get("name")
                 break
         if column_id is None:
             await query.message.reply_text(
@@ -1259,16 +1850,20 @@ async def choose_sort_column(
     keyboard = InlineKeyboardMarkup(
         [
             [
-                InlineKeyboardButton("По дате", callback_data="sort_date"),
                 InlineKeyboardButton(
-                    "По исполнителю", callback_data="sort_assignee"
+                    "По дате", callback_data=encode(SORT, "date")
+                ),
+                InlineKeyboardButton(
+                    "По исполнителю", callback_data=encode(SORT, "assignee")
                 ),
             ],
             [
                 InlineKeyboardButton(
-                    "По дедлайну", callback_data="sort_dueDate"
+                    "По дедлайну", callback_data=encode(SORT, "dueDate")
+                ),
+                InlineKeyboardButton(
+                    "По типу", callback_data=encode(SORT, "type")
                 ),
-                InlineKeyboardButton("По типу", callback_data="sort_type"),
             ],
         ]
     )
@@ -1279,113 +1874,243 @@ async def choose_sort_column(
     return CHOOSING_SORT_COLUMN
 
 
+async def digest_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/digest daily|weekly|off — подписка чата, /digest now — сразу."""
+    arg = context.args[0].lower() if context.args else ""
+    if arg in PERIODS:
+        context.chat_data["digest"] = arg
+        await update.message.reply_text(
+            f"Дайджест {PERIODS[arg][1]} будет приходить в "
+            f"{settings.DIGEST_TIME} по Владивостоку."
+        )
+    elif arg == "off":
+        context.chat_data.pop("digest", None)
+        await update.message.reply_text("Дайджест отключён.")
+    elif arg == "now":
+        period = context.chat_data.get("digest", DAILY)
+        aggregates = await fetch_aggregates(
+            datetime.now(vladivostok_tz) - PERIODS[period][0]
+        )
+        text = chat_digest(
+            update.effective_chat.id, context.chat_data, period, aggregates
+        )
+        await update.message.reply_text(text or "Доски не отслеживаются.")
+    else:
+        await update.message.reply_text(
+            "/digest daily — каждое утро, /digest weekly — раз в неделю, "
+            "/digest off — отключить, /digest now — прислать сейчас."
+        )
+
+
+def watching_text(context, watched=True):
+    names = ", ".join(
+        watch.name for watch in watched_boards(context.chat_data).values()
+    )
+    if not watched:
+        return (
+            f"Можно отслеживать не больше {MAX_WATCHED_BOARDS} досок. "
+            f"Сейчас: {names}. Лишние уберите командой /unwatch."
+        )
+    return f"👀 Отслеживаемые доски: {names}"
+
+
+async def unwatch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/unwatch — кнопки для отключения досок, /unwatch all — всех сразу."""
+    watches = watched_boards(context.chat_data)
+    if context.args and context.args[0].lower() == "all":
+        for watch in list(watches.values()):
+            await unwatch_board(context, update.effective_chat.id, watch.id)
+        await update.message.reply_text("Отслеживание досок остановлено.")
+        return
+    if not watches:
+        await update.message.reply_text("Доски не отслеживаются.")
+        return
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                f"❌ {watch.name}", callback_data=encode(UNWATCH, key)
+            )
+        ]
+        for key, watch in watches.items()
+    ]
+    await update.message.reply_text(
+        "Какую доску перестать отслеживать?",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+    )
+
+
+async def handle_unwatch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    watch = watched_boards(context.chat_data).get(callback_arg(query.data))
+    if watch is None:
+        await query.edit_message_text("Доска уже не отслеживается.")
+        return
+    await unwatch_board(context, update.effective_chat.id, watch.id)
+    await query.edit_message_text(
+        f"Доска {watch.name} больше не отслеживается."
+    )
+
+
+async def latency(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Сводка задержек уведомлений по доскам чата (перцентили) и запросов к
+    WEEEK его пространства: доски других пространств не показываются.
+    """
+    boards = set(watched_boards(context.chat_data))
+    summary = await asyncio.to_thread(latency_summary, boards=boards)
+    text = format_summary(summary)
+    stats = flights.stats(tenants.current().id)
+    if stats:
+        text += "\n\n🔁 Запросы к WEEEK (всего / объединено):\n" + "\n".join(
+            f"  {name}: {calls} / {shared}"
+            for name, (calls, shared) in sorted(stats.items())
+        )
+    await update.message.reply_text(text)
+
+
+NOTIFY_USAGE = (
+    "Настройка уведомлений:\n"
+    "/notify mine Имя Фамилия — только задачи участника (off — все)\n"
+    "/notify columns Колонка, Колонка — только эти колонки (off — все)\n"
+    "/notify done on|off — только завершения задач\n"
+    "/notify quiet 22-8 — тихие часы по Владивостоку (off — без них)\n"
+    "/notify reset — сбросить правила"
+)
+
+
+async def notify_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Правила уведомлений чата: /notify <правило> <значение>."""
+    rules = rules_of(context.chat_data)
+    args = context.args or []
+    rule = args[0].lower() if args else ""
+    value = " ".join(args[1:]).strip()
+    off = value.lower() == "off"
+
+    if rule == "mine":
+        if off or not value:
+            rules["member_id"], rules["member_name"] = None, ""
+        else:
+            id_to_name = await mirror_for(tenants.current()).get_id_to_name()
+            # Точное совпадение имени важнее частичного: «Анна» не
+            # должна совпасть ещё и с «Анна Мария»
+            found = [
+                (member_id, name)
+                for member_id, name in id_to_name.items()
+                if value.lower() == name.lower()
+            ] or [
+                (member_id, name)
+                for member_id, name in id_to_name.items()
+                if value.lower() in name.lower()
+            ]
+            if len(found) != 1:
+                await update.message.reply_text(
+                    "Участник не найден."
+                    if not found
+                    else "Найдено несколько участников: "
+                    + ", ".join(name for _, name in found)
+                )
+                return
+            rules["member_id"], rules["member_name"] = found[0]
+    elif rule == "columns":
+        rules["columns"] = (
+            []
+            if off
+            else [name.strip() for name in value.split(",") if name.strip()]
+        )
+    elif rule == "done":
+        rules["completions"] = value.lower() == "on"
+    elif rule == "quiet":
+        try:
+            rules["quiet"] = None if off else parse_quiet(value)
+        except ValueError:
+            await update.message.reply_text(
+                "Укажите тихие часы как 22-8 или off."
+            )
+            return
+    elif rule == "reset":
+        context.chat_data.pop("subscription", None)
+        rules = rules_of(context.chat_data)
+    elif rule:
+        await update.message.reply_text(NOTIFY_USAGE)
+        return
+    else:
+        await update.message.reply_text(
+            describe(rules) + "\n\n" + NOTIFY_USAGE
+        )
+        return
+    await update.message.reply_text(describe(rules))
+
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Диалог отменен.")
     return ConversationHandler.END
 
 
+# Кнопки постоянной клавиатуры доступны в любом состоянии диалога
+menu = MenuRouter(
+    {
+        "🔄 Поменять проект": change_project,
+        "🔄 Поменять доску": change_board,
+        "Добавить задачу": add_task,
+        "📋 Показать задачи": show_tasks,
+    }
+)
+
+for op, callback in (
+    (SELECT_PROJECT, handle_project_selection),
+    (PAGE_PROJECT, handle_project_pagination),
+    (SELECT_BOARD, handle_board_selection),
+    (PAGE_BOARD, handle_board_pagination),
+    (SORT_COLUMN, choose_sort_column),
+    (SORT, handle_sorting),
+    (ASSIGNEE, choose_assignee),
+    (TYPE, choose_type),
+    (TASK_PAGE, handle_pagination),
+    (UNWATCH, handle_unwatch),
+):
+    callback_router.route(op, callback)
+
+text_input = filters.TEXT & ~filters.COMMAND
+
 # Конфигурируем ConversationHandler
 start_conv = ConversationHandler(
-    entry_points=[
-        CommandHandler("start", start),
-        MessageHandler(filters.Regex("^🔄 Поменять проект$"), change_project),
-        MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-        MessageHandler(filters.Regex("^Добавить задачу$"), add_task),
-        MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
-    ],
+    entry_points=[CommandHandler("start", start), menu.handler],
     states={
         CHOOSING_PROJECT: [
-            CallbackQueryHandler(
-                handle_project_selection, pattern="^select_proj_"
-            ),
-            CallbackQueryHandler(
-                handle_project_pagination, pattern="^page_proj_"
-            ),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задачу$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            callback_router.handler(SELECT_PROJECT, PAGE_PROJECT),
+            menu.handler,
         ],
         CHOOSING_BOARD: [
-            CallbackQueryHandler(
-                handle_board_selection, pattern="^select_board_"
-            ),
-            CallbackQueryHandler(
-                handle_board_pagination, pattern="^page_board_"
-            ),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            callback_router.handler(SELECT_BOARD, PAGE_BOARD),
+            menu.handler,
         ],
         CHOOSING_SORT_COLUMN: [
-            CallbackQueryHandler(choose_sort_column, pattern="^column_"),
-            CallbackQueryHandler(handle_sorting, pattern="^sort_"),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
+            callback_router.handler(SORT_COLUMN, SORT),
+            menu.handler,
         ],
         CHOOSING_COLUMN: [
-            MessageHandler(filters.TEXT & ~filters.COMMAND, choose_column),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            menu.handler,
+            MessageHandler(text_input, choose_column),
         ],
         ENTER_TITLE: [
-            MessageHandler(filters.TEXT & ~filters.COMMAND, enter_title),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            menu.handler,
+            MessageHandler(text_input, enter_title),
+            MessageHandler(filters.Document.ALL, enter_tasks_file),
         ],
         ENTER_DESCRIPTION: [
-            MessageHandler(filters.TEXT & ~filters.COMMAND, enter_description),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            menu.handler,
+            MessageHandler(text_input, enter_description),
         ],
         CHOOSING_ASSIGNEE: [
-            CallbackQueryHandler(choose_assignee, pattern="^assignee_"),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            callback_router.handler(ASSIGNEE),
+            menu.handler,
         ],
         ENTER_DUE_DATE: [
-            MessageHandler(filters.TEXT & ~filters.COMMAND, enter_due_date),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
-        ],
-        CHOOSING_TYPE: [
-            CallbackQueryHandler(choose_type, pattern="^type_"),
-            MessageHandler(
-                filters.Regex("^🔄 Поменять проект$"), change_project
-            ),
-            MessageHandler(filters.Regex("^🔄 Поменять доску$"), change_board),
-            MessageHandler(filters.Regex("^Добавить задача$"), add_task),
-            MessageHandler(filters.Regex("^📋 Показать задачи$"), show_tasks),
+            menu.handler,
+            MessageHandler(text_input, enter_due_date),
         ],
+        CHOOSING_TYPE: [callback_router.handler(TYPE), menu.handler],
     },
     fallbacks=[CommandHandler("cancel", cancel)],
 )
@@ -0,0 +1,69 @@
+from telegram import (
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+    Update,
+)
+from telegram.ext import ContextTypes, InlineQueryHandler
+
+from bot.handlers.commands import watched_boards
+from bot.utils import api, tenants
+from bot.utils.search import index_for
+
+INLINE_RESULTS_LIMIT = 20
+
+
+def user_boards(context):
+    """
+    Отслеживаемые доски в чатах пользователя, по арендаторам:
+    {арендатор: {id доски}}. У inline-запроса нет чата, поэтому арендатор
+    берётся из чатов, где пользователь работал с ботом, а не по его id.
+    """
+    boards = {}
+    for chat_id in context.user_data.get("chats", []):
+        chat_data = context.application.chat_data.get(chat_id, {})
+        watches = watched_boards(chat_data) if chat_data else {}
+        if watches:
+            boards.setdefault(tenants.for_chat(chat_id), set()).update(
+                watch.id for watch in watches.values()
+            )
+    return boards
+
+
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline-режим: поиск задач по локальному индексу, без запросов WEEEK."""
+    query = update.inline_query
+    results = []
+    for tenant, board_ids in user_boards(context).items():
+        hits = index_for(tenant).search(
+            query.query, limit=INLINE_RESULTS_LIMIT, board_ids=board_ids
+        )
+        if not hits:
+            continue
+        tenants.use(tenant)
+        workspace_id = api.workspace_id()
+        for doc in hits:
+            status = "Выполнена" if doc.done else "Активна"
+            link = (
+                f"https://app.weeek.net/ws/{workspace_id}/task/{doc.task_id}"
+            )
+            results.append(
+                InlineQueryResultArticle(
+                    id=f"{tenant.id}:{doc.task_id}",
+                    title=doc.title or "Без названия",
+                    description=f"{doc.column} · {status}",
+                    input_message_content=InputTextMessageContent(
+                        f"📌 {doc.title}\n"
+                        f"Колонка: {doc.column}\n"
+                        f"Статус: {status}\n"
+                        f"Ссылка: {link}"
+                    ),
+                    url=link,
+                )
+            )
+
+    await query.answer(
+        results[:INLINE_RESULTS_LIMIT], cache_time=5, is_personal=True
+    )
+
+
+inline_search_handler = InlineQueryHandler(inline_search)
@@ -0,0 +1,192 @@
+"""
+Запуск и остановка бота: поллеры продолжают со снимка последней
+остановки (см. bot.utils.snapshots).
+"""
+
+import asyncio
+
+from telegram.ext import CallbackContext
+
+from bot.handlers.commands import (
+    BoardWatch,
+    index_snapshot,
+    poll_watched_boards,
+    report_restored,
+    watched_boards,
+)
+from bot.utils import logger, tenants
+from bot.utils.backend import backend
+from bot.utils.creation import (
+    CreateRequest,
+    bulk_queue,
+    creation_queue,
+    jobs,
+    start_job,
+)
+from bot.utils.deadlines import deadline_watcher
+from bot.utils.dwell import dwell_for
+from bot.utils.mirror import mirror_for
+from bot.utils.movelog import move_log_queue
+from bot.utils.search import index_for
+from bot.utils.snapshots import (
+    CATCHUP_LIMIT,
+    SHUTDOWN_TIMEOUT,
+    load_state,
+    save_state,
+    stopping,
+)
+from bot.utils.tracing import tracer
+
+# Настройки чата, которые переживают перезапуск
+CHAT_KEYS = ("subscription", "digest", "held")
+USER_KEYS = ("selected_project", "selected_board", "chats")
+
+
+async def on_startup(application):
+    """post_init: восстанавливает состояние и запускает поллеры чатов."""
+    data = load_state()
+    if not data:
+        return
+
+    for tenant_id, rows in data.get("dwell", {}).items():
+        tenant = tenants.TENANTS.get(int(tenant_id))
+        if tenant is not None:
+            dwell_for(tenant).restore(rows)
+    for payload in data.get("move_log", []):
+        move_log_queue.submit(payload)
+    creations = [
+        CreateRequest.restore(row) for row in data.get("creations", [])
+    ]
+    if creations:
+        start_job(report_restored(application, creations))
+    for chat_id, chat_data in data.get("chat_data", {}).items():
+        application.chat_data[int(chat_id)].update(chat_data)
+
+    for user_id, user_data in data.get("users", {}).items():
+        application.user_data[int(user_id)].update(user_data)
+
+    for chat in data.get("chats", []):
+        chat_id = chat["chat_id"]
+        tenant = tenants.activate(chat_id)
+        dwell = dwell_for(tenant)
+        index = index_for(tenant)
+        chat_data = application.chat_data[chat_id]
+        watches = watched_boards(chat_data)
+        for board in chat["boards"]:
+            watch = BoardWatch.restore(board)
+            watches[str(watch.id)] = watch
+            for task_id, snapshot in watch.tasks.items():
+                index_snapshot(index, watch.id, task_id, snapshot)
+                deadline_watcher.track(
+                    chat_id,
+                    watch.board,
+                    task_id,
+                    snapshot,
+                    dwell.entered_at(task_id),
+                    notify_past=False,
+                )
+
+    for chat_id, chat_data in application.chat_data.items():
+        if not chat_data.get("watched_boards"):
+            continue
+        # Первый цикл догоняет изменения за время простоя
+        chat_data["catchup"] = CATCHUP_LIMIT
+        context = CallbackContext(application, chat_id=chat_id)
+        chat_data["poll_task"] = asyncio.create_task(
+            poll_watched_boards(chat_id, context)
+        )
+        logger.logger.info(
+            f"Поллер чата {chat_id} продолжает со снимка: "
+            f"{len(watched_boards(chat_data))} досок"
+        )
+
+
+async def on_stop(application):
+    """
+    post_stop: поллеры дорабатывают текущий цикл, очереди создания задач
+    и перемещений дочищаются, состояние сохраняется на диск. Не созданные
+    за SHUTDOWN_TIMEOUT задачи попадают в снимок.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SHUTDOWN_TIMEOUT
+    stopping.set()
+
+    polls = [
+        chat_data["poll_task"]
+        for chat_data in application.chat_data.values()
+        if chat_data.get("poll_task") and not chat_data["poll_task"].done()
+    ]
+    if polls:
+        _, pending = await asyncio.wait(polls, timeout=SHUTDOWN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.logger.info(
+            f"Поллеры остановлены: {len(polls) - len(pending)} штатно, "
+            f"{len(pending)} прерваны"
+        )
+
+    left = max(0, deadline - loop.time())
+    await asyncio.gather(creation_queue.drain(left), bulk_queue.drain(left))
+    # Futures уже решены: сообщения с итогом дописываются, а ещё не
+    # отправленные в очередь задачи пакетов попадают в deferred
+    if jobs:
+        _, pending = await asyncio.wait(
+            list(jobs), timeout=max(1, deadline - loop.time())
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    creations = creation_queue.deferred + bulk_queue.deferred
+    if creations:
+        logger.logger.warning(
+            f"Не созданы до остановки, сохранены в снимок: {len(creations)}"
+        )
+
+    move_log = await move_log_queue.drain(max(0, deadline - loop.time()))
+    await backend.aclose()
+    await tracer.flush()
+    for tenant in tenants.TENANTS.values():
+        mirror_for(tenant).save(force=True)
+
+    chats = [
+        {
+            "chat_id": chat_id,
+            "boards": [
+                watch.dump()
+                for watch in watched_boards(chat_data).values()
+                if watch.ready
+            ],
+        }
+        for chat_id, chat_data in application.chat_data.items()
+        if chat_data.get("watched_boards")
+    ]
+    save_state(
+        {
+            "chats": chats,
+            "users": {
+                user_id: {
+                    key: user_data[key]
+                    for key in USER_KEYS
+                    if key in user_data
+                }
+                for user_id, user_data in application.user_data.items()
+                if any(key in user_data for key in USER_KEYS)
+            },
+            "chat_data": {
+                chat_id: {
+                    key: chat_data[key]
+                    for key in CHAT_KEYS
+                    if key in chat_data
+                }
+                for chat_id, chat_data in application.chat_data.items()
+                if any(key in chat_data for key in CHAT_KEYS)
+            },
+            "dwell": {
+                tenant.id: dwell_for(tenant).dump()
+                for tenant in tenants.TENANTS.values()
+            },
+            "move_log": move_log,
+            "creations": [request.dump() for request in creations],
+        }
+    )
@@ -0,0 +1,64 @@
+"""
+Единая маршрутизация callback_data и кнопок меню.
+
+callback_data кодируется компактно и с версией (bot.utils.callback_data).
+Маршрут ищется по коду операции в словаре, без перебора регулярных
+выражений.
+"""
+
+from telegram import Update
+from telegram.ext import (
+    CallbackQueryHandler,
+    ContextTypes,
+    MessageHandler,
+    filters,
+)
+
+from bot.utils.callback_data import decode
+
+
+class CallbackRouter:
+    """Таблица операция -> хендлер и один CallbackQueryHandler на всё."""
+
+    def __init__(self):
+        self.routes = {}
+
+    def route(self, op, callback):
+        self.routes[op] = callback
+
+    def handler(self, *ops):
+        """
+        CallbackQueryHandler, принимающий только указанные операции
+        (например, операции одного состояния диалога).
+        """
+        allowed = frozenset(ops)
+
+        def check(data):
+            decoded = decode(data)
+            return decoded is not None and decoded[0] in allowed
+
+        return CallbackQueryHandler(self.dispatch, pattern=check)
+
+    async def dispatch(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ):
+        op, _ = decode(update.callback_query.data)
+        return await self.routes[op](update, context)
+
+
+class MenuRouter:
+    """Кнопки постоянной клавиатуры: текст -> хендлер словарём."""
+
+    def __init__(self, actions):
+        self.actions = actions
+        self.handler = MessageHandler(
+            filters.Text(frozenset(actions)), self.dispatch
+        )
+
+    async def dispatch(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ):
+        return await self.actions[update.message.text](update, context)
+
+
+callback_router = CallbackRouter()
@@ -1,28 +1,96 @@
+import asyncio
+
 import requests
 from config import settings
 
-session = requests.Session()
-session.headers.update({"Authorization": f"Bearer {settings.WEEK_TOKEN}"})
+from bot.utils import tenants
+from bot.utils.breaker import breaker_for
+from bot.utils.singleflight import single_flight
+
+
+class _TenantSession:
+    """Прокси: session.get/post уходят в пул текущего арендатора."""
+
+    def __getattr__(self, name):
+        return getattr(tenants.current().session, name)
+
+
+session = _TenantSession()
+
+
+class WeeekApiError(Exception):
+    """WEEEK вернул ответ без success."""
+
+
+class WeeekUnavailable(WeeekApiError):
+    """Временная ошибка WEEEK (429, 5xx): запрос можно повторить."""
+
+
+class RateLimited(WeeekUnavailable):
+    """WEEEK ответил 429: запрос отклонён, не выполнялся."""
+
+
+class CircuitOpen(WeeekUnavailable):
+    """Автомат эндпоинта разомкнут: запрос в WEEEK не отправлялся."""
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(
+            f"WEEEK недоступен ({endpoint}), повтор через {retry_in:.0f} с"
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+API_URL = "https://api.weeek.net/public/v1/"
+# Создание задачи не должно висеть бесконечно: очередь повторит запрос
+CREATE_TIMEOUT = 15
+# Зависший запрос на чтение тоже считается ошибкой для автомата
+REQUEST_TIMEOUT = 30
+
+
+def request(method, path, timeout=REQUEST_TIMEOUT, **kwargs):
+    """
+    Запрос к WEEEK через автомат защиты эндпоинта текущего арендатора.
+    Сеть, таймаут, 429 и 5xx расходуют бюджет ошибок; при разомкнутом
+    автомате сразу бросается CircuitOpen.
+    """
+    # Эндпоинт — первые два сегмента пути: tm/projects/5 -> tm/projects
+    endpoint = "/".join(path.strip("/").split("/")[:2])
+    breaker = breaker_for(tenants.current().id, endpoint)
+    if not breaker.allow():
+        raise CircuitOpen(endpoint, breaker.retry_in() or 1.0)
+    try:
+        response = session.request(
+            method, API_URL + path, timeout=timeout, **kwargs
+        )
+    except requests.RequestException:
+        breaker.failure()
+        raise
+    if response.status_code == 429:
+        breaker.failure()
+        raise RateLimited("WEEEK ответил 429")
+    if response.status_code >= 500:
+        breaker.failure()
+        raise WeeekUnavailable(f"WEEEK ответил {response.status_code}")
+    breaker.success()
+    return response
 
 
 def get_data():
-    return session.get("https://api.weeek.net/public/v1/ws").json()
+    return request("GET", "ws").json()
 
 
 def get_boards(project_id=""):
-
-    return session.get(
-        f"https://api.weeek.net/public/v1/tm/boards/",
-        params={"projectId": project_id},
+    return request(
+        "GET", "tm/boards/", params={"projectId": project_id}
     ).json()
 
 
 def get_projects(project_id=""):
-    return session.get(
-        f"https://api.weeek.net/public/v1/tm/projects/{project_id}"
-    ).json()
+    return request("GET", f"tm/projects/{project_id}").json()
 
 
+@single_flight
 def get_tasks(
     boardId: int, projectId: int, perPage: int = None, offset: int = None
 ):
@@ -35,29 +103,135 @@ def get_tasks(
     if offset is not None:
         params["offset"] = offset
 
-    return session.get(
-        "https://api.weeek.net/public/v1/tm/tasks/",
-        params=params,
-    ).json()
+    return request("GET", "tm/tasks/", params=params).json()
+
+
+async def iter_task_pages(
+    boardId: int,
+    projectId: int,
+    per_page: int = settings.TASKS_PER_PAGE,
+    concurrency: int = settings.TASKS_FETCH_CONCURRENCY,
+):
+    """
+    Асинхронно отдаёт задачи доски постранично, по мере прихода страниц.
+    С boardId=None — задачи всего проекта.
+    Первая страница сообщает общее число задач (total) или hasMore,
+    остальные запрашиваются параллельно, не более concurrency за раз.
+    Порядок страниц не гарантируется.
+    """
+
+    async def fetch(page):
+        response = await asyncio.to_thread(
+            get_tasks, boardId, projectId, per_page, page * per_page
+        )
+        if not response.get("success") or "tasks" not in response:
+            raise WeeekApiError(response.get("message", "Ошибка get_tasks"))
+        return response
+
+    first = await fetch(0)
+    yield first["tasks"]
+
+    # Запросы страниц — задачи; если потребитель бросил итерацию
+    # (исключение, ранний return), недокачанные страницы отменяются
+    pending = []
+    try:
+        total = first.get("total")
+        if total is not None:
+            # Число страниц известно заранее — качаем всё с ограничением
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(page):
+                async with semaphore:
+                    return await fetch(page)
+
+            pages = range(1, -(-int(total) // per_page))
+            pending = [asyncio.ensure_future(bounded(p)) for p in pages]
+            for next_page in asyncio.as_completed(pending):
+                yield (await next_page)["tasks"]
+            return
+
+        # total нет — идём окнами по concurrency страниц, пока есть hasMore
+        has_more = first.get("hasMore", len(first["tasks"]) >= per_page)
+        page = 1
+        while has_more:
+            pending = [
+                asyncio.ensure_future(fetch(p))
+                for p in range(page, page + concurrency)
+            ]
+            page += concurrency
+            has_more = False
+            for next_page in asyncio.as_completed(pending):
+                response = await next_page
+                if response["tasks"]:
+                    yield response["tasks"]
+                if len(response["tasks"]) >= per_page and response.get(
+                    "hasMore", True
+                ):
+                    has_more = True
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def split_pages(pages, keys, key_of):
+    """
+    Делит один поток страниц (например, задачи всего проекта) на потоки по
+    ключам (доскам). Возвращает (pump, {ключ: асинхронный итератор}):
+    корутину pump нужно выполнять параллельно с чтением итераторов.
+    Задачи с чужими ключами отбрасываются; ошибка потока пробрасывается
+    во все итераторы.
+    """
+    queues = {key: asyncio.Queue() for key in keys}
+
+    async def pump():
+        try:
+            async for tasks in pages:
+                parts = {}
+                for task in tasks:
+                    key = key_of(task)
+                    if key in queues:
+                        parts.setdefault(key, []).append(task)
+                for key, part in parts.items():
+                    queues[key].put_nowait(part)
+        except Exception as e:
+            for queue in queues.values():
+                queue.put_nowait(e)
+            raise
+        for queue in queues.values():
+            queue.put_nowait(None)
+
+    async def read(queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    return pump(), {key: read(queue) for key, queue in queues.items()}
 
 
 def get_task(taskId: int):
-    return session.get(
-        f"https://api.weeek.net/public/v1/tm/tasks/",
-        params={"taskId": taskId},
-    ).json()
+    return request("GET", "tm/tasks/", params={"taskId": taskId}).json()
 
 
+@single_flight
 def get_boardColumn_list(boardId: int):
-    return session.get(
-        f"https://api.weeek.net/public/v1/tm/board-columns/",
-        params={"boardId": boardId},
+    return request(
+        "GET", "tm/board-columns/", params={"boardId": boardId}
     ).json()
 
 
-def create_task(project_id, column_id, title, description=""):
-    return session.post(
-        "https://api.weeek.net/public/v1/tm/tasks/",
+def create_task(
+    project_id, column_id, title, description="", idempotency_key=None
+):
+    headers = {"Content-Type": "application/json"}
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
+    response = request(
+        "POST",
+        "tm/tasks/",
         json={
             "locations": [
                 {"projectId": project_id, "boardColumnId": column_id}
@@ -67,12 +241,20 @@ def create_task(project_id, column_id, title, description=""):
             "type": "action",
             "priority": 0,
         },
-        headers={"Content-Type": "application/json"},
-    ).json()
+        headers=headers,
+        timeout=CREATE_TIMEOUT,
+    )
+    return response.json()
 
 
-def get_assignees(board_id):
-    return session.get("https://api.weeek.net/public/v1/ws/members").json()
+@single_flight
+def get_assignees():
+    return request("GET", "ws/members").json()
 
 
-WORKSPACE_ID = get_data()["workspace"]["id"]
+def workspace_id():
+    """ID пространства текущего арендатора (кэшируется в его namespace)."""
+    cache = tenants.current().cache
+    if "workspace_id" not in cache:
+        cache["workspace_id"] = get_data()["workspace"]["id"]
+    return cache["workspace_id"]
@@ -0,0 +1,100 @@
+"""
+Клиент backend (Django) для бота.
+
+Один асинхронный httpx-клиент на процесс: пул keep-alive соединений,
+таймауты на каждый запрос. Перемещения уходят пачками в JSON или, с
+BACKEND_FORMAT=msgpack, в msgpack; тела от GZIP_MIN_SIZE байт сжимаются
+gzip. Настройки при запуске читаются до появления цикла событий, поэтому
+для них есть синхронный fetch_json с теми же таймаутами.
+"""
+
+import gzip
+import json
+import os
+
+import httpx
+
+BACKEND_ROOT = os.getenv("BACKEND_ROOT", "http://backend:8000/")
+BACKEND_FORMAT = os.getenv("BACKEND_FORMAT", "json")  # json | msgpack
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "4"))
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "10"))
+# Маленькие тела не сжимаем: gzip на сотне байт их только увеличит
+GZIP_MIN_SIZE = 1024
+
+TIMEOUT = httpx.Timeout(BACKEND_TIMEOUT, connect=3)
+LIMITS = httpx.Limits(
+    max_connections=BACKEND_POOL_SIZE,
+    max_keepalive_connections=BACKEND_POOL_SIZE,
+)
+
+
+def encode(data, wire_format=BACKEND_FORMAT):
+    """(тело, заголовки) в выбранном формате, большое тело — в gzip."""
+    if wire_format == "msgpack":
+        import msgpack
+
+        body = msgpack.packb(data)
+        headers = {"Content-Type": "application/msgpack"}
+    else:
+        body = json.dumps(
+            data, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+        headers = {"Content-Type": "application/json"}
+    if len(body) >= GZIP_MIN_SIZE:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+class BackendClient:
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Создаётся в цикле событий бота при первом запросе
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=BACKEND_ROOT,
+                timeout=TIMEOUT,
+                limits=LIMITS,
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def get_json(self, url, params=None):
+        response = await self.client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def post_moves(self, payloads):
+        """Пачка перемещений в log_move/; ответ backend — {"created", ...}."""
+        body, headers = encode(payloads)
+        response = await self.client.post(
+            "log_move/", content=body, headers=headers
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_sync_client = None
+
+
+def fetch_json(url):
+    """GET с разбором JSON для настроек при запуске (до цикла событий)."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = httpx.Client(
+            timeout=TIMEOUT, limits=LIMITS, follow_redirects=True
+        )
+    response = _sync_client.get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+backend = BackendClient()
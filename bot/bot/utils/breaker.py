@@ -0,0 +1,133 @@
+"""
+Автоматы защиты (circuit breaker) для запросов к WEEEK.
+
+На каждую пару (арендатор, эндпоинт WEEEK) — свой автомат, общий для
+чатов арендатора: 429 относится к ключу API, и лимит одного
+пространства не должен отключать запросы остальных. Автомат считает долю
+временных ошибок (сеть, таймаут, 429/5xx) в последних BREAKER_WINDOW
+запросах; когда бюджет ошибок
+исчерпан, он размыкается, и запросы к эндпоинту сразу получают
+CircuitOpen, не доходя до сети. Через паузу автомат пропускает один
+пробный запрос (half-open): успех замыкает его, ошибка снова размыкает
+с удвоенной паузой (не больше BREAKER_MAX_OPEN). Само исключение
+(api.CircuitOpen) бросает api.py.
+
+Запросы выполняются в потоках (asyncio.to_thread), поэтому состояние
+защищено блокировкой.
+"""
+
+import threading
+import time
+from collections import deque
+
+from config import settings
+
+from bot.utils import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name,
+        window=settings.BREAKER_WINDOW,
+        min_calls=settings.BREAKER_MIN_CALLS,
+        error_budget=settings.BREAKER_ERROR_BUDGET,
+        open_for=settings.BREAKER_OPEN,
+        max_open_for=settings.BREAKER_MAX_OPEN,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_budget = error_budget
+        self.base_open_for = open_for
+        self.max_open_for = max_open_for
+
+        self.state = CLOSED
+        self.results = deque(maxlen=window)  # True — ошибка
+        self.open_for = open_for
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def retry_in(self, now=None):
+        """Сколько секунд до пробного запроса (0 — можно слать)."""
+        if self.state != OPEN:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.opened_at + self.open_for - now)
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас."""
+        with self._lock:
+            if self.state == OPEN and not self.retry_in():
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probing:
+                # Пробный запрос — ровно один, остальные ждут его итога
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.logger.info(f"WEEEK {self.name}: снова доступен")
+                self.state = CLOSED
+                self.results.clear()
+                self.open_for = self.base_open_for
+                self.probing = False
+            self.results.append(False)
+
+    def failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.open_for = min(self.open_for * 2, self.max_open_for)
+                self._trip()
+                return
+            if self.state == OPEN:
+                return
+            self.results.append(True)
+            calls = len(self.results)
+            failures = sum(self.results)
+            if calls >= self.min_calls and (
+                failures / calls > self.error_budget
+            ):
+                self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+        logger.logger.warning(
+            f"WEEEK {self.name}: автомат разомкнут на {self.open_for:.0f} с"
+        )
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(tenant_id, endpoint) -> CircuitBreaker:
+    key = (tenant_id, endpoint)
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(f"{endpoint} [{tenant_id}]")
+        return _breakers[key]
+
+
+def retry_in(tenant_id):
+    """
+    Через сколько секунд откроется ближайший разомкнутый автомат
+    арендатора.
+    """
+    waits = [
+        b.retry_in()
+        for (owner, _), b in list(_breakers.items())
+        if owner == tenant_id and b.retry_in()
+    ]
+    return min(waits, default=0.0)
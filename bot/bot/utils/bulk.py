@@ -0,0 +1,110 @@
+"""
+Разбор списка задач для пакетного создания.
+
+Поддерживаются:
+  * сообщение из нескольких строк — по задаче на строку;
+  * Markdown-чеклист (.md/.txt): "- [ ] задача", "* задача", "1. задача";
+  * CSV: колонки title/название и description/описание, либо без
+    заголовка — первая колонка заголовок, вторая описание.
+
+В строке можно отделить описание: "Заголовок | описание".
+"""
+
+import csv
+import io
+import re
+
+MAX_BULK_TASKS = 200
+MAX_FILE_SIZE = 1024 * 1024
+
+# Заголовок Markdown: "#", "## ..." — но не "#42 исправить вход"
+_HEADING_RE = re.compile(r"^\s*#+(?:\s|$)")
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s*)?")
+_TITLE_HEADERS = {"title", "название", "заголовок", "задача"}
+_DESCRIPTION_HEADERS = {"description", "описание"}
+
+
+class BulkParseError(Exception):
+    """Файл или сообщение не удалось разобрать в список задач."""
+
+
+def split_line(line):
+    title, _, description = line.partition(" | ")
+    return title.strip(), description.strip()
+
+
+def parse_lines(text):
+    """[(заголовок, описание)] из текста или Markdown-чеклиста."""
+    tasks = []
+    for line in text.splitlines():
+        # Заголовки разделов и пустые строки пропускаем
+        if not line.strip() or _HEADING_RE.match(line):
+            continue
+        title, description = split_line(_LIST_MARKER_RE.sub("", line))
+        if title:
+            tasks.append((title, description))
+    return tasks
+
+
+def parse_csv(text):
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    rows = [row for row in csv.reader(io.StringIO(text), dialect) if row]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    title_col = next(
+        (i for i, name in enumerate(header) if name in _TITLE_HEADERS), None
+    )
+    if title_col is None:
+        title_col, description_col = 0, 1
+    else:
+        rows = rows[1:]
+        description_col = next(
+            (
+                i
+                for i, name in enumerate(header)
+                if name in _DESCRIPTION_HEADERS
+            ),
+            None,
+        )
+
+    tasks = []
+    for row in rows:
+        title = row[title_col].strip() if title_col < len(row) else ""
+        description = (
+            row[description_col].strip()
+            if description_col is not None and description_col < len(row)
+            else ""
+        )
+        if title:
+            tasks.append((title, description))
+    return tasks
+
+
+def parse_file(file_name, data):
+    """[(заголовок, описание)] из загруженного файла."""
+    if len(data) > MAX_FILE_SIZE:
+        raise BulkParseError("Файл больше 1 МБ")
+    try:
+        text = bytes(data).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BulkParseError("Файл должен быть в кодировке UTF-8")
+    if (file_name or "").lower().endswith(".csv"):
+        return limit(parse_csv(text))
+    return limit(parse_lines(text))
+
+
+def limit(tasks):
+    if len(tasks) > MAX_BULK_TASKS:
+        raise BulkParseError(
+            f"Слишком много задач: {len(tasks)}, максимум {MAX_BULK_TASKS}"
+        )
+    return tasks
+
+
+def parse_message(text):
+    return limit(parse_lines(text))
@@ -0,0 +1,69 @@
+"""
+Формат callback_data: "<версия><операция>:<арг>", например "1t:12345" —
+показать задачу 12345. Кнопки старых сообщений (show_task_123, page_2,
+...) декодируются по таблице префиксов. Модуль без зависимостей от
+хендлеров: кнопки строят и utils (render), и handlers.
+"""
+
+VERSION = "1"
+
+# Коды операций
+SELECT_PROJECT = "sp"
+PAGE_PROJECT = "pp"
+SELECT_BOARD = "sb"
+PAGE_BOARD = "pb"
+SORT_COLUMN = "c"
+SORT = "s"
+ASSIGNEE = "a"
+TYPE = "y"
+SHOW_TASK = "t"
+TASK_PAGE = "p"
+UNWATCH = "u"
+
+# Формат до версии 1; порядок важен: page_proj_ раньше page_
+LEGACY_PREFIXES = (
+    ("select_proj_", SELECT_PROJECT),
+    ("page_proj_", PAGE_PROJECT),
+    ("select_board_", SELECT_BOARD),
+    ("page_board_", PAGE_BOARD),
+    ("show_task_", SHOW_TASK),
+    ("page_", TASK_PAGE),
+    ("column_", SORT_COLUMN),
+    ("sort_", SORT),
+    ("assignee_", ASSIGNEE),
+    ("type_", TYPE),
+)
+
+
+def encode(op, arg="") -> str:
+    """callback_data для кнопки (лимит Telegram — 64 байта)."""
+    return f"{VERSION}{op}:{arg}"
+
+
+def _decode_v1(data):
+    op, _, arg = data[1:].partition(":")
+    return op, arg
+
+
+def _decode_legacy(data):
+    for prefix, op in LEGACY_PREFIXES:
+        if data.startswith(prefix):
+            return op, data[len(prefix) :]
+    return None
+
+
+DECODERS = {VERSION: _decode_v1}
+
+
+def decode(data):
+    """callback_data -> (операция, аргумент) или None."""
+    if not data:
+        return None
+    decoder = DECODERS.get(data[:1], _decode_legacy)
+    return decoder(data)
+
+
+def callback_arg(data) -> str:
+    """Аргумент из callback_data (id задачи, номер страницы и т.п.)."""
+    decoded = decode(data)
+    return decoded[1] if decoded else ""
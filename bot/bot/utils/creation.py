@@ -0,0 +1,315 @@
+"""
+Очередь создания задач в WEEEK.
+
+Хендлер ставит задачу в очередь и сразу отвечает пользователю, а воркеры
+создают её в фоне. Пакетное создание идёт через отдельную очередь
+bulk_queue со своими воркерами, чтобы пакет из сотен задач не задерживал
+одиночные. При остановке бота очереди дочищаются (drain), а не созданные
+за отведённое время запросы сохраняются в снимок и после запуска
+отправляются снова с тем же ключом.
+
+Временные ошибки (сеть, таймаут, 429/5xx) повторяются с экспоненциальной
+паузой. У каждого запроса есть ключ идемпотентности: он уходит в
+заголовке Idempotency-Key, а если ответ потерялся после отправки, перед
+повтором ищем уже созданную задачу на доске, чтобы не создать её дважды.
+Если WEEEK возвращает ключ в задаче, ищем по нему; иначе — по названию,
+колонке и времени создания, пропуская задачи, уже отданные другим
+запросам (в пачке бывают одинаковые названия).
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import aclosing
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from bot.utils import api, logger, tenants
+from bot.utils.dwell import weeek_timestamp
+
+CREATE_WORKERS = int(os.getenv("CREATE_WORKERS", "4"))
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "2"))
+CREATE_ATTEMPTS = int(os.getenv("CREATE_ATTEMPTS", "5"))
+CREATE_BACKOFF = float(os.getenv("CREATE_BACKOFF", "1"))
+# Сколько завершённых ключей помнить для повторных отправок
+DONE_KEYS = 1000
+# Поле задачи, в котором WEEEK возвращает Idempotency-Key (если есть)
+IDEMPOTENCY_FIELD = "idempotencyKey"
+
+
+class Postponed(Exception):
+    """Бот останавливается: запрос сохранён и уйдёт после запуска."""
+
+    def __init__(self):
+        super().__init__("будет создана после перезапуска бота")
+
+
+class CreateRequest:
+    __slots__ = (
+        "key",
+        "chat_id",
+        "project_id",
+        "board_id",
+        "column_id",
+        "title",
+        "description",
+        "submitted_at",
+        "sent",
+        "future",
+    )
+
+    def __init__(
+        self,
+        chat_id,
+        project_id,
+        board_id,
+        column_id,
+        title,
+        description="",
+        key=None,
+        sent=False,
+    ):
+        self.key = key or uuid.uuid4().hex
+        self.chat_id = chat_id
+        self.project_id = project_id
+        self.board_id = board_id
+        self.column_id = column_id
+        self.title = title
+        self.description = description
+        self.submitted_at = time.time()
+        # Запрос мог дойти до WEEEK, даже если ответа нет
+        self.sent = sent
+        self.future = None
+
+    def dump(self):
+        return {
+            "key": self.key,
+            "chat_id": self.chat_id,
+            "project_id": self.project_id,
+            "board_id": self.board_id,
+            "column_id": self.column_id,
+            "title": self.title,
+            "description": self.description,
+            "submitted_at": self.submitted_at,
+            "sent": self.sent,
+        }
+
+    @classmethod
+    def restore(cls, data):
+        request = cls(
+            data["chat_id"],
+            data["project_id"],
+            data["board_id"],
+            data["column_id"],
+            data["title"],
+            data["description"],
+            key=data["key"],
+            sent=data["sent"],
+        )
+        request.submitted_at = data["submitted_at"]
+        return request
+
+
+class CreationQueue:
+    def __init__(self, workers=CREATE_WORKERS, claimed=None):
+        self.workers = workers
+        self.queue = None
+        self._tasks = []
+        self.done = OrderedDict()  # ключ -> созданная задача
+        # id задач, отданных запросам; общий у очередей одного процесса
+        self.claimed = set() if claimed is None else claimed
+        self.pending = {}  # ключ -> future
+        self.running = {}  # ключ -> запрос, который сейчас создаётся
+        # После drain новые запросы не создаются, а копятся для снимка
+        self.closed = False
+        self.deferred = []
+
+    def _ensure_started(self):
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    def submit(self, request: CreateRequest) -> asyncio.Future:
+        """
+        Ставит создание в очередь. Future получит задачу WEEEK (dict) или
+        исключение, если создать не удалось.
+        """
+        loop = asyncio.get_running_loop()
+        if self.closed:
+            self.deferred.append(request)
+            future = loop.create_future()
+            future.set_exception(Postponed())
+            return future
+        if request.key in self.done:
+            future = loop.create_future()
+            future.set_result(self.done[request.key])
+            return future
+        if request.key in self.pending:
+            return self.pending[request.key]
+        self._ensure_started()
+        request.future = loop.create_future()
+        self.pending[request.key] = request.future
+        self.queue.put_nowait(request)
+        return request.future
+
+    async def drain(self, timeout):
+        """
+        Ждёт очередь не дольше timeout секунд и останавливает воркеры.
+        Запросы, которые создать не успели, получают Postponed и вместе с
+        поступившими позже остаются в deferred.
+        """
+        self.closed = True
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.logger.warning("Очередь создания задач не успела уйти")
+        unsent = list(self.running.values())
+        for request in unsent:
+            request.sent = True  # прерванный запрос мог уйти в WEEEK
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self.queue.empty():
+            unsent.append(self.queue.get_nowait())
+        for request in unsent:
+            self.pending.pop(request.key, None)
+            if not request.future.done():
+                request.future.set_exception(Postponed())
+        self.deferred.extend(unsent)
+
+    async def _worker(self):
+        while True:
+            request = await self.queue.get()
+            self.running[request.key] = request
+            try:
+                task = await self._create(request)
+            except Exception as e:
+                logger.logger.error(
+                    f"Не удалось создать задачу {request.title!r}: {e}"
+                )
+                request.future.set_exception(e)
+            else:
+                self.done[request.key] = task
+                self.claimed.add(task.get("id"))
+                while len(self.done) > DONE_KEYS:
+                    _, old = self.done.popitem(last=False)
+                    self.claimed.discard(old.get("id"))
+                request.future.set_result(task)
+            finally:
+                self.running.pop(request.key, None)
+                self.pending.pop(request.key, None)
+                self.queue.task_done()
+
+    async def _create(self, request):
+        tenants.activate(request.chat_id)
+        delay = CREATE_BACKOFF
+        for attempt in range(1, CREATE_ATTEMPTS + 1):
+            if request.sent:
+                task = await find_created(request, self.claimed)
+                if task is not None:
+                    return task
+            try:
+                response = await asyncio.to_thread(
+                    api.create_task,
+                    project_id=request.project_id,
+                    column_id=request.column_id,
+                    title=request.title,
+                    description=request.description,
+                    idempotency_key=request.key,
+                )
+            except (requests.RequestException, api.WeeekUnavailable) as e:
+                request.sent = request.sent or not not_sent(e)
+                if attempt == CREATE_ATTEMPTS:
+                    raise
+                logger.logger.warning(
+                    f"Создание задачи, попытка {attempt}: {e}; "
+                    f"повтор через {delay:.0f} с"
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+                continue
+            if not response.get("success") or "task" not in response:
+                # Ошибка в данных, а не в доставке — повтор не поможет
+                raise api.WeeekApiError(
+                    response.get("message", "Неизвестная ошибка")
+                )
+            return response["task"]
+
+
+def not_sent(error):
+    """
+    Ошибка, при которой задача точно не создана: автомат разомкнут, 429,
+    таймаут подключения или соединение не установлено (DNS, отказ в
+    подключении). Обрыв уже установленного соединения — нет: запрос мог
+    дойти до WEEEK.
+    """
+    if isinstance(
+        error, (requests.ConnectTimeout, api.CircuitOpen, api.RateLimited)
+    ):
+        return True
+    if not isinstance(error, requests.ConnectionError) or not error.args:
+        return False
+    reason = error.args[0]
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    # NameResolutionError — подкласс NewConnectionError
+    return isinstance(reason, NewConnectionError)
+
+
+async def find_created(request, claimed):
+    """
+    Задача, созданная этим запросом до потери ответа, если есть. claimed —
+    id задач, уже отданных другим запросам; найденная сразу добавляется
+    туда, чтобы параллельный поиск её не взял.
+    """
+    since = request.submitted_at - 5
+    pages = api.iter_task_pages(request.board_id, request.project_id)
+    try:
+        # aclosing: при раннем return недокачанные страницы отменяются сразу
+        async with aclosing(pages):
+            async for tasks in pages:
+                for task in tasks:
+                    if IDEMPOTENCY_FIELD in task:
+                        if task[IDEMPOTENCY_FIELD] == request.key:
+                            return task
+                        continue
+                    if task.get("id") in claimed:
+                        continue
+                    created_at = weeek_timestamp(task.get("createdAt"))
+                    if (
+                        task.get("title") == request.title
+                        and task.get("boardColumnId") == request.column_id
+                        and created_at is not None
+                        and created_at >= since
+                    ):
+                        claimed.add(task.get("id"))
+                        return task
+    except Exception as e:
+        logger.logger.warning(f"Не удалось проверить созданную задачу: {e}")
+    return None
+
+
+def start_job(coro):
+    """
+    Фоновая задача, которая ждёт создания (сообщение с итогом, прогресс
+    пакета). Не через application.create_task: PTB ждёт такие задачи при
+    остановке без ограничения по времени, а эти дожидаются в on_stop.
+    """
+    task = asyncio.create_task(coro)
+    jobs.add(task)
+    task.add_done_callback(jobs.discard)
+    return task
+
+
+jobs = set()
+creation_queue = CreationQueue()
+bulk_queue = CreationQueue(BULK_WORKERS, claimed=creation_queue.claimed)
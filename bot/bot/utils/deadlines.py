@@ -0,0 +1,204 @@
+"""
+Напоминания о сроках: «до дедлайна час», «просрочена» и «слишком долго
+в колонке».
+
+Таймеры лежат в куче по времени срабатывания, а поллеры обновляют их
+только для изменившихся задач (новая, сменила колонку, статус или
+dueDate). Проверка раз в DEADLINE_TICK секунд снимает с вершины кучи
+только наступившие таймеры, поэтому десятки тысяч сроков не требуют
+обхода всех задач. Переназначенный таймер не удаляется из кучи, а
+помечается устаревшим и пропускается при снятии.
+
+Напоминание уходит, только если задача в области подписки чата (/notify
+mine, columns). Наступившее в тихие часы взводится заново на их конец.
+"""
+
+import heapq
+import itertools
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from config import settings
+
+from bot.utils.digest import deliver
+from bot.utils.dwell import due_timestamp, vladivostok_tz
+from bot.utils.subscriptions import UPDATE, Change, subscription_for
+
+SOON = "soon"
+OVERDUE = "overdue"
+STUCK = "stuck"
+KINDS = (SOON, OVERDUE, STUCK)
+
+Alert = namedtuple("Alert", "chat_id task_id kind fire_at info")
+
+
+def column_sla(column):
+    """Лимит времени в колонке в секундах или None."""
+    hours = settings.COLUMN_SLA.get(column, settings.COLUMN_SLA_HOURS)
+    return hours * 3600 if hours else None
+
+
+class DeadlineWatcher:
+    def __init__(self):
+        self.heap = []  # (fire_at, seq, ключ)
+        self.timers = {}  # (chat_id, task_id, вид) -> (fire_at, info)
+        self.fired = {}  # ключ -> fire_at уже отправленного напоминания
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self.timers)
+
+    def _set(self, key, fire_at, info, now, notify_past):
+        if (
+            fire_at is None
+            or (fire_at <= now and not notify_past)
+            or self.fired.get(key) == fire_at
+        ):
+            self.timers.pop(key, None)
+            return
+        current = self.timers.get(key)
+        self.timers[key] = (fire_at, info)
+        if current is None or current[0] != fire_at:
+            heapq.heappush(self.heap, (fire_at, next(self._seq), key))
+
+    def track(
+        self,
+        chat_id,
+        board,
+        task_id,
+        snapshot,
+        entered_at,
+        now=None,
+        notify_past=True,
+    ):
+        """
+        Пересчитывает таймеры задачи по её снимку. notify_past=False — при
+        первой загрузке доски: уже наступившие сроки не напоминаются.
+        """
+        now = now or time.time()
+        if snapshot["isCompleted"] or snapshot["isDeleted"]:
+            self.cancel(chat_id, task_id)
+            return
+        info = {
+            "board_id": str(board["id"]),
+            "board": board["name"],
+            "title": snapshot["title"],
+            "column": snapshot["boardColumn"],
+            "assignees": frozenset(snapshot["assignees_ids"]),
+            "entered_at": entered_at,
+        }
+        due = due_timestamp(snapshot.get("dueDate"))
+        info["due"] = due
+        soon = settings.DEADLINE_SOON_MINUTES * 60
+        self._set(
+            (chat_id, task_id, SOON),
+            due - soon if due and due > now and soon else None,
+            info,
+            now,
+            notify_past,
+        )
+        self._set((chat_id, task_id, OVERDUE), due, info, now, notify_past)
+        sla = column_sla(snapshot["boardColumn"])
+        self._set(
+            (chat_id, task_id, STUCK),
+            entered_at + sla if sla and entered_at else None,
+            info,
+            now,
+            notify_past,
+        )
+        self._compact()
+
+    def cancel(self, chat_id, task_id):
+        for kind in KINDS:
+            self.timers.pop((chat_id, task_id, kind), None)
+            self.fired.pop((chat_id, task_id, kind), None)
+
+    def forget_board(self, chat_id, board_id):
+        """Снимает таймеры задач доски, которую чат больше не отслеживает."""
+        for key, (_, info) in list(self.timers.items()):
+            if key[0] == chat_id and info["board_id"] == str(board_id):
+                self.cancel(chat_id, key[1])
+
+    def rearm(self, alert, fire_at):
+        """Откладывает сработавшее напоминание до fire_at."""
+        key = alert[:3]
+        if self.timers.get(key, (None,))[0] is not None:
+            return  # задача изменилась, таймер уже пересчитан
+        if alert.kind == SOON and alert.info["due"] <= fire_at:
+            return  # к тому времени сработает «просрочена»
+        self.fired.pop(key, None)
+        self.timers[key] = (fire_at, alert.info)
+        heapq.heappush(self.heap, (fire_at, next(self._seq), key))
+
+    def pop_due(self, now=None):
+        """Наступившие напоминания; каждое срабатывает один раз."""
+        now = now or time.time()
+        alerts = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, _, key = heapq.heappop(self.heap)
+            timer = self.timers.get(key)
+            if timer is None or timer[0] != fire_at:
+                continue  # таймер переназначен или снят
+            del self.timers[key]
+            self.fired[key] = fire_at
+            alerts.append(Alert(*key, fire_at, timer[1]))
+        return alerts
+
+    def _compact(self):
+        # Устаревших записей в куче стало заметно больше живых
+        if len(self.heap) > 2 * len(self.timers) + 1000:
+            self.heap = [
+                (fire_at, next(self._seq), key)
+                for key, (fire_at, _) in self.timers.items()
+            ]
+            heapq.heapify(self.heap)
+
+
+def alert_text(alert, now=None):
+    info = alert.info
+    task = f"«{info['title']}» ({info['board']})"
+    if alert.kind == SOON:
+        due = datetime.fromtimestamp(info["due"], vladivostok_tz)
+        return f"⏳ Срок задачи {task} истекает в {due:%H:%M %d.%m}"
+    if alert.kind == OVERDUE:
+        due = datetime.fromtimestamp(info["due"], vladivostok_tz)
+        return f"⏰ Задача {task} просрочена: срок был {due:%H:%M %d.%m}"
+    hours = ((now or time.time()) - info["entered_at"]) / 3600
+    return f"🐢 Задача {task} уже {hours:.0f} ч в колонке «{info['column']}»"
+
+
+def alert_change(alert):
+    """Напоминание как изменение задачи — для правил подписки чата."""
+    info = alert.info
+    return Change(
+        UPDATE,
+        alert.task_id,
+        frozenset(),
+        info["column"],
+        info["column"],
+        info["assignees"],
+        False,
+    )
+
+
+deadline_watcher = DeadlineWatcher()
+
+
+async def check_deadlines(context):
+    """Задача JobQueue: рассылает наступившие напоминания о сроках."""
+    now = time.time()
+    chat_data = context.application.chat_data
+    messages = []
+    for alert in deadline_watcher.pop_due(now):
+        subscription = subscription_for(chat_data.get(alert.chat_id, {}))
+        if not subscription.covers(alert_change(alert)):
+            continue
+        if subscription.is_quiet():
+            deadline_watcher.rearm(
+                alert, subscription.quiet_until().timestamp()
+            )
+            continue
+        messages.append((alert.chat_id, alert_text(alert, now)))
+    if messages:
+        await deliver(context.bot, messages)
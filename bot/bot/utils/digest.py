@@ -0,0 +1,181 @@
+"""
+Дайджест по отслеживаемым доскам: перемещения и завершения за сутки или
+неделю, просроченные и застрявшие задачи.
+
+Перемещения и завершения берутся из агрегатов backend (один запрос за
+запуск на все чаты), просроченные и застрявшие задачи — из состояния
+поллеров в памяти, без обхода WEEEK. Рассылка идёт пачками по
+DIGEST_BATCH_SIZE сообщений в секунду, чтобы не упереться в лимиты
+Telegram.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from datetime import time as dtime
+
+from config import settings
+from telegram.error import RetryAfter, TelegramError
+
+from bot.utils import logger, tenants
+from bot.utils.backend import backend
+from bot.utils.dwell import due_timestamp, dwell_for, vladivostok_tz
+
+DAILY = "daily"
+WEEKLY = "weekly"
+PERIODS = {
+    DAILY: (timedelta(days=1), "за сутки"),
+    WEEKLY: (timedelta(days=7), "за неделю"),
+}
+# Сколько задач показывать в списках просроченных и застрявших
+TOP = 5
+
+
+def digest_time():
+    hour, minute = (int(part) for part in settings.DIGEST_TIME.split(":"))
+    return dtime(hour, minute, tzinfo=vladivostok_tz)
+
+
+async def fetch_aggregates(since):
+    """{id доски: сводка} с backend или None, если backend недоступен."""
+    try:
+        response = await backend.get_json(
+            settings.DIGEST_URL, params={"since": since.isoformat()}
+        )
+        return response["boards"]
+    except Exception as e:
+        logger.logger.error(f"Не удалось получить сводку для дайджеста: {e}")
+        return None
+
+
+def board_digest(watch, stats, dwell, now):
+    """Текст раздела дайджеста по одной доске."""
+    stuck_after = settings.DIGEST_STUCK_DAYS * 86400
+    overdue = []
+    stuck = []
+    for task_id, snapshot in watch.tasks.items():
+        if snapshot["isCompleted"] or snapshot["isDeleted"]:
+            continue
+        due = due_timestamp(snapshot.get("dueDate"))
+        if due is not None and due < now:
+            overdue.append((now - due, snapshot["title"]))
+        spent = dwell.time_in_column(task_id, now)
+        if spent is not None and spent > stuck_after:
+            stuck.append((spent, snapshot["title"], snapshot["boardColumn"]))
+
+    lines = [f"📋 {watch.name}"]
+    if stats is None:
+        lines.append("Статистика перемещений недоступна")
+    else:
+        lines.append(
+            f"🔀 Перемещений: {stats['moves']}, "
+            f"✅ завершено: {stats['completed']}"
+        )
+        if stats["to_columns"]:
+            lines.append(
+                "📂 "
+                + ", ".join(
+                    f"{column}: {count}"
+                    for column, count in sorted(
+                        stats["to_columns"].items(), key=lambda kv: -kv[1]
+                    )
+                )
+            )
+    lines.append(f"⏰ Просрочено: {len(overdue)}")
+    lines.extend(f"  • {title}" for _, title in sorted(overdue)[-TOP:])
+    lines.append(
+        f"🐢 Больше {settings.DIGEST_STUCK_DAYS:g} дн. в одной колонке: "
+        f"{len(stuck)}"
+    )
+    lines.extend(
+        f"  • {title} — {column}, {spent / 86400:.0f} дн."
+        for spent, title, column in sorted(stuck, reverse=True)[:TOP]
+    )
+    return "\n".join(lines)
+
+
+def chat_digest(chat_id, chat_data, period, aggregates, now=None):
+    now = now or time.time()
+    dwell = dwell_for(tenants.for_chat(chat_id))
+    watches = chat_data.get("watched_boards", {}).values()
+    sections = [
+        board_digest(
+            watch,
+            (
+                None
+                if aggregates is None
+                else aggregates.get(
+                    str(watch.id),
+                    {"moves": 0, "completed": 0, "to_columns": {}},
+                )
+            ),
+            dwell,
+            now,
+        )
+        for watch in watches
+        if watch.ready
+    ]
+    if not sections:
+        return None
+    return f"🗞 Дайджест {PERIODS[period][1]}\n\n" + "\n\n".join(sections)
+
+
+async def send(bot, chat_id, text):
+    try:
+        await bot.send_message(chat_id=chat_id, text=text)
+    except RetryAfter as e:
+        delay = e.retry_after
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        await asyncio.sleep(delay)
+        await bot.send_message(chat_id=chat_id, text=text)
+
+
+async def deliver(bot, messages):
+    """Отправляет [(chat_id, текст)] пачками, не чаще пачки в секунду."""
+    size = settings.DIGEST_BATCH_SIZE
+    for i in range(0, len(messages), size):
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(
+                send(bot, chat_id, text)
+                for chat_id, text in messages[i : i + size]
+            ),
+            return_exceptions=True,
+        )
+        for (chat_id, _), result in zip(messages[i : i + size], results):
+            if isinstance(result, TelegramError):
+                logger.logger.warning(
+                    f"Дайджест не доставлен в чат {chat_id}: {result}"
+                )
+        await asyncio.sleep(max(0, 1 - (time.monotonic() - started)))
+
+
+async def send_digests(context):
+    """
+    Задача JobQueue: ежедневный дайджест, а в DIGEST_WEEKDAY — ещё и
+    недельный. Чат получает тот, на который подписан командой /digest.
+    """
+    now = datetime.now(vladivostok_tz)
+    periods = [DAILY]
+    if now.isoweekday() == settings.DIGEST_WEEKDAY:
+        periods.append(WEEKLY)
+
+    application = context.application
+    for period in periods:
+        recipients = [
+            (chat_id, chat_data)
+            for chat_id, chat_data in application.chat_data.items()
+            if chat_data.get("digest") == period
+        ]
+        if not recipients:
+            continue
+        aggregates = await fetch_aggregates(now - PERIODS[period][0])
+        messages = [
+            (chat_id, text)
+            for chat_id, chat_data in recipients
+            for text in (chat_digest(chat_id, chat_data, period, aggregates),)
+            if text
+        ]
+        logger.logger.info(f"Дайджест {period}: {len(messages)} чатов")
+        await deliver(context.bot, messages)
@@ -0,0 +1,201 @@
+"""
+Время нахождения задач в колонках (dwell time), cycle time и lead time.
+
+Моменты переходов берутся из updatedAt/createdAt WEEEK, а не из времени,
+когда бот заметил изменение; время опроса — только запасной вариант.
+История каждой задачи хранится компактно и только дописывается:
+array("q") с id колонок и array("d") с моментами входа в них.
+
+Движок один на арендатора, а не на чат: у задачи одна история, даже если
+доску отслеживают несколько чатов. Переход возвращается тому поллеру,
+который увидел его первым, и он же отправляет его в журнал на backend —
+так каждое перемещение записывается ровно один раз. Перцентили по
+колонкам считает backend (/api/stats/dwell/) по окну последних
+перемещений журнала: он общий для всех чатов и переживает перезапуск.
+"""
+
+import time
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import pytz
+
+from bot.utils.tracing import parse_weeek_time
+
+vladivostok_tz = pytz.timezone("Asia/Vladivostok")
+
+NO_COLUMN = -1
+
+Move = namedtuple(
+    "Move",
+    "task_id from_column to_column entered_at moved_at time_spent",
+)
+
+
+def weeek_timestamp(value):
+    """ISO-время WEEEK -> unix-время в секундах или None."""
+    ns = parse_weeek_time(value)
+    return ns / 1e9 if ns is not None else None
+
+
+def due_timestamp(value):
+    """
+    dueDate WEEEK -> unix-время окончания срока или None. Если указана
+    только дата (ГГГГ-ММ-ДД), срок истекает в конце дня по Владивостоку.
+    """
+    if not value:
+        return None
+    if len(str(value)) == 10:
+        try:
+            day = datetime.strptime(str(value), "%Y-%m-%d")
+        except ValueError:
+            return None
+        return vladivostok_tz.localize(day + timedelta(days=1)).timestamp()
+    return weeek_timestamp(value)
+
+
+class TaskHistory:
+    __slots__ = (
+        "columns",
+        "entered",
+        "names",
+        "created_at",
+        "completed_at",
+    )
+
+    def __init__(self, created_at):
+        self.columns = array("q")
+        self.entered = array("d")
+        self.names = []
+        self.created_at = created_at
+        self.completed_at = None
+
+    def append(self, column_id, name, at):
+        self.columns.append(NO_COLUMN if column_id is None else column_id)
+        self.entered.append(at)
+        self.names.append(name)
+
+    @property
+    def cycle_time(self):
+        """От выхода из первой колонки (начала работы) до завершения."""
+        if self.completed_at is None or len(self.entered) < 2:
+            return None
+        return max(0.0, self.completed_at - self.entered[1])
+
+    @property
+    def lead_time(self):
+        """От создания задачи до завершения."""
+        if self.completed_at is None or self.created_at is None:
+            return None
+        return max(0.0, self.completed_at - self.created_at)
+
+
+class DwellEngine:
+    def __init__(self):
+        self.histories = {}  # task_id -> TaskHistory
+
+    def observe(self, board_id, task, column_name, now=None):
+        """
+        Учитывает текущее положение задачи. Возвращает Move, если задача
+        перешла в другую колонку с прошлого наблюдения, иначе None.
+        """
+        now = now or time.time()
+        task_id = task["id"]
+        column_id = task.get("boardColumnId")
+        changed_at = weeek_timestamp(task.get("updatedAt"))
+        history = self.histories.get(task_id)
+
+        if history is None:
+            created_at = weeek_timestamp(task.get("createdAt"))
+            history = self.histories[task_id] = TaskHistory(created_at)
+            # Когда задача вошла в колонку, точно неизвестно: берём
+            # последнее изменение в WEEEK, затем создание, затем «сейчас»
+            history.append(
+                column_id, column_name, changed_at or created_at or now
+            )
+            self._observe_completion(history, task, changed_at, now)
+            return None
+
+        move = None
+        last = history.columns[-1]
+        if (NO_COLUMN if column_id is None else column_id) != last:
+            entered_at = history.entered[-1]
+            moved_at = changed_at or now
+            # updatedAt не сдвинулся или раньше входа — берём время опроса
+            if moved_at <= entered_at:
+                moved_at = now
+            move = Move(
+                task_id,
+                history.names[-1],
+                column_name,
+                entered_at,
+                moved_at,
+                moved_at - entered_at,
+            )
+            history.append(column_id, column_name, moved_at)
+
+        self._observe_completion(history, task, changed_at, now)
+        return move
+
+    @staticmethod
+    def _observe_completion(history, task, changed_at, now):
+        if task.get("isCompleted") and history.completed_at is None:
+            history.completed_at = max(changed_at or now, history.entered[-1])
+        elif not task.get("isCompleted"):
+            history.completed_at = None
+
+    def forget(self, task_id):
+        self.histories.pop(task_id, None)
+
+    def dump(self):
+        """Истории задач в виде, пригодном для JSON (снимок при остановке)."""
+        return [
+            [
+                task_id,
+                list(history.columns),
+                history.names,
+                list(history.entered),
+                history.created_at,
+                history.completed_at,
+            ]
+            for task_id, history in self.histories.items()
+        ]
+
+    def restore(self, rows):
+        """Восстанавливает истории из dump(); уже известные не трогает."""
+        for task_id, columns, names, entered, created, completed in rows:
+            if task_id in self.histories:
+                continue
+            history = TaskHistory(created)
+            history.columns.extend(columns)
+            history.entered.extend(entered)
+            history.names.extend(names)
+            history.completed_at = completed
+            self.histories[task_id] = history
+
+    def flow_times(self, task_id):
+        """(cycle_time, lead_time) завершённой задачи в секундах."""
+        history = self.histories.get(task_id)
+        if history is None:
+            return None, None
+        return history.cycle_time, history.lead_time
+
+    def entered_at(self, task_id):
+        """Когда задача вошла в текущую колонку (unix-время) или None."""
+        history = self.histories.get(task_id)
+        if history is None:
+            return None
+        return history.entered[-1]
+
+    def time_in_column(self, task_id, now=None):
+        """Сколько секунд задача уже находится в текущей колонке."""
+        history = self.histories.get(task_id)
+        if history is None:
+            return None
+        return (now or time.time()) - history.entered[-1]
+
+
+def dwell_for(tenant) -> DwellEngine:
+    """Движок в пространстве имён кэша арендатора."""
+    return tenant.cache.setdefault("dwell", DwellEngine())
@@ -0,0 +1,203 @@
+"""
+Локальное зеркало досок WEEEK: колонки, задачи и участники.
+
+Поллеры пишут в зеркало всё, что и так получают каждый цикл, а хендлеры
+только читают из него. В WEEEK хендлер идёт лишь если запись устарела
+(доска никем не опрашивается). Зеркало живёт в памяти в пространстве
+имён арендатора; при заданном MIRROR_DIR копия сохраняется на диск и
+подхватывается после перезапуска.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from bot.utils import api, logger
+
+MIRROR_TTL = float(os.getenv("MIRROR_TTL", "30"))
+MEMBERS_TTL = float(os.getenv("MEMBERS_TTL", "300"))
+MIRROR_DIR = os.getenv("MIRROR_DIR")
+MIRROR_SAVE_INTERVAL = float(os.getenv("MIRROR_SAVE_INTERVAL", "30"))
+
+
+def member_name(member):
+    return (
+        f"{member.get('firstName', '')} {member.get('lastName', '')}".strip()
+    )
+
+
+class BoardMirror:
+    def __init__(self):
+        self.columns = []  # как в boardColumns: [{"id", "name", ...}]
+        self.columns_at = 0.0
+        self.tasks = {}  # task_id -> задача WEEEK как есть
+        self.tasks_at = 0.0
+
+    def column_names(self):
+        return {col["id"]: col["name"] for col in self.columns}
+
+
+class Mirror:
+    def __init__(self, path=None, ttl=MIRROR_TTL):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.boards = {}  # board_id -> BoardMirror
+        self.task_board = {}  # task_id -> board_id
+        self.members = []  # участники пространства
+        self.members_at = 0.0
+        self._dirty = False
+        self._saved_at = 0.0
+        if self.path and self.path.exists():
+            self.load()
+
+    def board(self, board_id) -> BoardMirror:
+        return self.boards.setdefault(str(board_id), BoardMirror())
+
+    def _fresh(self, at, ttl=None):
+        return time.monotonic() - at < (ttl or self.ttl)
+
+    # --- запись (поллеры) ---
+
+    def put_columns(self, board_id, columns):
+        board = self.board(board_id)
+        board.columns = list(columns)
+        board.columns_at = time.monotonic()
+        self._dirty = True
+
+    def put_tasks(self, board_id, tasks):
+        """Полный список задач доски после цикла опроса."""
+        board = self.board(board_id)
+        for task_id in board.tasks:
+            # Задача могла уже перейти на другую доску
+            if self.task_board.get(task_id) == str(board_id):
+                del self.task_board[task_id]
+        board.tasks = {task["id"]: task for task in tasks}
+        for task_id in board.tasks:
+            self.task_board[task_id] = str(board_id)
+        board.tasks_at = time.monotonic()
+        self._dirty = True
+
+    def upsert_task(self, board_id, task):
+        self.board(board_id).tasks[task["id"]] = task
+        self.task_board[task["id"]] = str(board_id)
+        self._dirty = True
+
+    def put_members(self, members):
+        self.members = list(members)
+        self.members_at = time.monotonic()
+        self._dirty = True
+
+    # --- чтение (хендлеры), с откатом на WEEEK ---
+
+    async def get_members(self):
+        """Участники пространства: [{"id", "firstName", ...}]."""
+        if not self._fresh(self.members_at, MEMBERS_TTL):
+            response = await asyncio.to_thread(api.get_assignees)
+            if response.get("success") and "members" in response:
+                self.put_members(response["members"])
+        return self.members
+
+    async def get_id_to_name(self):
+        return {m["id"]: member_name(m) for m in await self.get_members()}
+
+    async def get_columns(self, board_id):
+        """Колонки доски: [{"id", "name", ...}]."""
+        board = self.board(board_id)
+        if not self._fresh(board.columns_at):
+            response = await asyncio.to_thread(
+                api.get_boardColumn_list, board_id
+            )
+            if not response.get("success") or "boardColumns" not in response:
+                raise api.WeeekApiError(
+                    response.get("message", "Ошибка get_boardColumn_list")
+                )
+            self.put_columns(board_id, response["boardColumns"])
+        return board.columns
+
+    async def get_column_names(self, board_id):
+        await self.get_columns(board_id)
+        return self.board(board_id).column_names()
+
+    async def get_tasks(self, board_id, project_id):
+        """Все задачи доски (порядок — как отдал WEEEK)."""
+        board = self.board(board_id)
+        if not self._fresh(board.tasks_at):
+            tasks = []
+            async for page in api.iter_task_pages(board_id, project_id):
+                tasks.extend(page)
+            self.put_tasks(board_id, tasks)
+        return list(board.tasks.values())
+
+    async def get_task(self, task_id):
+        """Задача по id: из свежей доски зеркала или из WEEEK."""
+        # id из callback_data приходит строкой, в WEEEK он числовой
+        key = int(task_id) if str(task_id).isdigit() else task_id
+        board_id = self.task_board.get(key)
+        if board_id and self._fresh(self.boards[board_id].tasks_at):
+            return self.boards[board_id].tasks[key]
+        response = await asyncio.to_thread(api.get_task, task_id)
+        if not response.get("success") or "task" not in response:
+            return None
+        task = response["task"]
+        board_id = task.get("boardId") or self.task_board.get(task["id"])
+        if board_id:
+            self.upsert_task(board_id, task)
+        return task
+
+    # --- копия на диске ---
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.logger.warning(f"Не удалось прочитать зеркало: {e}")
+            return
+        # Данные с диска считаем устаревшими: хендлеры их обновят,
+        # а поллеры перезапишут на первом же цикле
+        self.members = data.get("members", [])
+        for board_id, board_data in data.get("boards", {}).items():
+            board = self.board(board_id)
+            board.columns = board_data.get("columns", [])
+            board.tasks = {t["id"]: t for t in board_data.get("tasks", [])}
+            for task_id in board.tasks:
+                self.task_board[task_id] = board_id
+
+    def save(self, force=False):
+        """Сохраняет копию на диск не чаще MIRROR_SAVE_INTERVAL."""
+        if not self.path or not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._saved_at < MIRROR_SAVE_INTERVAL:
+            return
+        data = {
+            "members": self.members,
+            "boards": {
+                board_id: {
+                    "columns": board.columns,
+                    "tasks": list(board.tasks.values()),
+                }
+                for board_id, board in self.boards.items()
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._saved_at = now
+
+
+def mirror_for(tenant) -> Mirror:
+    """Зеркало в пространстве имён кэша арендатора."""
+    if "mirror" not in tenant.cache:
+        path = (
+            Path(MIRROR_DIR) / f"tenant-{tenant.id}.json"
+            if MIRROR_DIR
+            else None
+        )
+        tenant.cache["mirror"] = Mirror(path)
+    return tenant.cache["mirror"]
@@ -0,0 +1,117 @@
+"""
+Очередь отправки перемещений задач на backend.
+
+Поллер не ждёт ответа backend: запись ставится в очередь, а фоновый
+воркер отправляет накопившиеся записи одной пачкой (до MOVE_LOG_BATCH)
+через клиент backend. Если backend недоступен (сеть, таймаут, 5xx),
+пачка возвращается в очередь и отправляется снова после паузы, которая
+удваивается до MOVE_LOG_MAX_BACKOFF секунд. При остановке бота очередь
+дочищается, а то, что не успело уйти, сохраняется вместе со снимками
+поллеров и отправляется после перезапуска.
+"""
+
+import asyncio
+import os
+
+import httpx
+
+from bot.utils import logger
+from bot.utils.backend import backend
+
+MOVE_LOG_BATCH = int(os.getenv("MOVE_LOG_BATCH", "50"))
+MOVE_LOG_BACKOFF = float(os.getenv("MOVE_LOG_BACKOFF", "1"))
+MOVE_LOG_MAX_BACKOFF = float(os.getenv("MOVE_LOG_MAX_BACKOFF", "60"))
+
+
+class MoveLogQueue:
+    def __init__(self):
+        self.queue = None
+        self._task = None
+
+    def _ensure_started(self):
+        if self._task is None:
+            self.queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._worker())
+
+    def submit(self, payload):
+        self._ensure_started()
+        self.queue.put_nowait(payload)
+
+    async def _worker(self):
+        delay = MOVE_LOG_BACKOFF
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < MOVE_LOG_BATCH and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            sent = False
+            try:
+                sent = await send_moves(batch)
+            finally:
+                if not sent:
+                    # Обратно до task_done: drain не сочтёт очередь пустой
+                    # и при остановке сохранит пачку в снимок
+                    for payload in batch:
+                        self.queue.put_nowait(payload)
+                for _ in batch:
+                    self.queue.task_done()
+            if sent:
+                delay = MOVE_LOG_BACKOFF
+                continue
+            logger.logger.warning(
+                f"Backend недоступен, {len(batch)} перемещений "
+                f"уйдут снова через {delay:.0f} с"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MOVE_LOG_MAX_BACKOFF)
+
+    async def drain(self, timeout):
+        """
+        Ждёт отправки очереди не дольше timeout секунд и останавливает
+        воркер. Возвращает записи, которые отправить не успели.
+        """
+        if self._task is None:
+            return []
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.logger.warning("Очередь перемещений не успела уйти")
+        self._task.cancel()
+        # Прерванная отправка возвращает пачку в очередь при отмене
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        pending = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        return pending
+
+
+async def send_moves(payloads):
+    """
+    Отправляет пачку. False — временная ошибка, пачку нужно повторить;
+    отклонённые backend строки (4xx, ошибки в 207) не повторяются.
+    """
+    try:
+        result = await backend.post_moves(payloads)
+    except httpx.TransportError as e:
+        logger.logger.error(f"Не удалось отправить перемещения: {e!r}")
+        return False
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code >= 500:
+            logger.logger.error(f"Не удалось отправить перемещения: {e}")
+            return False
+        logger.logger.error(
+            f"Бэкенд отклонил {len(payloads)} перемещений: "
+            f"{e.response.text[:1000]}"
+        )
+        return True
+    except Exception as e:
+        logger.logger.error(
+            f"Ошибка отправки {len(payloads)} перемещений на бэкенд: {e}"
+        )
+        return True
+    if result.get("errors"):
+        logger.logger.error(f"Бэкенд отклонил перемещения: {result['errors']}")
+    return True
+
+
+move_log_queue = MoveLogQueue()
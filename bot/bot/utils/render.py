@@ -0,0 +1,123 @@
+"""
+Рендеринг карточек задач.
+
+Текст карточки зависит только от содержимого задачи, поэтому результат
+мемоизируется по его отпечатку (кортежу полей): неизменившиеся задачи
+повторно не рендерятся. Клавиатуры неизменяемы и кэшируются по id задачи.
+"""
+
+import html
+import re
+from functools import lru_cache
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from bot.utils.callback_data import SHOW_TASK, encode
+
+CACHE_SIZE = 4096
+
+# Переносы строк на месте блочных тегов, остальные теги — убираем
+_BLOCK_TAG_RE = re.compile(r"<\s*(?:br|/p|/div|/li|/h\d)\b[^>]*>", re.I)
+_TAG_RE = re.compile(r"<[^>]*>")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def remove_html_tags(text):
+    """Удаляет все HTML-теги из текста и раскрывает сущности (&amp; ...)"""
+    if text is None:
+        return "Без описания"
+    text = _BLOCK_TAG_RE.sub("\n", str(text))
+    text = html.unescape(_TAG_RE.sub("", text))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def assignee_names(assignees_ids, id_to_name):
+    return (
+        ", ".join(id_to_name.get(aid, str(aid)) for aid in assignees_ids)
+        or "Не назначен"
+    )
+
+
+def task_card(task, column_name, assignees, workspace_id, full=False):
+    """
+    Карточка задачи WEEEK: полная (с описанием) или краткая для списка.
+    assignees — уже готовая строка с именами исполнителей.
+    """
+    return _task_card(
+        task.get("id", 0),
+        task.get("title") or "Без названия",
+        task.get("description") if full else None,
+        column_name,
+        assignees,
+        task.get("dueDate") or "Без дедлайна",
+        task.get("type") or "Не указан",
+        bool(task.get("isCompleted")),
+        workspace_id,
+        full,
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _task_card(
+    task_id,
+    title,
+    description,
+    column_name,
+    assignees,
+    due_date,
+    task_type,
+    completed,
+    workspace_id,
+    full,
+):
+    lines = [f"📌 {title}"]
+    if full:
+        lines.append(f"Описание: {remove_html_tags(description)}")
+    lines += [
+        f"Колонка: {column_name}",
+        f"Исполнитель: {assignees}",
+        f"Дедлайн: {due_date}",
+        f"Тип: {task_type}",
+        f"Статус: {'Выполнена' if completed else 'Активна'}",
+        f"Ссылка: https://app.weeek.net/ws/{workspace_id}/task/{task_id}",
+    ]
+    if not full:
+        lines.append("---")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot_card(task_id, snapshot, workspace_id):
+    """Карточка из снимка поллера (Markdown)."""
+    return _snapshot_card(
+        task_id,
+        snapshot["title"],
+        snapshot["description"],
+        snapshot["boardColumn"],
+        bool(snapshot["isCompleted"]),
+        workspace_id,
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _snapshot_card(
+    task_id, title, description, column_name, completed, workspace_id
+):
+    return (
+        f"📌 *{title}*\n"
+        f"📝 {remove_html_tags(description) or '—'}\n"
+        f"📂 Колонка: {column_name}\n"
+        f"⚡ Статус: {'Выполнена' if completed else 'Активна'}\n"
+        f"Ссылка: https://app.weeek.net/ws/{workspace_id}/task/{task_id}\n"
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def show_task_keyboard(task_id):
+    """Кнопка «Посмотреть полностью» под уведомлением или карточкой."""
+    return InlineKeyboardMarkup.from_button(
+        InlineKeyboardButton(
+            "Посмотреть полностью",
+            callback_data=encode(SHOW_TASK, task_id),
+        )
+    )
@@ -0,0 +1,132 @@
+"""
+Локальный полнотекстовый индекс задач для inline-поиска (@bot запрос).
+
+Инвертированный индекс: токен -> множество id задач. Поллеры обновляют его
+инкрементально по своим диффам, поэтому поиск не обращается к WEEEK.
+Последний токен запроса ищется по префиксу (поиск по мере набора).
+"""
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Вес совпадения в названии выше, чем в описании
+TITLE_WEIGHT = 3
+BODY_WEIGHT = 1
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower().replace("ё", "е"))
+
+
+class IndexedTask:
+    __slots__ = ("task_id", "board_id", "title", "body", "column", "done")
+
+    def __init__(self, task_id, board_id, title, body, column, done):
+        self.task_id = task_id
+        self.board_id = board_id
+        self.title = title
+        self.body = body
+        self.column = column
+        self.done = done
+
+
+class TaskIndex:
+    def __init__(self):
+        self.docs = {}  # task_id -> IndexedTask
+        self.postings = defaultdict(dict)  # токен -> {task_id: вес}
+        self._vocabulary = []  # отсортированные токены для префиксов
+        self._vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self.docs)
+
+    def upsert(self, task_id, board_id, title, body, column="", done=False):
+        """Добавляет или переиндексирует задачу."""
+        self.remove(task_id)
+        self.docs[task_id] = IndexedTask(
+            task_id, board_id, title or "", body or "", column, done
+        )
+        weights = defaultdict(int)
+        for token in tokenize(title):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(body):
+            weights[token] += BODY_WEIGHT
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self._vocabulary_dirty = True
+            self.postings[token][task_id] = weight
+
+    def remove(self, task_id):
+        doc = self.docs.pop(task_id, None)
+        if doc is None:
+            return
+        for token in set(tokenize(doc.title)) | set(tokenize(doc.body)):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(task_id, None)
+            if not posting:
+                del self.postings[token]
+                self._vocabulary_dirty = True
+
+    def remove_board(self, board_id):
+        for task_id in [
+            t for t, doc in self.docs.items() if doc.board_id == board_id
+        ]:
+            self.remove(task_id)
+
+    def _prefix_tokens(self, prefix):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        i = bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(
+            prefix
+        ):
+            yield self._vocabulary[i]
+            i += 1
+
+    def search(self, query, limit=20, board_ids=None):
+        """
+        Задачи, содержащие все слова запроса (последнее — как префикс),
+        по убыванию релевантности.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores = None
+        for n, token in enumerate(tokens):
+            matches = defaultdict(int)
+            if n == len(tokens) - 1:
+                candidates = self._prefix_tokens(token)
+            else:
+                candidates = [token] if token in self.postings else []
+            for candidate in candidates:
+                for task_id, weight in self.postings[candidate].items():
+                    matches[task_id] = max(matches[task_id], weight)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    task_id: score + matches[task_id]
+                    for task_id, score in scores.items()
+                    if task_id in matches
+                }
+            if not scores:
+                return []
+
+        docs = (self.docs[task_id] for task_id in scores)
+        if board_ids is not None:
+            docs = (doc for doc in docs if doc.board_id in board_ids)
+        return sorted(docs, key=lambda d: -scores[d.task_id])[:limit]
+
+
+def index_for(tenant) -> TaskIndex:
+    """Индекс в пространстве имён кэша арендатора."""
+    if "search_index" not in tenant.cache:
+        tenant.cache["search_index"] = TaskIndex()
+    return tenant.cache["search_index"]
@@ -0,0 +1,97 @@
+"""
+Объединение одинаковых одновременных запросов к WEEEK (single-flight).
+
+Если несколько хендлеров или поллеров одновременно запрашивают одно и то
+же (те же функция, арендатор и параметры), в сеть уходит только первый
+запрос, остальные ждут его и получают тот же разобранный ответ или то же
+исключение. Ответ общий, поэтому вызывающие его не изменяют.
+
+Функции api.py выполняются в потоках (asyncio.to_thread), поэтому
+ожидание — на threading.Event.
+"""
+
+import threading
+from collections import Counter
+from functools import wraps
+
+from bot.utils import tenants
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # (функция, арендатор) -> число вызовов
+        self.calls = Counter()
+        # (функция, арендатор) -> сколько получили чужой ответ
+        self.shared = Counter()
+
+    def do(self, key, fn, *args, **kwargs):
+        name = key[:2]  # (функция, арендатор)
+        with self._lock:
+            self.calls[name] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared[name] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self, tenant_id=None):
+        """{функция: (вызовов, объединено)}; с tenant_id — по арендатору."""
+        result = {}
+        with self._lock:
+            for (name, owner), count in self.calls.items():
+                if tenant_id is not None and owner != tenant_id:
+                    continue
+                calls, shared = result.get(name, (0, 0))
+                result[name] = (
+                    calls + count,
+                    shared + self.shared[(name, owner)],
+                )
+        return result
+
+
+flights = SingleFlight()
+
+
+def single_flight(fn):
+    """Декоратор: одинаковые одновременные вызовы fn — один запрос."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (
+            fn.__name__,
+            tenants.current().id,
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        return flights.do(key, fn, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,92 @@
+"""
+Остановка и перезапуск поллеров без потери событий.
+
+При остановке поллеры дорабатывают текущий цикл (уведомления уходят),
+очередь перемещений дочищается, а состояние досок, истории колонок и
+неотправленные перемещения сохраняются в POLLER_STATE_DIR. После
+запуска поллеры продолжают со снимка: первый цикл сравнивает WEEEK с
+состоянием на момент остановки, и изменения за время простоя приходят
+уведомлениями — не больше CATCHUP_LIMIT на чат, остальные сводятся в
+одно сообщение.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from bot.utils import logger
+
+POLLER_STATE_DIR = os.getenv("POLLER_STATE_DIR")
+CATCHUP_LIMIT = int(os.getenv("CATCHUP_LIMIT", "20"))
+# Сколько ждать поллеры и очередь при остановке (docker даёт 10 с)
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "8"))
+
+stopping = asyncio.Event()
+
+
+async def pause(seconds):
+    """Пауза между циклами поллера, прерывается остановкой бота."""
+    try:
+        await asyncio.wait_for(stopping.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+def state_path():
+    return (
+        Path(POLLER_STATE_DIR) / "pollers.json" if POLLER_STATE_DIR else None
+    )
+
+
+def save_state(data):
+    path = state_path()
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    logger.logger.info(f"Снимок поллеров сохранён в {path}")
+
+
+def load_state():
+    """
+    Снимок последней остановки или None. Файл переименовывается: после
+    аварийного завершения старый снимок повторно не проигрывается.
+    """
+    path = state_path()
+    if path is None or not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.logger.warning(f"Не удалось прочитать снимок поллеров: {e}")
+        return None
+    finally:
+        os.replace(path, path.with_suffix(".loaded"))
+    return data
+
+
+def limit_catchup(chat_data, items):
+    """
+    В первом цикле после перезапуска пропускает не больше CATCHUP_LIMIT
+    уведомлений чата, остальные только считает.
+    """
+    budget = chat_data.get("catchup")
+    if budget is None:
+        return items
+    allowed = items[:budget]
+    chat_data["catchup"] = budget - len(allowed)
+    chat_data["catchup_skipped"] = (
+        chat_data.get("catchup_skipped", 0) + len(items) - len(allowed)
+    )
+    return allowed
+
+
+def finish_catchup(chat_data):
+    """Завершает догоняющий цикл; число пропущенных уведомлений."""
+    chat_data.pop("catchup", None)
+    return chat_data.pop("catchup_skipped", 0)
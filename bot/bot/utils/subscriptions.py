@@ -0,0 +1,188 @@
+"""
+Подписки чата на уведомления.
+
+Правила чата (только мои задачи, только выбранные колонки, только
+завершения, тихие часы) хранятся в chat_data и компилируются в набор
+предикатов. Поллер проверяет каждое изменение доски до того, как
+формирует текст сообщения, поэтому отфильтрованные изменения ничего не
+стоят: ни рендера, ни запроса к Telegram. В тихие часы прошедшие
+подписку уведомления откладываются в chat_data (hold) и отправляются,
+когда тихие часы закончатся.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import pytz
+
+vladivostok_tz = pytz.timezone("Asia/Vladivostok")
+
+NEW = "new"
+UPDATE = "update"
+REMOVED = "removed"
+
+# Изменение задачи на доске: вид (NEW/UPDATE/REMOVED), изменившиеся поля,
+# колонка до и после, исполнители до и после, завершена ли сейчас
+Change = namedtuple(
+    "Change",
+    "kind task_id fields column old_column assignees completed",
+)
+
+DEFAULT_RULES = {
+    "member_id": None,
+    "member_name": "",
+    "columns": [],
+    "completions": False,
+    "quiet": None,  # [с часа, до часа] по Владивостоку
+}
+
+# Сколько уведомлений хранить за тихие часы; об остальных — только число
+HELD_LIMIT = 50
+
+
+def diff_fields(old, new):
+    """Какие из отслеживаемых полей снимка изменились."""
+    fields = set()
+    if old["title"] != new["title"]:
+        fields.add("title")
+    if old["assignees_ids"] != new["assignees_ids"]:
+        fields.add("assignee")
+    if old["boardColumn"] != new["boardColumn"]:
+        fields.add("column")
+    if old["isCompleted"] != new["isCompleted"]:
+        fields.add("status")
+    if old["isDeleted"] != new["isDeleted"] and new["isDeleted"]:
+        fields.add("deleted")
+    return frozenset(fields)
+
+
+def make_change(kind, task_id, new, old=None, fields=frozenset()):
+    old = old or new
+    return Change(
+        kind,
+        task_id,
+        fields,
+        new["boardColumn"],
+        old["boardColumn"],
+        frozenset(old["assignees_ids"]) | frozenset(new["assignees_ids"]),
+        new["isCompleted"],
+    )
+
+
+class Subscription:
+    """Скомпилированные правила чата."""
+
+    def __init__(self, predicates, quiet, scope=()):
+        self.predicates = predicates
+        self.quiet = quiet
+        # Только «чьи задачи» и «какие колонки», без вида изменения
+        self.scope = scope
+
+    def accepts(self, change):
+        return all(predicate(change) for predicate in self.predicates)
+
+    def covers(self, change):
+        """Задача в области подписки (для напоминаний о сроках)."""
+        return all(predicate(change) for predicate in self.scope)
+
+    def select(self, changes):
+        """Изменения, о которых нужно сообщить; changes — [(Change, ...)]."""
+        if not self.predicates:
+            return changes
+        return [item for item in changes if self.accepts(item[0])]
+
+    def is_quiet(self, now=None):
+        if self.quiet is None:
+            return False
+        start, end = self.quiet
+        hour = (now or datetime.now(vladivostok_tz)).hour
+        if start <= end:
+            return start <= hour < end
+        # Через полночь: 22-8
+        return hour >= start or hour < end
+
+    def quiet_until(self, now=None):
+        """Конец текущих тихих часов (datetime по Владивостоку)."""
+        now = now or datetime.now(vladivostok_tz)
+        end = now.replace(
+            hour=self.quiet[1], minute=0, second=0, microsecond=0
+        )
+        if end <= now:
+            end += timedelta(days=1)
+        return end
+
+
+def rules_key(rules):
+    return (
+        rules.get("member_id"),
+        frozenset(rules.get("columns") or ()),
+        bool(rules.get("completions")),
+        tuple(rules["quiet"]) if rules.get("quiet") else None,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compile(key):
+    member_id, columns, completions, quiet = key
+    scope = []
+    if member_id is not None:
+        scope.append(lambda c: member_id in c.assignees)
+    if columns:
+        # Задача вошла в колонку, вышла из неё или изменилась в ней
+        scope.append(lambda c: c.column in columns or c.old_column in columns)
+    predicates = list(scope)
+    if completions:
+        predicates.append(
+            lambda c: c.kind == UPDATE and "status" in c.fields and c.completed
+        )
+    return Subscription(tuple(predicates), quiet, tuple(scope))
+
+
+def subscription_for(chat_data) -> Subscription:
+    """Скомпилированные правила чата (кэш по набору правил)."""
+    return _compile(rules_key(chat_data.get("subscription") or DEFAULT_RULES))
+
+
+def hold(chat_data, text, task_id=None):
+    """Откладывает уведомление чата до конца тихих часов."""
+    held = chat_data.setdefault("held", {"items": [], "more": 0})
+    if len(held["items"]) < HELD_LIMIT:
+        held["items"].append([text, task_id])
+    else:
+        held["more"] += 1
+
+
+def take_held(chat_data):
+    """([(текст, id задачи)], сколько не сохранено) и очистка очереди."""
+    held = chat_data.pop("held", None) or {"items": [], "more": 0}
+    return held["items"], held["more"]
+
+
+def rules_of(chat_data):
+    return chat_data.setdefault("subscription", dict(DEFAULT_RULES))
+
+
+def parse_quiet(value):
+    """'22-8' -> [22, 8]; ValueError, если часы указаны неверно."""
+    start, end = (int(part) for part in value.replace(" ", "").split("-"))
+    if not (0 <= start < 24 and 0 <= end < 24) or start == end:
+        raise ValueError(value)
+    return [start, end]
+
+
+def describe(rules):
+    lines = [
+        "👤 Только мои задачи: "
+        + (rules["member_name"] if rules.get("member_id") else "нет"),
+        "📂 Колонки: " + (", ".join(rules.get("columns") or []) or "все"),
+        "✅ Только завершения: "
+        + ("да" if rules.get("completions") else "нет"),
+        "🌙 Тихие часы: "
+        + (
+            "{}:00–{}:00".format(*rules["quiet"])
+            if rules.get("quiet")
+            else "нет"
+        ),
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,127 @@
+"""
+Мультиарендность: одна инсталляция бота обслуживает несколько
+пространств WEEEK. Каждый арендатор (строка Settings на backend) получает
+свой пул соединений, своё пространство имён кэша и честную долю бюджета
+опросов.
+
+Текущий арендатор хранится в contextvar: его выставляет activate() в начале
+обработки апдейта или в фоновом поллере, а api.py берёт из него сессию.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import requests
+from config import settings
+from requests.adapters import HTTPAdapter
+
+from bot.utils import logger
+
+
+class Tenant:
+    def __init__(self, tenant_id, week_key, chat_ids=(), name=""):
+        self.id = tenant_id
+        self.name = name or f"Пространство {tenant_id}"
+        self.chat_ids = set(chat_ids)
+
+        # Собственный пул keep-alive соединений к WEEEK
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=settings.TENANT_POOL_SIZE
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {week_key}"})
+
+        # Пространство имён кэша: ключи одного арендатора не пересекаются
+        # с ключами другого
+        self.cache = {}
+
+        self.poll_slots = None
+
+    def __repr__(self):
+        return f"<Tenant {self.id} {self.name!r}>"
+
+
+def _load_tenants():
+    tenants = {}
+    for row in settings.TENANTS:
+        if row.get("week_key"):
+            tenants[row["id"]] = Tenant(
+                row["id"],
+                row["week_key"],
+                row.get("chat_ids", []),
+                row.get("name", ""),
+            )
+    if not tenants:
+        # Режим одного пространства: ключ из Settings(id=1)
+        tenants[1] = Tenant(1, settings.WEEK_TOKEN)
+    return tenants
+
+
+TENANTS = _load_tenants()
+DEFAULT_TENANT = TENANTS.get(1) or next(iter(TENANTS.values()))
+CHAT_TO_TENANT = {
+    chat_id: tenant
+    for tenant in TENANTS.values()
+    for chat_id in tenant.chat_ids
+}
+
+# Бюджет опросов: глобальный лимит и равная доля на каждого арендатора,
+# чтобы один большой арендатор не занимал все слоты
+_global_poll_slots = asyncio.Semaphore(settings.POLL_BUDGET)
+for _tenant in TENANTS.values():
+    _tenant.poll_slots = asyncio.Semaphore(
+        max(1, settings.POLL_BUDGET // len(TENANTS))
+    )
+
+_current = ContextVar("tenant", default=DEFAULT_TENANT)
+
+
+def for_chat(chat_id) -> Tenant:
+    return CHAT_TO_TENANT.get(chat_id, DEFAULT_TENANT)
+
+
+def activate(chat_id) -> Tenant:
+    """Делает арендатора чата текущим для api.py в этом контексте."""
+    return use(for_chat(chat_id))
+
+
+def use(tenant) -> Tenant:
+    _current.set(tenant)
+    return tenant
+
+
+def current() -> Tenant:
+    return _current.get()
+
+
+@asynccontextmanager
+async def poll_slot(tenant: Tenant):
+    """
+    Слот на загрузку досок из WEEEK: сначала доля арендатора, потом
+    общий. Отправку в Telegram под слотом не держат.
+    """
+    async with tenant.poll_slots:
+        async with _global_poll_slots:
+            yield
+
+
+async def activate_for_update(update, context):
+    """
+    TypeHandler: выбирает арендатора по чату до остальных хендлеров и
+    запоминает чаты, в которых пользователь работает с ботом (по ним
+    inline-поиск находит его пространство и доски).
+    """
+    if update.effective_chat and update.effective_user:
+        chats = context.user_data.setdefault("chats", [])
+        if update.effective_chat.id not in chats:
+            chats.append(update.effective_chat.id)
+    # У inline-запросов нет чата — берём пользователя (его личный чат)
+    chat = update.effective_chat or update.effective_user
+    # Без чата и пользователя — арендатор по умолчанию, а не оставшийся
+    # от предыдущего апдейта
+    activate(chat.id if chat else None)
+
+
+logger.logger.info(f"Loaded tenants: {list(TENANTS.values())}")
@@ -0,0 +1,277 @@
+"""
+Трассировка задержки уведомлений: изменение в WEEEK -> опрос -> дифф ->
+отправка в Telegram. Спаны пишутся локально в формате OTLP/JSON
+(по одной строке ExportTraceServiceRequest на сброс буфера), файл на
+день; файлы старше TRACE_RETENTION_DAYS дней удаляются.
+
+Сводка за последние TRACE_SUMMARY_DAYS дней: команда /latency в боте или
+    python -m bot.utils.tracing [каталог_с_трейсами]
+"""
+
+import asyncio
+import json
+import math
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+TRACE_DIR = Path(os.getenv("TRACE_DIR", "traces"))
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+TRACE_RETENTION_DAYS = int(os.getenv("TRACE_RETENTION_DAYS", "7"))
+TRACE_SUMMARY_DAYS = int(os.getenv("TRACE_SUMMARY_DAYS", "1"))
+
+SCOPE_NAME = "weeek_bot.notifications"
+
+# Фазы задержки: (название, событие начала, событие конца)
+PHASES = (
+    ("weeek", "changed", "poll_started"),
+    ("api", "poll_started", "detected"),
+    ("diff", "detected", "diffed"),
+    ("send", "diffed", "sent"),
+    ("total", "start", "sent"),
+)
+
+
+def parse_weeek_time(value):
+    """ISO-время из WEEEK (updatedAt/createdAt) -> наносекунды или None."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000_000)
+
+
+class NotificationSpan:
+    """Один спан на одно обнаруженное изменение задачи."""
+
+    def __init__(
+        self, board_id, board_name, task_id, kind, polled_at, changed_at=None
+    ):
+        self.trace_id = secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = {
+            "board.id": str(board_id),
+            "board.name": str(board_name),
+            "task.id": str(task_id),
+            "change.kind": kind,
+        }
+        self.events = []
+        # Время изменения из WEEEK берём только если оно не «из будущего»
+        if changed_at and changed_at <= polled_at:
+            self.start_ns = changed_at
+            self.events.append(("changed", changed_at))
+        else:
+            self.start_ns = polled_at
+        self.events.append(("poll_started", polled_at))
+        self.end_ns = None
+
+    def mark(self, name, at=None):
+        self.events.append((name, at or time.time_ns()))
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+
+    def to_otlp(self):
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": "notification",
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _attributes(self.attributes),
+            "events": [
+                {"timeUnixNano": str(ts), "name": name}
+                for name, ts in self.events
+            ],
+        }
+
+
+class Tracer:
+    """Буферизует завершённые спаны и сбрасывает их в файл."""
+
+    def __init__(
+        self,
+        directory=TRACE_DIR,
+        enabled=TRACING_ENABLED,
+        retention_days=TRACE_RETENTION_DAYS,
+    ):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.retention_days = retention_days
+        self._pruned_on = None
+        self._buffer = []
+        # Запись идёт в потоке; строки разных сбросов не должны смешиваться
+        self._write_lock = threading.Lock()
+
+    def start(self, *args, **kwargs):
+        return NotificationSpan(*args, **kwargs)
+
+    def end(self, span):
+        span.finish()
+        if self.enabled:
+            self._buffer.append(span)
+
+    async def flush(self):
+        """
+        Пишет накопленные спаны одной строкой OTLP/JSON. Файл пишется в
+        потоке, чтобы не блокировать цикл событий поллеров.
+        """
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _attributes(
+                            {"service.name": "weeek_bot"}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SCOPE_NAME},
+                            "spans": [s.to_otlp() for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(payload, ensure_ascii=False) + "\n"
+        await asyncio.to_thread(self._write, line)
+
+    def _write(self, line):
+        with self._write_lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            today = date.today()
+            if self._pruned_on != today:
+                self.prune(today)
+                self._pruned_on = today
+            path = self.directory / f"spans-{today:%Y-%m-%d}.jsonl"
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def prune(self, today=None):
+        """Удаляет файлы старше retention_days дней (0 — хранить все)."""
+        if not self.retention_days:
+            return
+        since = (today or date.today()) - timedelta(days=self.retention_days)
+        for path, day in _span_files(self.directory):
+            if day < since:
+                path.unlink(missing_ok=True)
+
+
+def _attributes(values):
+    return [
+        {"key": key, "value": {"stringValue": str(value)}}
+        for key, value in values.items()
+    ]
+
+
+def _span_files(directory):
+    """[(файл, день)] по порядку дней; файлы с чужими именами пропускаются."""
+    files = []
+    for path in Path(directory).glob("spans-*.jsonl"):
+        try:
+            day = date.fromisoformat(path.stem.removeprefix("spans-"))
+        except ValueError:
+            continue
+        files.append((path, day))
+    return sorted(files, key=lambda item: item[1])
+
+
+def _iter_spans(directory, days=None):
+    since = date.today() - timedelta(days=days - 1) if days else date.min
+    for path, day in _span_files(directory):
+        if day < since:
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for rs in json.loads(line).get("resourceSpans", []):
+                    for ss in rs.get("scopeSpans", []):
+                        yield from ss.get("spans", [])
+
+
+def percentile(sorted_values, p):
+    """Перцентиль методом ближайшего ранга по отсортированному списку."""
+    if not sorted_values:
+        return None
+    k = max(
+        0,
+        min(
+            len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1
+        ),
+    )
+    return sorted_values[k]
+
+
+def latency_summary(directory=TRACE_DIR, days=TRACE_SUMMARY_DAYS, boards=None):
+    """
+    Считает задержки по фазам для каждой доски за последние days дней
+    (сегодня и days - 1 предыдущих; None — за всё время). boards —
+    id досок (строки), которыми ограничить сводку.
+    Возвращает {доска: {фаза: [секунды, ...] (отсортировано)}}.
+    """
+    result = defaultdict(lambda: defaultdict(list))
+    for span in _iter_spans(directory, days):
+        attrs = {
+            a["key"]: a["value"].get("stringValue")
+            for a in span.get("attributes", [])
+        }
+        if boards is not None and attrs.get("board.id") not in boards:
+            continue
+        events = {
+            e["name"]: int(e["timeUnixNano"]) for e in span.get("events", [])
+        }
+        events["start"] = int(span["startTimeUnixNano"])
+        board = attrs.get("board.name") or attrs.get("board.id", "?")
+        for phase, begin, end in PHASES:
+            if begin in events and end in events:
+                result[board][phase].append(
+                    (events[end] - events[begin]) / 1e9
+                )
+    for phases in result.values():
+        for values in phases.values():
+            values.sort()
+    return result
+
+
+def format_summary(summary):
+    if not summary:
+        return "Нет данных о задержках."
+    lines = []
+    for board, phases in sorted(summary.items()):
+        total = phases.get("total", [])
+        lines.append(f"📊 {board} (уведомлений: {len(total)})")
+        for phase, _, _ in PHASES:
+            values = phases.get(phase)
+            if not values:
+                continue
+            lines.append(
+                f"  {phase}: p50={percentile(values, 50):.2f}с "
+                f"p90={percentile(values, 90):.2f}с "
+                f"p99={percentile(values, 99):.2f}с"
+            )
+    return "\n".join(lines)
+
+
+tracer = Tracer()
+
+
+if __name__ == "__main__":
+    print(
+        format_summary(
+            latency_summary(sys.argv[1] if len(sys.argv) > 1 else TRACE_DIR)
+        )
+    )
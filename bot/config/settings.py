@@ -1,9 +1,55 @@
 import os
 import sys
 
-from requests import get
+from bot.utils.backend import fetch_json
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000/api/bot-token")
+TENANTS_URL = os.getenv("TENANTS_URL", "http://backend:8000/api/tenants/")
+
+# Мультиарендность: размер пула соединений на арендатора и общий
+# бюджет одновременных опросов, который делится между арендаторами поровну
+TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", "10"))
+POLL_BUDGET = int(os.getenv("POLL_BUDGET", "8"))
+
+# Постраничная загрузка задач WEEEK
+TASKS_PER_PAGE = int(os.getenv("TASKS_PER_PAGE", "100"))
+TASKS_FETCH_CONCURRENCY = int(os.getenv("TASKS_FETCH_CONCURRENCY", "4"))
+# С какого числа отслеживаемых досок проекта задачи грузятся одним
+# потоком по всему проекту, а не отдельно по каждой доске
+PROJECT_FETCH_MIN_BOARDS = int(os.getenv("PROJECT_FETCH_MIN_BOARDS", "3"))
+
+# Дайджест: сводка с backend, время отправки (ЧЧ:ММ по Владивостоку), день
+# недельного дайджеста (1 — понедельник), через сколько дней в одной
+# колонке задача считается застрявшей, сколько сообщений слать за секунду
+DIGEST_URL = os.getenv("DIGEST_URL", "http://backend:8000/api/stats/digest/")
+DIGEST_TIME = os.getenv("DIGEST_TIME", "09:00")
+DIGEST_WEEKDAY = int(os.getenv("DIGEST_WEEKDAY", "1"))
+DIGEST_STUCK_DAYS = float(os.getenv("DIGEST_STUCK_DAYS", "3"))
+DIGEST_BATCH_SIZE = int(os.getenv("DIGEST_BATCH_SIZE", "25"))
+
+# Сроки: за сколько минут предупреждать о дедлайне, сколько часов задача
+# может стоять в колонке (0 — не следить), свои лимиты для колонок
+# ("Ревью=8,Тестирование=24") и как часто проверять таймеры (секунды)
+DEADLINE_SOON_MINUTES = float(os.getenv("DEADLINE_SOON_MINUTES", "60"))
+COLUMN_SLA_HOURS = float(os.getenv("COLUMN_SLA_HOURS", "48"))
+COLUMN_SLA = {
+    name.strip(): float(hours)
+    for name, _, hours in (
+        item.rpartition("=")
+        for item in os.getenv("COLUMN_SLA", "").split(",")
+        if "=" in item
+    )
+}
+DEADLINE_TICK = float(os.getenv("DEADLINE_TICK", "30"))
+
+# Автоматы защиты WEEEK: по скольким последним запросам эндпоинта считать
+# ошибки, с какого числа запросов и какой доли ошибок размыкать, на сколько
+# секунд (пауза удваивается после неудачной пробы, но не больше максимума)
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_BUDGET = float(os.getenv("BREAKER_ERROR_BUDGET", "0.5"))
+BREAKER_OPEN = float(os.getenv("BREAKER_OPEN", "15"))
+BREAKER_MAX_OPEN = float(os.getenv("BREAKER_MAX_OPEN", "300"))
 
 
 def fetch_token(name: str) -> str:
@@ -12,9 +58,7 @@ def fetch_token(name: str) -> str:
     Если не удалось — сразу завершаем работу.
     """
     try:
-        response = get(BACKEND_URL, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(BACKEND_URL)
         if name not in data:
             print(
                 f"[ERROR] Ключ '{name}' не найден в ответе от {BACKEND_URL}",
@@ -30,5 +74,25 @@ def fetch_token(name: str) -> str:
         sys.exit(1)
 
 
-TELEGRAM_TOKEN = fetch_token("api_key")
-WEEK_TOKEN = fetch_token("week_key")
+# Токены можно задать в окружении (тесты, запуск без backend)
+TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN") or fetch_token("api_key")
+WEEK_TOKEN = os.getenv("WEEK_TOKEN") or fetch_token("week_key")
+
+
+def fetch_tenants() -> list:
+    """
+    Список пространств WEEEK с привязанными чатами.
+    Если backend его не отдаёт — работаем в режиме одного пространства.
+    """
+    try:
+        return fetch_json(TENANTS_URL)
+    except Exception as e:
+        print(
+            f"[WARN] Не удалось получить арендаторов с {TENANTS_URL}: {e}",
+            file=sys.stderr,
+        )
+        return []
+
+
+# Пустой TENANTS_URL — режим одного пространства без запроса к backend
+TENANTS = fetch_tenants() if TENANTS_URL else []
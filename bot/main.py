@@ -1,67 +1,74 @@
-from config.settings import TELEGRAM_TOKEN
+from config.settings import DEADLINE_TICK, TELEGRAM_TOKEN
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CallbackQueryHandler
+from telegram.ext import (
+    ApplicationBuilder,
+    CommandHandler,
+    TypeHandler,
+)
 
-from bot.handlers.callbacks import show_task_callback
+from bot.handlers import callbacks  # noqa: F401 — регистрирует маршруты
 from bot.handlers.commands import (
-    change_board,
-    change_project,
-    choose_sort_column,
-    handle_board_pagination,
-    handle_board_selection,
-    handle_pagination,
-    handle_project_pagination,
-    handle_project_selection,
-    handle_sorting,
-    show_task,
+    digest_settings,
+    latency,
+    notify_settings,
     start_conv,
+    unwatch,
 )
 from bot.handlers.errors import error_handler
+from bot.handlers.inline import inline_search_handler
+from bot.handlers.lifecycle import on_startup, on_stop
 from bot.handlers.messages import handle_message
+from bot.handlers.router import callback_router
+from bot.utils.callback_data import (
+    SHOW_TASK,
+    SORT,
+    SORT_COLUMN,
+    TASK_PAGE,
+    UNWATCH,
+)
+from bot.utils.deadlines import check_deadlines
+from bot.utils.digest import digest_time, send_digests
 from bot.utils.logger import logger
+from bot.utils.tenants import activate_for_update
 
 
 def main():
 
-    application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    # Поллеры продолжают со снимка последней остановки и сохраняют его
+    # при остановке
+    application = (
+        ApplicationBuilder()
+        .token(TELEGRAM_TOKEN)
+        .post_init(on_startup)
+        .post_stop(on_stop)
+        .build()
+    )
 
+    # Арендатор выбирается по чату раньше всех остальных хендлеров
+    application.add_handler(TypeHandler(Update, activate_for_update), -1)
     application.add_handler(start_conv)
+    application.add_handler(CommandHandler("latency", latency))
+    application.add_handler(CommandHandler("notify", notify_settings))
+    application.add_handler(CommandHandler("unwatch", unwatch))
+    application.add_handler(CommandHandler("digest", digest_settings))
+    application.add_handler(inline_search_handler)
     application.add_error_handler(error_handler)
+    # Кнопки под сообщениями вне диалога: карточки и страницы задач,
+    # выбор колонки и сортировки из старых сообщений, отключение досок
     application.add_handler(
-        CallbackQueryHandler(show_task_callback, pattern="^show_task_")
-    )
-    application.add_handler(
-        CallbackQueryHandler(change_project, pattern="^change_project$")
-    )
-    application.add_handler(
-        CallbackQueryHandler(change_board, pattern="^change_board$")
+        callback_router.handler(
+            SHOW_TASK, TASK_PAGE, SORT_COLUMN, SORT, UNWATCH
+        )
     )
 
-    application.add_handler(start_conv)
-    application.add_handler(
-        CallbackQueryHandler(handle_sorting, pattern="^sort_")
-    )
-    application.add_handler(
-        CallbackQueryHandler(show_task, pattern="^show_task_")
+    # Ежедневный дайджест, в DIGEST_WEEKDAY — ещё и недельный
+    application.job_queue.run_daily(
+        send_digests, time=digest_time(), name="digest"
     )
 
-    application.add_handler(
-        CallbackQueryHandler(choose_sort_column, pattern="^column_"),
-    )
-    application.add_handler(
-        CallbackQueryHandler(handle_pagination, pattern="^page_"),
-    )
-    application.add_handler(
-        CallbackQueryHandler(handle_board_pagination, pattern="^page_"),
-    )
-    application.add_handler(
-        CallbackQueryHandler(handle_board_selection, pattern="^page_"),
-    )
-    application.add_handler(
-        CallbackQueryHandler(handle_project_pagination, pattern="^page_"),
-    )
-    application.add_handler(
-        CallbackQueryHandler(handle_project_selection, pattern="^page_"),
+    # Напоминания о сроках и времени в колонке
+    application.job_queue.run_repeating(
+        check_deadlines, interval=DEADLINE_TICK, name="deadlines"
     )
 
     logger.info("Starting bot...")
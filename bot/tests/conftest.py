@@ -0,0 +1,6 @@
+import os
+
+# config.settings без backend: токены из окружения, одно пространство
+os.environ.setdefault("TELEGRAM_TOKEN", "test")
+os.environ.setdefault("WEEK_TOKEN", "test")
+os.environ["TENANTS_URL"] = ""
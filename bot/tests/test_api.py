@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+from config import settings
+
+from bot.handlers import commands
+from bot.utils import api
+from bot.utils.api import split_pages
+
+TASKS = [{"id": i} for i in range(250)]
+
+
+def fake_get_tasks(monkeypatch, with_total=True, fail_at=None, gate=None):
+    """get_tasks по списку TASKS; смещения запросов пишутся в calls."""
+    calls = []
+
+    def get_tasks(board_id, project_id, per_page, offset):
+        calls.append(offset)
+        if gate is not None and offset:
+            gate.wait(2)
+        if offset == fail_at:
+            return {"success": False, "message": "Ошибка WEEEK"}
+        page = TASKS[offset : offset + per_page]
+        response = {"success": True, "tasks": page}
+        if with_total:
+            response["total"] = len(TASKS)
+        else:
+            response["hasMore"] = offset + per_page < len(TASKS)
+        return response
+
+    monkeypatch.setattr(api, "get_tasks", get_tasks)
+    return calls
+
+
+async def collect(pages):
+    return [task["id"] async for tasks in pages for task in tasks]
+
+
+@pytest.mark.parametrize("with_total", [True, False])
+def test_all_pages_fetched_once(monkeypatch, with_total):
+    calls = fake_get_tasks(monkeypatch, with_total)
+    pages = api.iter_task_pages(1, 2, per_page=100, concurrency=2)
+    ids = asyncio.run(collect(pages))
+    assert sorted(ids) == [task["id"] for task in TASKS]
+    assert sorted(set(calls)) == sorted(calls)
+    if with_total:
+        assert sorted(calls) == [0, 100, 200]
+
+
+def test_page_error_is_raised(monkeypatch):
+    fake_get_tasks(monkeypatch, fail_at=100)
+    pages = api.iter_task_pages(1, 2, per_page=100, concurrency=2)
+    with pytest.raises(api.WeeekApiError, match="Ошибка WEEEK"):
+        asyncio.run(collect(pages))
+
+
+def test_early_stop_cancels_remaining_pages(monkeypatch):
+    gate = threading.Event()
+    calls = fake_get_tasks(monkeypatch, gate=gate)
+
+    async def main():
+        pages = api.iter_task_pages(1, 2, per_page=10, concurrency=1)
+        async with aclosing(pages):
+            async for tasks in pages:
+                return tasks
+
+    first = asyncio.run(main())
+    gate.set()
+    time.sleep(0.05)
+    assert [task["id"] for task in first] == list(range(10))
+    # Из 25 страниц успела начаться не больше чем одна лишняя
+    assert len(calls) <= 2
+
+
+async def pages_of(*pages, error=None):
+    for page in pages:
+        await asyncio.sleep(0)
+        yield page
+    if error:
+        raise error
+
+
+def test_split_pages_by_board():
+    pages = pages_of(
+        [{"id": 1, "board": "a"}, {"id": 2, "board": "b"}],
+        [{"id": 3, "board": "x"}, {"id": 4, "board": "a"}],
+    )
+
+    async def main():
+        pump, streams = split_pages(pages, ["a", "b"], lambda t: t["board"])
+        _, a, b = await asyncio.gather(
+            pump, collect(streams["a"]), collect(streams["b"])
+        )
+        return a, b
+
+    assert asyncio.run(main()) == ([1, 4], [2])
+
+
+def test_split_pages_error_reaches_every_reader():
+    pages = pages_of([{"id": 1, "board": "a"}], error=ValueError("502"))
+
+    async def main():
+        pump, streams = split_pages(pages, ["a", "b"], lambda t: t["board"])
+        return await asyncio.gather(
+            pump,
+            collect(streams["a"]),
+            collect(streams["b"]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.parametrize("keys", [[], ["a"]])
+def test_split_pages_empty_stream(keys):
+    async def main():
+        pump, streams = split_pages(pages_of(), keys, lambda t: t["board"])
+        await pump
+        return [await collect(stream) for stream in streams.values()]
+
+    assert asyncio.run(main()) == [[] for _ in keys]
+
+
+def make_watch(board_id, *column_ids):
+    watch = commands.BoardWatch(board_id, f"Доска {board_id}", 1)
+    watch.column_names = {column_id: "Колонка" for column_id in column_ids}
+    return watch
+
+
+def test_few_boards_fetched_separately(monkeypatch):
+    monkeypatch.setattr(settings, "PROJECT_FETCH_MIN_BOARDS", 3)
+    calls = []
+
+    async def iter_task_pages(board_id, project_id):
+        calls.append(board_id)
+        yield [{"id": board_id}]
+
+    monkeypatch.setattr(api, "iter_task_pages", iter_task_pages)
+    pumps, pages = commands.fetch_plan(1, [make_watch(10), make_watch(20)])
+
+    async def main():
+        return {key: await collect(stream) for key, stream in pages.items()}
+
+    assert pumps == []
+    assert asyncio.run(main()) == {"10": [10], "20": [20]}
+    assert calls == [10, 20]
+
+
+def test_many_boards_share_one_project_stream(monkeypatch):
+    monkeypatch.setattr(settings, "PROJECT_FETCH_MIN_BOARDS", 2)
+    calls = []
+
+    async def iter_task_pages(board_id, project_id):
+        calls.append((board_id, project_id))
+        yield [
+            {"id": 1, "boardId": 10},
+            {"id": 2, "boardId": 20},
+            # Без boardId — доска по колонке
+            {"id": 3, "boardColumnId": 201},
+            {"id": 4, "boardId": 30},
+        ]
+
+    monkeypatch.setattr(api, "iter_task_pages", iter_task_pages)
+    watches = [make_watch(10, 101), make_watch(20, 201)]
+    pumps, pages = commands.fetch_plan(1, watches)
+
+    async def main():
+        *_, tens, twenties = await asyncio.gather(
+            *pumps, collect(pages["10"]), collect(pages["20"])
+        )
+        return tens, twenties
+
+    assert asyncio.run(main()) == ([1], [2, 3])
+    assert calls == [(None, 1)]
@@ -0,0 +1,98 @@
+import pytest
+
+from bot.utils import breaker
+from bot.utils.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_breaker():
+    return CircuitBreaker(
+        "test",
+        window=10,
+        min_calls=4,
+        error_budget=0.5,
+        open_for=10,
+        max_open_for=30,
+    )
+
+
+def trip(b):
+    for _ in range(4):
+        b.failure()
+    assert b.state == OPEN
+
+
+def test_trips_only_after_min_calls(clock):
+    b = make_breaker()
+    for _ in range(3):
+        b.failure()
+    assert b.state == CLOSED
+    b.failure()
+    assert b.state == OPEN
+    assert not b.allow()
+    assert b.retry_in() == 10
+
+
+def test_stays_closed_within_error_budget(clock):
+    b = make_breaker()
+    for _ in range(3):
+        b.success()
+        b.failure()
+    assert b.state == CLOSED
+
+
+def test_half_open_lets_one_probe(clock):
+    b = make_breaker()
+    trip(b)
+    clock[0] += 10
+    assert b.allow()
+    assert b.state == HALF_OPEN
+    assert not b.allow()
+    assert not b.allow()
+
+
+def test_failed_probe_doubles_pause_up_to_max(clock):
+    b = make_breaker()
+    trip(b)
+    for expected in (20, 30, 30):
+        clock[0] += b.open_for
+        assert b.allow()
+        b.failure()
+        assert b.state == OPEN
+        assert b.open_for == expected
+        assert b.retry_in() == expected
+
+
+def test_successful_probe_closes_and_resets_pause(clock):
+    b = make_breaker()
+    trip(b)
+    clock[0] += 10
+    assert b.allow()
+    b.failure()
+    clock[0] += 20
+    assert b.allow()
+    b.success()
+    assert b.state == CLOSED
+    assert b.open_for == 10
+    assert b.allow()
+    # Окно очищено: прежние ошибки не размыкают автомат снова
+    assert list(b.results) == [False]
+
+
+def test_breakers_are_per_tenant(clock):
+    first = breaker.breaker_for("t-a", "tm/tasks")
+    assert breaker.breaker_for("t-a", "tm/tasks") is first
+    other = breaker.breaker_for("t-b", "tm/tasks")
+    assert other is not first
+    for _ in range(breaker.settings.BREAKER_MIN_CALLS):
+        first.failure()
+    assert first.state == OPEN
+    assert other.allow()
+    assert breaker.retry_in("t-a") > 0
+    assert breaker.retry_in("t-b") == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from bot.utils import bulk
+from bot.utils.bulk import BulkParseError, parse_csv, parse_file, parse_lines
+
+
+def test_parse_lines_checklist_and_descriptions():
+    text = "\n".join(
+        [
+            "# Спринт",
+            "## Бэкенд",
+            "- [ ] Починить вход | падает на Safari",
+            "* [x] Обновить зависимости",
+            "1. Написать тесты",
+            "2) Ревью",
+            "",
+            "   ",
+            "#42 исправить вход",
+            "#",
+        ]
+    )
+    assert parse_lines(text) == [
+        ("Починить вход", "падает на Safari"),
+        ("Обновить зависимости", ""),
+        ("Написать тесты", ""),
+        ("Ревью", ""),
+        ("#42 исправить вход", ""),
+    ]
+
+
+def test_parse_csv_with_header():
+    text = "Описание,Название\nподробно,Первая\n,Вторая\nбез названия,\n"
+    assert parse_csv(text) == [("Первая", "подробно"), ("Вторая", "")]
+
+
+def test_parse_csv_without_header_and_semicolons():
+    text = "Первая;описание 1\nВторая;описание 2\n"
+    assert parse_csv(text) == [
+        ("Первая", "описание 1"),
+        ("Вторая", "описание 2"),
+    ]
+
+
+def test_parse_csv_empty():
+    assert parse_csv("") == []
+
+
+def test_parse_file_by_extension():
+    data = "title,description\nЗадача,текст\n".encode("utf-8-sig")
+    assert parse_file("tasks.CSV", data) == [("Задача", "текст")]
+    assert parse_file("tasks.md", "- Задача".encode()) == [("Задача", "")]
+
+
+def test_parse_file_rejects_bad_input():
+    with pytest.raises(BulkParseError):
+        parse_file("tasks.txt", "Задача".encode("cp1251"))
+    with pytest.raises(BulkParseError):
+        parse_file("tasks.txt", b"x" * (bulk.MAX_FILE_SIZE + 1))
+
+
+def test_limit():
+    tasks = [("Задача", "")] * bulk.MAX_BULK_TASKS
+    assert bulk.limit(tasks) is tasks
+    with pytest.raises(BulkParseError):
+        bulk.limit(tasks + [("Ещё одна", "")])
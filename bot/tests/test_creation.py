@@ -0,0 +1,158 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+import requests
+from urllib3.exceptions import (
+    MaxRetryError,
+    NameResolutionError,
+    NewConnectionError,
+    ProtocolError,
+)
+
+from bot.utils import api, creation
+
+
+def connection_error(reason):
+    """ConnectionError так, как его бросает requests поверх urllib3."""
+    return requests.ConnectionError(MaxRetryError(None, "/tm/tasks", reason))
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (requests.ConnectTimeout(), True),
+        (connection_error(NewConnectionError(None, "refused")), True),
+        (
+            connection_error(
+                NameResolutionError("api.weeek.net", None, socket.gaierror())
+            ),
+            True,
+        ),
+        (api.CircuitOpen("tm/tasks", 1.0), True),
+        (api.RateLimited("429"), True),
+        (connection_error(ProtocolError("Connection aborted.")), False),
+        (requests.ConnectionError("reset"), False),
+        (requests.ReadTimeout(), False),
+        (api.WeeekUnavailable("502"), False),
+    ],
+)
+def test_not_sent(error, expected):
+    assert creation.not_sent(error) is expected
+
+
+@pytest.fixture
+def weeek(monkeypatch):
+    """WEEEK, который сначала отвечает ошибками из errors."""
+    state = {"errors": [], "calls": 0, "searches": 0, "created": []}
+
+    def create_task(**kwargs):
+        state["calls"] += 1
+        task = {"id": state["calls"], "title": kwargs["title"]}
+        if state["errors"]:
+            error = state["errors"].pop(0)
+            if not creation.not_sent(error):
+                state["created"].append(task)
+            raise error
+        state["created"].append(task)
+        return {"success": True, "task": task}
+
+    async def find_created(request, claimed):
+        state["searches"] += 1
+        return state["created"][0] if state["created"] else None
+
+    monkeypatch.setattr(api, "create_task", create_task)
+    monkeypatch.setattr(creation, "find_created", find_created)
+    monkeypatch.setattr(creation, "CREATE_BACKOFF", 0)
+    return state
+
+
+def create(title="Задача", key=None):
+    async def main():
+        queue = creation.CreationQueue(workers=1)
+        request = creation.CreateRequest(1, 2, 3, 4, title, key=key)
+        return await queue.submit(request)
+
+    return asyncio.run(main())
+
+
+def test_not_sent_error_retried_without_search(weeek):
+    weeek["errors"] = [connection_error(NewConnectionError(None, "refused"))]
+    assert create()["id"] == 2
+    assert weeek["searches"] == 0
+
+
+def test_lost_response_finds_created_task(weeek):
+    # Соединение оборвалось после отправки — задача уже есть в WEEEK
+    weeek["errors"] = [connection_error(ProtocolError("aborted"))]
+    assert create()["id"] == 1
+    assert weeek["calls"] == 1
+    assert len(weeek["created"]) == 1
+
+
+def test_api_error_not_retried(weeek, monkeypatch):
+    monkeypatch.setattr(
+        api, "create_task", lambda **kwargs: {"success": False}
+    )
+    with pytest.raises(api.WeeekApiError):
+        create()
+
+
+def test_same_key_submitted_once(weeek):
+    async def main():
+        queue = creation.CreationQueue(workers=2)
+        first = queue.submit(creation.CreateRequest(1, 2, 3, 4, "А", key="k"))
+        again = queue.submit(creation.CreateRequest(1, 2, 3, 4, "А", key="k"))
+        await first
+        done = queue.submit(creation.CreateRequest(1, 2, 3, 4, "А", key="k"))
+        return first is again, await done
+
+    same, task = asyncio.run(main())
+    assert same and task["id"] == 1
+    assert weeek["calls"] == 1
+
+
+def test_drain_postpones_unfinished_requests(weeek, monkeypatch):
+    gate = threading.Event()
+
+    def create_task(**kwargs):
+        gate.wait(2)
+        return {"success": True, "task": {"id": 1}}
+
+    monkeypatch.setattr(api, "create_task", create_task)
+
+    async def main():
+        queue = creation.CreationQueue(workers=1)
+        running = queue.submit(creation.CreateRequest(1, 2, 3, 4, "А"))
+        waiting = queue.submit(creation.CreateRequest(1, 2, 3, 4, "Б"))
+        await asyncio.sleep(0.01)
+        await queue.drain(0.01)
+        late = queue.submit(creation.CreateRequest(1, 2, 3, 4, "В"))
+        results = await asyncio.gather(
+            running, waiting, late, return_exceptions=True
+        )
+        # Отпускаем поток прерванного запроса, чтобы loop закрылся сразу
+        gate.set()
+        return queue, results
+
+    queue, results = asyncio.run(main())
+    assert all(isinstance(r, creation.Postponed) for r in results)
+    assert [(r.title, r.sent) for r in queue.deferred] == [
+        ("А", True),
+        ("Б", False),
+        ("В", False),
+    ]
+
+
+def test_restored_sent_request_looks_for_created_task_first(weeek):
+    weeek["created"].append({"id": 7, "title": "Задача"})
+    request = creation.CreateRequest(1, 2, 3, 4, "Задача", sent=True)
+    restored = creation.CreateRequest.restore(request.dump())
+    assert restored.key == request.key
+
+    async def main():
+        return await creation.CreationQueue(workers=1).submit(restored)
+
+    assert asyncio.run(main())["id"] == 7
+    assert weeek["calls"] == 0
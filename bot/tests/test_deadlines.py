@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+
+from bot.utils.deadlines import OVERDUE, SOON, STUCK, DeadlineWatcher
+
+NOW = 1_000_000.0
+HOUR = 3600
+BOARD = {"id": 7, "name": "Разработка"}
+
+
+def snapshot(due=None, column="В работе", completed=False):
+    return {
+        "title": "Задача",
+        "boardColumn": column,
+        "assignees_ids": [1],
+        "isCompleted": completed,
+        "isDeleted": False,
+        "dueDate": due,
+    }
+
+
+def iso(timestamp):
+    # Дата со временем, чтобы срок не переносился на конец дня
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def track(watcher, due=None, entered_at=None, **kwargs):
+    watcher.track(
+        1,
+        BOARD,
+        10,
+        snapshot(iso(due) if due else None, **kwargs),
+        entered_at,
+        now=NOW,
+    )
+
+
+def kinds(alerts):
+    return sorted(alert.kind for alert in alerts)
+
+
+def test_soon_then_overdue_fire_once():
+    watcher = DeadlineWatcher()
+    track(watcher, due=NOW + 2 * HOUR)
+    assert watcher.pop_due(NOW + HOUR - 1) == []
+    assert kinds(watcher.pop_due(NOW + HOUR)) == [SOON]
+    assert kinds(watcher.pop_due(NOW + 2 * HOUR)) == [OVERDUE]
+    assert watcher.pop_due(NOW + 10 * HOUR) == []
+    # Тот же срок после срабатывания не взводится заново
+    track(watcher, due=NOW + 2 * HOUR)
+    assert watcher.pop_due(NOW + 10 * HOUR) == []
+
+
+def test_moved_deadline_skips_stale_heap_entries():
+    watcher = DeadlineWatcher()
+    track(watcher, due=NOW + 2 * HOUR)
+    track(watcher, due=NOW + 5 * HOUR)
+    # Старые записи кучи остались, но устарели и пропускаются
+    assert len(watcher.heap) > len(watcher.timers)
+    assert watcher.pop_due(NOW + 3 * HOUR) == []
+    alerts = watcher.pop_due(NOW + 5 * HOUR)
+    assert kinds(alerts) == [OVERDUE, SOON]
+    assert watcher.heap == []
+
+
+def test_completed_task_cancels_timers():
+    watcher = DeadlineWatcher()
+    track(watcher, due=NOW + 2 * HOUR)
+    track(watcher, due=NOW + 2 * HOUR, completed=True)
+    assert len(watcher) == 0
+    assert watcher.pop_due(NOW + 10 * HOUR) == []
+
+
+def test_past_deadlines_skipped_on_first_load():
+    watcher = DeadlineWatcher()
+    watcher.track(
+        1, BOARD, 10, snapshot(iso(NOW - HOUR)), None, NOW, notify_past=False
+    )
+    assert len(watcher) == 0
+
+
+def test_stuck_in_column():
+    watcher = DeadlineWatcher()
+    track(watcher, entered_at=NOW)
+    assert kinds(watcher.pop_due(NOW + 48 * HOUR)) == [STUCK]
+
+
+def test_rearm_fires_again_later():
+    watcher = DeadlineWatcher()
+    track(watcher, due=NOW + 2 * HOUR)
+    (alert,) = watcher.pop_due(NOW + HOUR)
+    watcher.rearm(alert, NOW + 1.5 * HOUR)
+    assert watcher.pop_due(NOW + 1.4 * HOUR) == []
+    (again,) = watcher.pop_due(NOW + 1.5 * HOUR)
+    assert again.kind == SOON
+    assert again.fire_at == NOW + 1.5 * HOUR
+    assert kinds(watcher.pop_due(NOW + 2 * HOUR)) == [OVERDUE]
+
+
+def test_rearm_skips_soon_past_due_and_retracked_timers():
+    watcher = DeadlineWatcher()
+    track(watcher, due=NOW + 2 * HOUR)
+    (soon,) = watcher.pop_due(NOW + HOUR)
+    # К концу тихих часов срок уже истечёт — хватит «просрочена»
+    watcher.rearm(soon, NOW + 3 * HOUR)
+    assert kinds(watcher.pop_due(NOW + 3 * HOUR)) == [OVERDUE]
+
+    track(watcher, due=NOW + 4 * HOUR)
+    (soon,) = watcher.pop_due(NOW + 3 * HOUR)
+    # Задача изменилась до конца тихих часов: таймер уже пересчитан
+    track(watcher, due=NOW + 6 * HOUR)
+    watcher.rearm(soon, NOW + 3.5 * HOUR)
+    assert watcher.pop_due(NOW + 4 * HOUR) == []
+    assert kinds(watcher.pop_due(NOW + 5 * HOUR)) == [SOON]
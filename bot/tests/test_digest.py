@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from config import settings
+from telegram.error import BadRequest, RetryAfter
+
+from bot.handlers.commands import BoardWatch
+from bot.utils import digest, tenants
+from bot.utils.dwell import DwellEngine, vladivostok_tz
+
+NOW = 1_750_000_000.0
+DAY = 86400
+
+
+def snapshot(title, due=None, completed=False):
+    return {
+        "title": title,
+        "boardColumn": "В работе",
+        "isCompleted": completed,
+        "isDeleted": False,
+        "dueDate": due,
+    }
+
+
+def make_chat(monkeypatch):
+    monkeypatch.setattr(settings, "DIGEST_STUCK_DAYS", 3)
+    dwell = DwellEngine()
+    monkeypatch.setitem(tenants.DEFAULT_TENANT.cache, "dwell", dwell)
+    watch = BoardWatch(10, "Разработка", 1)
+    watch.ready = True
+    overdue = f"{datetime.fromtimestamp(NOW - DAY, timezone.utc):%FT%TZ}"
+    watch.tasks = {
+        901: snapshot("Просрочена", due=overdue),
+        902: snapshot("Застряла"),
+        903: snapshot("Готова", due=overdue, completed=True),
+    }
+    for task_id, entered in ((901, NOW - DAY), (902, NOW - 5 * DAY)):
+        dwell.observe(10, {"id": task_id, "boardColumnId": 1}, "", entered)
+    loading = BoardWatch(20, "Ещё грузится", 1)
+    return {"watched_boards": {"10": watch, "20": loading}}
+
+
+def test_chat_digest_sections(monkeypatch):
+    chat_data = make_chat(monkeypatch)
+    aggregates = {
+        "10": {"moves": 4, "completed": 1, "to_columns": {"Готово": 1}}
+    }
+    text = digest.chat_digest(1, chat_data, digest.DAILY, aggregates, NOW)
+    assert text.startswith("🗞 Дайджест за сутки")
+    assert "🔀 Перемещений: 4, ✅ завершено: 1" in text
+    assert "📂 Готово: 1" in text
+    assert "⏰ Просрочено: 1\n  • Просрочена" in text
+    assert "в одной колонке: 1\n  • Застряла — В работе, 5 дн." in text
+    assert "Ещё грузится" not in text
+
+
+def test_chat_digest_without_backend(monkeypatch):
+    chat_data = make_chat(monkeypatch)
+    text = digest.chat_digest(1, chat_data, digest.WEEKLY, None, NOW)
+    assert "Статистика перемещений недоступна" in text
+    # Доска без перемещений за период — нули, а не «недоступна»
+    text = digest.chat_digest(1, chat_data, digest.WEEKLY, {}, NOW)
+    assert "🔀 Перемещений: 0, ✅ завершено: 0" in text
+    assert digest.chat_digest(1, {}, digest.DAILY, {}, NOW) is None
+
+
+class FakeBot:
+    def __init__(self, fail=()):
+        self.sent = []
+        self.fail = dict(fail)
+
+    async def send_message(self, chat_id, text):
+        error = self.fail.pop(chat_id, None)
+        if error:
+            raise error
+        self.sent.append(chat_id)
+
+
+def test_deliver_in_batches(monkeypatch):
+    monkeypatch.setattr(settings, "DIGEST_BATCH_SIZE", 2)
+    pauses = []
+
+    async def sleep(seconds):
+        pauses.append(seconds)
+
+    monkeypatch.setattr(digest.asyncio, "sleep", sleep)
+    bot = FakeBot({2: RetryAfter(7), 3: BadRequest("Chat not found")})
+    messages = [(chat_id, "текст") for chat_id in range(1, 6)]
+    asyncio.run(digest.deliver(bot, messages))
+    # Чат 2 получил дайджест после паузы RetryAfter, чат 3 — пропущен
+    assert sorted(bot.sent) == [1, 2, 4, 5]
+    assert 7 in pauses
+    assert len([p for p in pauses if p != 7]) == 3
+
+
+def test_send_digests_by_subscription(monkeypatch):
+    today = datetime.now(vladivostok_tz).isoweekday()
+    monkeypatch.setattr(settings, "DIGEST_WEEKDAY", today)
+    periods = []
+
+    async def fetch_aggregates(since):
+        periods.append(since)
+        return {}
+
+    delivered = []
+
+    async def deliver(bot, messages):
+        delivered.extend(messages)
+
+    monkeypatch.setattr(digest, "fetch_aggregates", fetch_aggregates)
+    monkeypatch.setattr(digest, "deliver", deliver)
+    chat = make_chat(monkeypatch)
+    application = SimpleNamespace(
+        chat_data={
+            1: {**chat, "digest": digest.DAILY},
+            2: {**chat, "digest": digest.WEEKLY},
+            3: chat,
+        }
+    )
+    context = SimpleNamespace(application=application, bot=None)
+    asyncio.run(digest.send_digests(context))
+    assert [chat_id for chat_id, _ in delivered] == [1, 2]
+    assert "за неделю" in delivered[1][1]
+    # Один запрос агрегатов на период, а не на чат
+    assert len(periods) == 2
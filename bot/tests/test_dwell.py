@@ -0,0 +1,72 @@
+from bot.utils.dwell import DwellEngine, due_timestamp, weeek_timestamp
+
+CREATED = "2024-05-01T00:00:00Z"
+T0 = weeek_timestamp(CREATED)
+
+
+def task(column, updated=None, completed=False):
+    return {
+        "id": 1,
+        "boardColumnId": column,
+        "createdAt": CREATED,
+        "updatedAt": updated,
+        "isCompleted": completed,
+    }
+
+
+def test_first_observation_uses_weeek_time():
+    engine = DwellEngine()
+    assert engine.observe(7, task(1, "2024-05-01T01:00:00Z"), "A") is None
+    assert engine.entered_at(1) == T0 + 3600
+
+
+def test_move_measured_by_updated_at_not_poll_time():
+    engine = DwellEngine()
+    engine.observe(7, task(1), "A", now=T0 + 10)
+    move = engine.observe(
+        7, task(2, "2024-05-01T02:00:00Z"), "B", now=T0 + 99999
+    )
+    assert (move.from_column, move.to_column) == ("A", "B")
+    assert move.entered_at == T0
+    assert move.time_spent == 7200
+    assert engine.entered_at(1) == T0 + 7200
+    # Повторное наблюдение той же колонки — не переход
+    assert engine.observe(7, task(2, "2024-05-01T02:00:00Z"), "B") is None
+
+
+def test_stale_updated_at_falls_back_to_poll_time():
+    engine = DwellEngine()
+    engine.observe(7, task(1, "2024-05-01T01:00:00Z"), "A")
+    move = engine.observe(
+        7, task(2, "2024-05-01T01:00:00Z"), "B", now=T0 + 5000
+    )
+    assert move.moved_at == T0 + 5000
+    assert move.time_spent == 5000 - 3600
+
+
+def test_flow_times_of_completed_task():
+    engine = DwellEngine()
+    engine.observe(7, task(1), "A")
+    engine.observe(7, task(2, "2024-05-01T01:00:00Z"), "B")
+    engine.observe(7, task(2, "2024-05-01T03:00:00Z", completed=True), "B")
+    assert engine.flow_times(1) == (7200, 10800)
+    # Задачу переоткрыли — времена сбрасываются
+    engine.observe(7, task(2, "2024-05-01T04:00:00Z"), "B")
+    assert engine.flow_times(1) == (None, None)
+
+
+def test_dump_restore_keeps_history():
+    engine = DwellEngine()
+    engine.observe(7, task(1), "A")
+    engine.observe(7, task(2, "2024-05-01T01:00:00Z"), "B")
+    restored = DwellEngine()
+    restored.restore(engine.dump())
+    assert restored.entered_at(1) == T0 + 3600
+    move = restored.observe(7, task(3, "2024-05-01T02:00:00Z"), "C")
+    assert (move.from_column, move.time_spent) == ("B", 3600)
+
+
+def test_due_date_without_time_ends_at_local_midnight():
+    # Конец 1 мая по Владивостоку (UTC+10) — 14:00 UTC
+    assert due_timestamp("2024-05-01") == T0 + 14 * 3600
+    assert due_timestamp("") is None
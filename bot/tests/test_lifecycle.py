@@ -0,0 +1,130 @@
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from bot.handlers import commands, lifecycle
+from bot.utils import snapshots
+from bot.utils.deadlines import deadline_watcher
+
+
+@pytest.fixture
+def pollers(monkeypatch, tmp_path):
+    """Поллеры, которые только запоминают, для какого чата запущены."""
+    started = []
+
+    async def poll_watched_boards(chat_id, context):
+        started.append(chat_id)
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(commands, "poll_watched_boards", poll_watched_boards)
+    monkeypatch.setattr(lifecycle, "poll_watched_boards", poll_watched_boards)
+    monkeypatch.setattr(snapshots, "POLLER_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(deadline_watcher, "track", lambda *a, **kw: None)
+    yield started
+    snapshots.stopping.clear()
+
+
+def make_application():
+    return SimpleNamespace(
+        chat_data=defaultdict(dict), user_data=defaultdict(dict)
+    )
+
+
+def ready_watch(board_id, *task_ids):
+    watch = commands.BoardWatch(board_id, f"Доска {board_id}", 1)
+    watch.column_names = {1: "Сделать"}
+    watch.tasks = {
+        task_id: commands.task_snapshot(
+            {"id": task_id, "title": f"Задача {task_id}", "boardColumnId": 1},
+            watch.column_names,
+            {},
+        )
+        for task_id in task_ids
+    }
+    watch.ready = True
+    return watch
+
+
+def test_one_poller_per_group_chat(pollers):
+    async def main():
+        application = make_application()
+        chat_data = application.chat_data[100]
+        # Два участника группы выбирают доски — поллер у чата один
+        for user_id, board_id in ((1, 10), (2, 20), (2, 10)):
+            context = SimpleNamespace(
+                chat_data=chat_data, user_data=application.user_data[user_id]
+            )
+            await commands.watch_board(
+                context, 100, 1, {"id": board_id, "name": "Доска"}
+            )
+        await asyncio.sleep(0)
+        chat_data["poll_task"].cancel()
+        return chat_data
+
+    chat_data = asyncio.run(main())
+    assert pollers == [100]
+    assert sorted(commands.watched_boards(chat_data)) == ["10", "20"]
+
+
+def test_snapshot_restores_boards_per_chat(pollers):
+    async def main():
+        application = make_application()
+        first = commands.watched_boards(application.chat_data[100])
+        first["10"] = ready_watch(10, 1, 2)
+        first["20"] = ready_watch(20, 3)
+        # Доска, которая ещё не загрузилась, в снимок не попадает
+        first["30"] = commands.BoardWatch(30, "Доска 30", 1)
+        commands.watched_boards(application.chat_data[200])["10"] = (
+            ready_watch(10, 1, 2)
+        )
+        application.chat_data[100]["subscription"] = {"completions": True}
+        application.user_data[5]["selected_board"] = {"id": 10}
+        await lifecycle.on_stop(application)
+        snapshots.stopping.clear()
+
+        restored = make_application()
+        await lifecycle.on_startup(restored)
+        await asyncio.sleep(0)
+        for chat_data in restored.chat_data.values():
+            chat_data["poll_task"].cancel()
+        return restored
+
+    restored = asyncio.run(main())
+    assert sorted(pollers) == [100, 200]
+    first = restored.chat_data[100]
+    assert sorted(commands.watched_boards(first)) == ["10", "20"]
+    assert commands.find_snapshot(first, 3)["title"] == "Задача 3"
+    assert first["catchup"] == snapshots.CATCHUP_LIMIT
+    assert first["subscription"] == {"completions": True}
+    assert sorted(commands.watched_boards(restored.chat_data[200])) == ["10"]
+    assert restored.user_data[5] == {"selected_board": {"id": 10}}
+
+
+def test_old_snapshot_boards_go_to_chat(pollers):
+    # Снимок до переноса досок в chat_data: чат с user_id и user_data
+    snapshots.save_state(
+        {
+            "chats": [
+                {
+                    "chat_id": 100,
+                    "user_id": 5,
+                    "user_data": {"selected_board": {"id": 10}},
+                    "boards": [ready_watch(10, 1).dump()],
+                }
+            ]
+        }
+    )
+
+    async def main():
+        application = make_application()
+        await lifecycle.on_startup(application)
+        await asyncio.sleep(0)
+        application.chat_data[100]["poll_task"].cancel()
+        return application
+
+    application = asyncio.run(main())
+    assert pollers == [100]
+    watches = commands.watched_boards(application.chat_data[100])
+    assert watches["10"].tasks[1]["title"] == "Задача 1"
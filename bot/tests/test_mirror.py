@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from bot.utils import api
+from bot.utils.mirror import Mirror
+
+COLUMNS = [{"id": 1, "name": "Сделать"}, {"id": 2, "name": "Готово"}]
+
+
+@pytest.fixture
+def weeek(monkeypatch):
+    """Поддельный WEEEK: считает обращения по функциям."""
+    calls = []
+    tasks = {10: [{"id": 100, "title": "Задача", "boardId": 10}]}
+
+    async def iter_task_pages(board_id, project_id):
+        calls.append(("tasks", board_id))
+        yield tasks.get(board_id, [])
+
+    def get_boardColumn_list(board_id):
+        calls.append(("columns", board_id))
+        if board_id == 404:
+            return {"success": False, "message": "Нет доски"}
+        return {"success": True, "boardColumns": COLUMNS}
+
+    def get_task(task_id):
+        calls.append(("task", task_id))
+        return {"success": True, "task": {"id": 200, "boardId": 20}}
+
+    def get_assignees(*args):
+        calls.append(("members",))
+        return {
+            "success": True,
+            "members": [{"id": "u1", "firstName": "Иван"}],
+        }
+
+    monkeypatch.setattr(api, "iter_task_pages", iter_task_pages)
+    monkeypatch.setattr(api, "get_boardColumn_list", get_boardColumn_list)
+    monkeypatch.setattr(api, "get_task", get_task)
+    monkeypatch.setattr(api, "get_assignees", get_assignees)
+    return calls
+
+
+def test_fresh_board_is_read_locally(weeek):
+    mirror = Mirror()
+    mirror.put_columns(10, COLUMNS)
+    mirror.put_tasks(10, [{"id": 100, "title": "Из поллера"}])
+
+    async def main():
+        names = await mirror.get_column_names(10)
+        tasks = await mirror.get_tasks(10, 1)
+        task = await mirror.get_task("100")
+        return names, tasks, task
+
+    names, tasks, task = asyncio.run(main())
+    assert names == {1: "Сделать", 2: "Готово"}
+    assert [t["title"] for t in tasks] == ["Из поллера"]
+    assert task["title"] == "Из поллера"
+    assert weeek == []
+
+
+def test_stale_board_is_fetched_once(weeek):
+    mirror = Mirror(ttl=60)
+
+    async def main():
+        for _ in range(2):
+            await mirror.get_tasks(10, 1)
+            await mirror.get_columns(10)
+            await mirror.get_members()
+
+    asyncio.run(main())
+    assert weeek == [("tasks", 10), ("columns", 10), ("members",)]
+
+
+def test_expired_entries_are_refetched(weeek):
+    mirror = Mirror(ttl=0.000001)
+
+    async def main():
+        await mirror.get_tasks(10, 1)
+        await asyncio.sleep(0.001)
+        await mirror.get_tasks(10, 1)
+
+    asyncio.run(main())
+    assert weeek == [("tasks", 10), ("tasks", 10)]
+
+
+def test_unknown_task_comes_from_weeek(weeek):
+    mirror = Mirror()
+    task = asyncio.run(mirror.get_task(200))
+    assert task["id"] == 200
+    assert mirror.task_board[200] == "20"
+    assert weeek == [("task", 200)]
+
+
+def test_column_error_is_raised(weeek):
+    with pytest.raises(api.WeeekApiError, match="Нет доски"):
+        asyncio.run(Mirror().get_columns(404))
+
+
+def test_task_moved_between_boards():
+    mirror = Mirror()
+    mirror.put_tasks(10, [{"id": 1}, {"id": 2}])
+    mirror.put_tasks(20, [{"id": 2}])
+    mirror.put_tasks(10, [{"id": 1}])
+    assert mirror.task_board == {1: "10", 2: "20"}
+
+
+def test_disk_copy_is_loaded_as_stale(tmp_path, weeek):
+    path = tmp_path / "tenant-1.json"
+    mirror = Mirror(path)
+    mirror.put_columns(10, COLUMNS)
+    mirror.put_tasks(10, [{"id": 100, "title": "Сохранённая"}])
+    mirror.save(force=True)
+
+    restored = Mirror(path)
+    assert restored.board(10).tasks[100]["title"] == "Сохранённая"
+    assert restored.task_board == {100: "10"}
+    # После перезапуска данные обновляются из WEEEK
+    asyncio.run(restored.get_columns(10))
+    assert weeek == [("columns", 10)]
+
+
+def test_save_skips_clean_mirror(tmp_path):
+    path = tmp_path / "tenant-1.json"
+    mirror = Mirror(path)
+    mirror.save(force=True)
+    assert not path.exists()
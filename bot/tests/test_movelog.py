@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+
+from bot.utils import movelog
+from bot.utils.movelog import MoveLogQueue
+
+
+def status_error(code):
+    request = httpx.Request("POST", "http://backend/log_move/")
+    response = httpx.Response(code, request=request, text="{}")
+    return httpx.HTTPStatusError("", request=request, response=response)
+
+
+def fake_backend(monkeypatch, replies):
+    """post_moves по очереди бросает или возвращает ответы из replies."""
+    sent = []
+
+    async def post_moves(payloads):
+        sent.append(list(payloads))
+        reply = replies.pop(0) if replies else {"created": len(payloads)}
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(movelog.backend, "post_moves", post_moves)
+    monkeypatch.setattr(movelog, "MOVE_LOG_BACKOFF", 0.01)
+    return sent
+
+
+def test_unavailable_backend_batch_is_retried(monkeypatch):
+    sent = fake_backend(
+        monkeypatch, [httpx.ConnectError("нет сети"), status_error(502)]
+    )
+
+    async def main():
+        queue = MoveLogQueue()
+        for i in range(3):
+            queue.submit(i)
+        return await queue.drain(2)
+
+    assert asyncio.run(main()) == []
+    assert sent == [[0, 1, 2]] * 3
+
+
+def test_rejected_batch_is_not_retried(monkeypatch):
+    sent = fake_backend(monkeypatch, [status_error(400)])
+
+    async def main():
+        queue = MoveLogQueue()
+        queue.submit(1)
+        return await queue.drain(2)
+
+    assert asyncio.run(main()) == []
+    assert sent == [[1]]
+
+
+def test_unsent_batch_survives_drain(monkeypatch):
+    fake_backend(monkeypatch, [httpx.ConnectError("нет сети")] * 100)
+
+    async def main():
+        queue = MoveLogQueue()
+        queue.submit(1)
+        queue.submit(2)
+        return await queue.drain(0.05)
+
+    assert sorted(asyncio.run(main())) == [1, 2]
+
+
+def test_send_interrupted_by_drain_is_kept(monkeypatch):
+    async def post_moves(payloads):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(movelog.backend, "post_moves", post_moves)
+
+    async def main():
+        queue = MoveLogQueue()
+        queue.submit(1)
+        return await queue.drain(0.05)
+
+    assert asyncio.run(main()) == [1]
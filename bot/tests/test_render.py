@@ -0,0 +1,73 @@
+from bot.utils import render
+from bot.utils.callback_data import SHOW_TASK, decode
+
+TASK = {
+    "id": 5,
+    "title": "Починить вход",
+    "description": "<p>Падает &amp; не входит</p><p>Safari</p>",
+    "dueDate": "2025-01-31",
+    "type": "action",
+    "isCompleted": False,
+}
+
+
+def test_task_card_is_memoised():
+    render._task_card.cache_clear()
+    first = render.task_card(TASK, "В работе", "Иван", 42, full=True)
+    again = render.task_card(dict(TASK), "В работе", "Иван", 42, full=True)
+    assert again is first
+    info = render._task_card.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert "Описание: Падает & не входит\nSafari" in first
+    assert "https://app.weeek.net/ws/42/task/5" in first
+
+
+def test_changed_task_is_rendered_again():
+    card = render.task_card(TASK, "В работе", "Иван", 42)
+    done = render.task_card(
+        {**TASK, "isCompleted": True}, "Готово", "Иван", 42
+    )
+    assert "Статус: Активна" in card
+    assert "Статус: Выполнена" in done
+    # Краткая карточка для списка — без описания
+    assert "Описание" not in card
+    assert card.endswith("---\n")
+
+
+def test_defaults_for_missing_fields():
+    card = render.task_card({"id": 1}, "В работе", "Не назначен", 42)
+    assert "📌 Без названия" in card
+    assert "Дедлайн: Без дедлайна" in card
+    assert "Тип: Не указан" in card
+
+
+def test_remove_html_tags():
+    assert render.remove_html_tags(None) == "Без описания"
+    assert render.remove_html_tags("a<br>b<br/>c") == "a\nb\nc"
+    text = "<div>one</div><div></div><div></div><div>two</div>"
+    assert render.remove_html_tags(text) == "one\n\ntwo"
+
+
+def test_assignee_names():
+    names = {1: "Иван", 2: "Мария"}
+    assert render.assignee_names([1, 3], names) == "Иван, 3"
+    assert render.assignee_names([], names) == "Не назначен"
+
+
+def test_snapshot_card():
+    snapshot = {
+        "title": "Задача",
+        "description": "<b>текст</b>",
+        "boardColumn": "Ревью",
+        "isCompleted": True,
+    }
+    card = render.snapshot_card(5, snapshot, 42)
+    assert card.startswith("📌 *Задача*\n📝 текст\n📂 Колонка: Ревью\n")
+    assert "Выполнена" in card
+
+
+def test_keyboard_is_cached_per_task():
+    keyboard = render.show_task_keyboard(5)
+    assert render.show_task_keyboard(5) is keyboard
+    (button,) = keyboard.inline_keyboard[0]
+    assert decode(button.callback_data) == (SHOW_TASK, "5")
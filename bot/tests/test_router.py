@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.handlers.router import CallbackRouter, MenuRouter
+from bot.utils.callback_data import (
+    PAGE_PROJECT,
+    SHOW_TASK,
+    TASK_PAGE,
+    callback_arg,
+    decode,
+    encode,
+)
+
+
+def test_encode_decode_round_trip():
+    data = encode(SHOW_TASK, "12345")
+    assert data == "1t:12345"
+    assert decode(data) == (SHOW_TASK, "12345")
+    assert decode(encode(TASK_PAGE)) == (TASK_PAGE, "")
+    # Аргумент с двоеточием не обрезается
+    assert decode(encode(TASK_PAGE, "a:b")) == (TASK_PAGE, "a:b")
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("show_task_42", (SHOW_TASK, "42")),
+        ("page_proj_3", (PAGE_PROJECT, "3")),
+        ("page_3", (TASK_PAGE, "3")),
+        ("unknown_1", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_legacy_buttons(data, expected):
+    assert decode(data) == expected
+
+
+def test_callback_arg():
+    assert callback_arg("1t:7") == "7"
+    assert callback_arg("show_task_7") == "7"
+    assert callback_arg("garbage") == ""
+
+
+def test_callback_data_fits_telegram_limit():
+    # Самый длинный аргумент — id задачи или курсор страницы
+    assert len(encode(PAGE_PROJECT, "9" * 20).encode()) <= 64
+
+
+def test_dispatch_by_operation():
+    callbacks = CallbackRouter()
+    called = []
+
+    def route(name):
+        async def callback(update, context):
+            called.append(name)
+            return name
+
+        return callback
+
+    callbacks.route(SHOW_TASK, route("task"))
+    callbacks.route(TASK_PAGE, route("page"))
+    update = SimpleNamespace(
+        callback_query=SimpleNamespace(data="show_task_1")
+    )
+    assert asyncio.run(callbacks.dispatch(update, None)) == "task"
+    update.callback_query.data = encode(TASK_PAGE, "2")
+    assert asyncio.run(callbacks.dispatch(update, None)) == "page"
+    assert called == ["task", "page"]
+
+
+def test_handler_accepts_only_its_operations():
+    handler = CallbackRouter().handler(SHOW_TASK)
+    check = handler.pattern
+    assert check(encode(SHOW_TASK, "1"))
+    assert check("show_task_1")
+    assert not check(encode(TASK_PAGE, "1"))
+    assert not check("garbage")
+
+
+def test_menu_router():
+    async def tasks(update, context):
+        return "tasks"
+
+    menu = MenuRouter({"📋 Показать задачи": tasks})
+    update = SimpleNamespace(
+        message=SimpleNamespace(text="📋 Показать задачи")
+    )
+    assert asyncio.run(menu.dispatch(update, None)) == "tasks"
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.handlers import commands
+from bot.handlers.inline import user_boards
+from bot.utils import tenants
+from bot.utils.search import TaskIndex, index_for, tokenize
+
+
+@pytest.fixture
+def index():
+    index = TaskIndex()
+    index.upsert(1, 10, "Починить вход", "Ошибка в Safari")
+    index.upsert(2, 10, "Обновить зависимости", "вход через SSO")
+    index.upsert(3, 20, "Ёлка для офиса", "")
+    return index
+
+
+def ids(docs):
+    return [doc.task_id for doc in docs]
+
+
+def test_tokenize():
+    assert tokenize("Ёлка, ВХОД!") == ["елка", "вход"]
+    assert tokenize(None) == []
+
+
+def test_title_matches_rank_higher(index):
+    assert ids(index.search("вход")) == [1, 2]
+
+
+def test_all_words_must_match_last_is_prefix(index):
+    assert ids(index.search("починить вх")) == [1]
+    assert ids(index.search("почи")) == [1]
+    assert ids(index.search("починить safari")) == [1]
+    assert index.search("починить sso") == []
+    assert ids(index.search("елк")) == [3]
+    assert index.search("   ") == []
+
+
+def test_reindexed_task_loses_old_words(index):
+    index.upsert(1, 10, "Настроить CI", "")
+    assert ids(index.search("вход")) == [2]
+    assert ids(index.search("ci")) == [1]
+    assert "починить" not in index.postings
+
+
+def test_board_filter_and_removal(index):
+    assert ids(index.search("вход", board_ids={20})) == []
+    index.remove_board(10)
+    assert len(index) == 1
+    assert index.search("вход") == []
+    assert ids(index.search("елка")) == [3]
+
+
+def test_index_for_keeps_one_index_per_tenant():
+    tenant = tenants.Tenant(99, "key")
+    index = index_for(tenant)
+    assert index_for(tenant) is index
+    assert tenant.cache == {"search_index": index}
+
+
+def make_watch(board_id):
+    return SimpleNamespace(id=board_id, name=f"Доска {board_id}")
+
+
+def make_chat(*board_ids):
+    return {"watched_boards": {str(b): make_watch(b) for b in board_ids}}
+
+
+def test_unwatched_board_leaves_search_index(monkeypatch):
+    index = TaskIndex()
+    monkeypatch.setitem(tenants.DEFAULT_TENANT.cache, "search_index", index)
+    index.upsert(1, 10, "Задача доски 10", "")
+    index.upsert(2, 20, "Задача доски 20", "")
+    mine, other = make_chat(10, 20), make_chat(20)
+    application = SimpleNamespace(chat_data={1: mine, 2: other})
+    context = SimpleNamespace(chat_data=mine, application=application)
+
+    asyncio.run(commands.unwatch_board(context, 1, 10))
+    assert ids(index.search("задача")) == [2]
+    # Доску 20 ещё отслеживает другой чат — её задачи остаются
+    asyncio.run(commands.unwatch_board(context, 1, 20))
+    assert ids(index.search("задача")) == [2]
+    other_context = SimpleNamespace(chat_data=other, application=application)
+    asyncio.run(commands.unwatch_board(other_context, 2, 20))
+    assert index.search("задача") == []
+
+
+def test_inline_search_sees_only_own_chats(monkeypatch):
+    other_tenant = tenants.Tenant(2, "key-2", [3])
+    mapping = {**tenants.CHAT_TO_TENANT, 3: other_tenant}
+    monkeypatch.setattr(tenants, "CHAT_TO_TENANT", mapping)
+    application = SimpleNamespace(
+        chat_data={1: make_chat(10, 20), 2: make_chat(30), 3: make_chat(40)}
+    )
+    context = SimpleNamespace(
+        user_data={"chats": [1, 3, 4]}, application=application
+    )
+    assert user_boards(context) == {
+        tenants.DEFAULT_TENANT: {10, 20},
+        other_tenant: {40},
+    }
+    context = SimpleNamespace(user_data={}, application=application)
+    assert user_boards(context) == {}
@@ -0,0 +1,103 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from bot.utils import api, singleflight
+from bot.utils.singleflight import SingleFlight
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "не дождались"
+        time.sleep(0.001)
+
+
+def run_pair(flights, fn):
+    """Лидер и ведомый с одним ключом; [(результат, ошибка)] обоих."""
+    results = []
+
+    def call():
+        try:
+            results.append((flights.do(("fn", 1), fn), None))
+        except Exception as e:
+            results.append((None, e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    wait_for(lambda: ("fn", 1) in flights._calls)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_for(lambda: flights.shared[("fn", 1)] == 1)
+    return results, (leader, follower)
+
+
+def test_follower_gets_leader_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return {"tasks": []}
+
+    results, threads = run_pair(flights, fn)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert len(calls) == 1
+    (first, _), (second, _) = results
+    assert first is second
+    assert flights.stats() == {"fn": (2, 1)}
+
+
+def test_follower_gets_leader_error():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(2)
+        raise ValueError("502")
+
+    results, threads = run_pair(flights, fn)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    (_, first), (_, second) = results
+    assert isinstance(first, ValueError)
+    assert first is second
+
+
+def test_key_is_released_after_call():
+    flights = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ValueError("502")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            flights.do(("fn", 1), fn)
+    assert len(calls) == 2
+    assert flights.do(("fn", 1), lambda: "ok") == "ok"
+    assert flights.shared[("fn", 1)] == 0
+
+
+def test_assignees_share_one_key(monkeypatch):
+    keys = []
+
+    def do(key, fn, *args, **kwargs):
+        keys.append(key)
+        return []
+
+    monkeypatch.setattr(
+        singleflight.tenants, "current", lambda: SimpleNamespace(id=1)
+    )
+    monkeypatch.setattr(singleflight.flights, "do", do)
+    api.get_assignees()
+    api.get_assignees()
+    assert keys[0] == keys[1] == ("get_assignees", 1, (), ())
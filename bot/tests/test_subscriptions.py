@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from bot.handlers import commands
+from bot.utils import subscriptions
+from bot.utils.subscriptions import (
+    NEW,
+    UPDATE,
+    Change,
+    hold,
+    parse_quiet,
+    subscription_for,
+    take_held,
+)
+
+
+def change(kind=UPDATE, fields=(), column="Готово", old="В работе", **kw):
+    return Change(
+        kind,
+        kw.get("task_id", 1),
+        frozenset(fields),
+        column,
+        old,
+        frozenset(kw.get("assignees", ())),
+        kw.get("completed", False),
+    )
+
+
+def rules(**values):
+    return {"subscription": {**subscriptions.DEFAULT_RULES, **values}}
+
+
+def test_default_rules_pass_everything():
+    items = [(change(),), (change(NEW),)]
+    assert subscription_for({}).select(items) == items
+
+
+def test_rules_combined():
+    sub = subscription_for(
+        rules(member_id=5, columns=["Готово"], completions=True)
+    )
+    done = change(fields={"status"}, assignees={5}, completed=True)
+    assert sub.accepts(done)
+    assert not sub.accepts(done._replace(assignees=frozenset({6})))
+    assert not sub.accepts(done._replace(column="A", old_column="B"))
+    assert not sub.accepts(done._replace(completed=False))
+    # Задача ушла из отслеживаемой колонки — тоже изменение в ней
+    left = done._replace(column="Архив", old_column="Готово")
+    assert sub.accepts(left)
+
+
+def test_same_rules_compiled_once():
+    assert subscription_for(rules(columns=["A", "B"])) is subscription_for(
+        rules(columns=["B", "A"])
+    )
+
+
+@pytest.mark.parametrize(
+    "quiet, hour, expected",
+    [
+        ([22, 8], 23, True),
+        ([22, 8], 3, True),
+        ([22, 8], 8, False),
+        ([13, 14], 13, True),
+        ([13, 14], 12, False),
+    ],
+)
+def test_quiet_hours(quiet, hour, expected):
+    now = datetime(2025, 1, 1, hour)
+    assert subscription_for(rules(quiet=quiet)).is_quiet(now) is expected
+
+
+def test_parse_quiet():
+    assert parse_quiet("22 - 8") == [22, 8]
+    for value in ("8-8", "25-3", "ночь"):
+        with pytest.raises(ValueError):
+            parse_quiet(value)
+
+
+def test_held_limited_and_taken_once(monkeypatch):
+    monkeypatch.setattr(subscriptions, "HELD_LIMIT", 2)
+    chat_data = {}
+    for i in range(5):
+        hold(chat_data, f"изменение {i}", i)
+    assert take_held(chat_data) == (
+        [["изменение 0", 0], ["изменение 1", 1]],
+        3,
+    )
+    assert take_held(chat_data) == ([], 0)
+
+
+def test_send_held_after_quiet_hours():
+    sent = []
+
+    async def send_message(**kwargs):
+        sent.append(kwargs)
+
+    context = SimpleNamespace(
+        chat_data={},
+        bot=SimpleNamespace(send_message=send_message),
+    )
+    hold(context.chat_data, "Задача удалена")
+    hold(context.chat_data, "Задача перемещена", 7)
+    context.chat_data["held"]["more"] = 2
+    asyncio.run(commands.send_held(context, 100))
+    assert [m["text"] for m in sent] == [
+        "Задача удалена",
+        "Задача перемещена",
+        "… и ещё изменений за тихие часы: 2",
+    ]
+    assert sent[0]["reply_markup"] is None
+    assert sent[1]["reply_markup"] is not None
+    assert "held" not in context.chat_data
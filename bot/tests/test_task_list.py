@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+from bot.handlers import commands
+from bot.utils.callback_data import TASK_PAGE, encode
+
+
+class Recorder:
+    """Асинхронный метод сообщения/запроса, запоминающий вызовы."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = []
+        self.result = result
+        self.error = error
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    views = []
+
+    async def render_task_list(view):
+        views.append(dict(view))
+        return f"страница {view['page']}", None
+
+    monkeypatch.setattr(commands, "render_task_list", render_task_list)
+    return views
+
+
+def make_context():
+    return SimpleNamespace(
+        user_data={
+            "selected_project": {"id": 1},
+            "selected_board": {"id": 2},
+            "sort_field": "dueDate",
+            "filter_field": "type",
+            "filter_value": "action",
+        },
+        chat_data={},
+    )
+
+
+def open_list(context, message_id):
+    reply = Recorder(SimpleNamespace(message_id=message_id))
+    update = SimpleNamespace(message=SimpleNamespace(reply_text=reply))
+    asyncio.run(commands.display_tasks(update, context))
+    return reply
+
+
+def turn_page(context, message_id, page, edit=None):
+    edit = edit or Recorder()
+    query = SimpleNamespace(
+        data=encode(TASK_PAGE, page),
+        message=SimpleNamespace(message_id=message_id),
+        answer=Recorder(),
+        edit_message_text=edit,
+    )
+    asyncio.run(
+        commands.handle_pagination(
+            SimpleNamespace(callback_query=query), context
+        )
+    )
+    return edit
+
+
+def test_list_is_one_message_paged_in_place(rendered):
+    context = make_context()
+    reply = open_list(context, 100)
+    assert len(reply.calls) == 1
+    # Фильтры перешли в параметры списка и не влияют на следующий
+    assert "sort_field" not in context.user_data
+
+    edit = turn_page(context, 100, 2)
+    assert edit.calls == [(("страница 2",), {"reply_markup": None})]
+    assert rendered[-1] == {
+        "project_id": 1,
+        "board_id": 2,
+        "column_id": None,
+        "sort_field": "dueDate",
+        "filter_field": "type",
+        "filter_value": "action",
+        "page": 2,
+    }
+
+
+def test_each_list_keeps_its_own_filters(rendered):
+    context = make_context()
+    open_list(context, 100)
+    open_list(context, 101)
+    turn_page(context, 100, 3)
+    assert rendered[-1]["sort_field"] == "dueDate"
+    turn_page(context, 101, 2)
+    assert rendered[-1]["sort_field"] is None
+
+
+def test_only_recent_lists_are_kept(rendered):
+    context = make_context()
+    for message_id in range(commands.TASK_LIST_VIEWS_KEPT + 3):
+        open_list(context, message_id)
+    views = context.chat_data["task_lists"]
+    assert len(views) == commands.TASK_LIST_VIEWS_KEPT
+    assert min(views) == 3
+
+
+def test_unknown_message_pages_current_board(rendered):
+    context = make_context()
+    turn_page(context, 555, 4)
+    assert rendered[-1]["board_id"] == 2
+    assert rendered[-1]["sort_field"] is None
+    assert rendered[-1]["page"] == 4
+
+
+def test_unchanged_page_is_not_an_error(rendered):
+    context = make_context()
+    open_list(context, 100)
+    edit = Recorder(error=BadRequest("Message is not modified"))
+    turn_page(context, 100, 1, edit)
+    assert len(edit.calls) == 1
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.handlers import commands
+from bot.utils import tenants
+from bot.utils.singleflight import SingleFlight
+from bot.utils.tracing import NotificationSpan, Tracer, latency_summary
+
+
+def make_tenant(monkeypatch, tenant_id, chat_ids):
+    tenant = tenants.Tenant(tenant_id, f"key-{tenant_id}", chat_ids)
+    mapping = dict(tenants.CHAT_TO_TENANT)
+    mapping.update({chat_id: tenant for chat_id in chat_ids})
+    monkeypatch.setattr(tenants, "CHAT_TO_TENANT", mapping)
+    return tenant
+
+
+def update_for(chat_id=None, user_id=None):
+    return SimpleNamespace(
+        effective_chat=chat_id and SimpleNamespace(id=chat_id),
+        effective_user=user_id and SimpleNamespace(id=user_id),
+    )
+
+
+def test_chat_gets_its_tenant_pool(monkeypatch):
+    other = make_tenant(monkeypatch, 2, [100])
+    assert tenants.for_chat(100) is other
+    assert tenants.for_chat(999) is tenants.DEFAULT_TENANT
+    assert other.session is not tenants.DEFAULT_TENANT.session
+    assert other.session.headers["Authorization"] == "Bearer key-2"
+
+
+def test_tenant_reset_for_every_update(monkeypatch):
+    other = make_tenant(monkeypatch, 2, [100])
+
+    async def main():
+        await tenants.activate_for_update(update_for(100), None)
+        first = tenants.current()
+        # Inline-запрос: чата нет, арендатор — по пользователю
+        await tenants.activate_for_update(update_for(user_id=100), None)
+        inline = tenants.current()
+        await tenants.activate_for_update(update_for(), None)
+        return first, inline, tenants.current()
+
+    assert asyncio.run(main()) == (other, other, tenants.DEFAULT_TENANT)
+
+
+def test_flight_stats_per_tenant():
+    flights = SingleFlight()
+    flights.do(("get_tasks", 1, (1,), ()), lambda: None)
+    flights.do(("get_tasks", 2, (1,), ()), lambda: None)
+    flights.do(("get_tasks", 2, (2,), ()), lambda: None)
+    assert flights.stats(1) == {"get_tasks": (1, 0)}
+    assert flights.stats(2) == {"get_tasks": (2, 0)}
+    assert flights.stats() == {"get_tasks": (3, 0)}
+
+
+def test_latency_shows_only_chat_boards(monkeypatch, tmp_path):
+    tracer = Tracer(tmp_path)
+    for board_id, name in ((7, "Наша доска"), (8, "Чужая доска")):
+        span = NotificationSpan(board_id, name, 1, "update", 1)
+        span.mark("sent", 2)
+        tracer.end(span)
+    asyncio.run(tracer.flush())
+    assert set(latency_summary(tmp_path)) == {"Наша доска", "Чужая доска"}
+
+    monkeypatch.setattr(
+        commands,
+        "latency_summary",
+        lambda boards: latency_summary(tmp_path, boards=boards),
+    )
+    replies = []
+
+    async def reply_text(text):
+        replies.append(text)
+
+    update = SimpleNamespace(message=SimpleNamespace(reply_text=reply_text))
+    context = SimpleNamespace(chat_data={"watched_boards": {"7": None}})
+    asyncio.run(commands.latency(update, context))
+    (text,) = replies
+    assert "Наша доска" in text
+    assert "Чужая доска" not in text
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+from datetime import date, timedelta
+
+from bot.utils.tracing import (
+    NotificationSpan,
+    Tracer,
+    format_summary,
+    latency_summary,
+    percentile,
+)
+
+SECOND = 1_000_000_000
+POLLED = 1_700_000_000 * SECOND
+
+
+def span(board="Разработка", changed_at=POLLED - 5 * SECOND):
+    span = NotificationSpan(7, board, 10, "update", POLLED, changed_at)
+    span.mark("detected", POLLED + SECOND)
+    span.mark("diffed", POLLED + 2 * SECOND)
+    span.mark("sent", POLLED + 4 * SECOND)
+    return span
+
+
+def write_day(directory, day, spans):
+    tracer = Tracer(directory, retention_days=0)
+    for item in spans:
+        tracer.end(item)
+    asyncio.run(tracer.flush())
+    today = directory / f"spans-{date.today():%Y-%m-%d}.jsonl"
+    os.replace(today, directory / f"spans-{day:%Y-%m-%d}.jsonl")
+
+
+def test_phases_per_board(tmp_path):
+    tracer = Tracer(tmp_path)
+    tracer.end(span())
+    tracer.end(span("Поддержка"))
+    asyncio.run(tracer.flush())
+
+    (path,) = tmp_path.iterdir()
+    line = json.loads(path.read_text())
+    (scope,) = line["resourceSpans"][0]["scopeSpans"]
+    assert len(scope["spans"]) == 2
+
+    summary = latency_summary(tmp_path)
+    assert set(summary) == {"Разработка", "Поддержка"}
+    phases = summary["Разработка"]
+    assert phases["weeek"] == [5.0]
+    assert phases["api"] == [1.0]
+    assert phases["diff"] == [1.0]
+    assert phases["send"] == [2.0]
+    assert phases["total"] == [9.0]
+    assert "p50=9.00с" in format_summary(summary)
+
+
+def test_future_weeek_time_is_ignored():
+    future = span(changed_at=POLLED + 60 * SECOND)
+    assert future.start_ns == POLLED
+    assert [name for name, _ in future.events][0] == "poll_started"
+
+
+def test_disabled_tracer_writes_nothing(tmp_path):
+    tracer = Tracer(tmp_path, enabled=False)
+    tracer.end(span())
+    asyncio.run(tracer.flush())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_summary_reads_only_recent_days(tmp_path):
+    today = date.today()
+    write_day(tmp_path, today - timedelta(days=3), [span("Старая")])
+    write_day(tmp_path, today - timedelta(days=1), [span("Вчера")])
+    write_day(tmp_path, today, [span("Сегодня")])
+    (tmp_path / "spans-broken.jsonl").write_text("не json\n")
+
+    assert set(latency_summary(tmp_path, days=1)) == {"Сегодня"}
+    assert set(latency_summary(tmp_path, days=2)) == {"Вчера", "Сегодня"}
+    assert len(latency_summary(tmp_path, days=None)) == 3
+
+
+def test_old_files_pruned_on_write(tmp_path):
+    today = date.today()
+    for age in (10, 7, 6):
+        day = today - timedelta(days=age)
+        (tmp_path / f"spans-{day:%Y-%m-%d}.jsonl").write_text("")
+    tracer = Tracer(tmp_path, retention_days=7)
+    tracer.end(span())
+    asyncio.run(tracer.flush())
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == [
+        f"spans-{today - timedelta(days=7):%Y-%m-%d}.jsonl",
+        f"spans-{today - timedelta(days=6):%Y-%m-%d}.jsonl",
+        f"spans-{today:%Y-%m-%d}.jsonl",
+    ]
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) is None